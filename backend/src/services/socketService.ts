@@ -1,21 +1,81 @@
 import { Socket, Server } from 'socket.io'
 import { spawn } from 'child_process'
+import { createConnection } from 'net'
 import { logger } from '../utils/logger.js'
 import { claudeService } from './claudeService.js'
 
+// When set, sessions attach to a shared kernel daemon (kernel_bridge.py --serve)
+// instead of spawning one Python process per socket
+const kernelSocketPath = process.env.WAYNEOS_KERNEL_SOCKET
+
 export const setupSocketHandlers = (socket: Socket, io: Server) => {
   let kernelProcess: any = null
 
+  // Relay the throughput the kernel measures, read from the performance
+  // field of each NDJSON response; output can split a line across chunks
+  const performanceRelay = () => {
+    let partial = ''
+    return (data: Buffer) => {
+      const lines = (partial + data.toString()).split('\n')
+      partial = lines.pop() ?? ''
+      for (const line of lines) {
+        if (!line.trim()) continue
+        try {
+          const performance = JSON.parse(line).performance
+          if (performance) {
+            io.emit('performance', {
+              opsPerSec: performance.opsPerSec,
+              commandsProcessed: performance.commandsProcessed
+            })
+          }
+        } catch {
+          // Not a JSON response; nothing to relay
+        }
+      }
+    }
+  }
+
   // Start Python kernel bridge
   const startKernel = () => {
     const distribution = socket.data.distribution
+
+    if (kernelSocketPath) {
+      const connection = createConnection(kernelSocketPath)
+      connection.write(JSON.stringify({
+        type: 'session',
+        command: 'open',
+        params: { distribution }
+      }) + '\n')
+
+      const relay = performanceRelay()
+      connection.on('data', (data: Buffer) => {
+        socket.emit('output', data.toString())
+        relay(data)
+      })
+
+      connection.on('error', (error: Error) => {
+        logger.error('Kernel session error:', error.message)
+        socket.emit('error', error.message)
+      })
+
+      connection.on('close', () => {
+        logger.info('Kernel session closed')
+        kernelProcess = null
+      })
+
+      kernelProcess = { stdin: connection, kill: () => connection.destroy() }
+      return
+    }
+
     kernelProcess = spawn('python', [
       '../wayneos-kernel/kernel_bridge.py',
       '--distribution', distribution
     ])
 
+    const relay = performanceRelay()
     kernelProcess.stdout.on('data', (data: Buffer) => {
       socket.emit('output', data.toString())
+      relay(data)
     })
 
     kernelProcess.stderr.on('data', (data: Buffer) => {
@@ -46,14 +106,8 @@ export const setupSocketHandlers = (socket: Socket, io: Server) => {
         }) + '\n')
       }
       
-      // Send response to client
+      // Send response to client; performance follows from the kernel's reply
       socket.emit('claude-response', response.message)
-      
-      // Track performance
-      io.emit('performance', {
-        opsPerSec: 313150 + Math.floor(Math.random() * 10000),
-        commandsProcessed: 1
-      })
     } catch (error) {
       logger.error('Command processing error:', error)
       socket.emit('error', 'Failed to process command')
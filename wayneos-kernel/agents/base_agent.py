@@ -12,6 +12,11 @@ class BaseAgent(ABC):
         self.name = name
         self.logger = logging.getLogger(f'wayneos.agent.{name}')
         self.capabilities = []
+        # Shared KernelRuntime, attached by the AgentRegistry on construction
+        self.runtime = None
+        # Distribution and user of the owning session, also set by the AgentRegistry
+        self.distribution = 'wayneos'
+        self.user = 'user'
         
     @abstractmethod
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,244 @@
+"""Connectivity - Concurrent TCP connect prober with a keep-alive pool"""
+
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import errno
+import ipaddress
+import os
+import socket
+import time
+
+# Probed when neither params nor WAYNEOS_PROBE_TARGETS name any targets
+DEFAULT_TARGETS = ['1.1.1.1:443', '8.8.8.8:53', '9.9.9.9:443']
+
+DEFAULT_TIMEOUT = 2.0
+
+# Connects in flight at once; 500 targets still finish in one timeout
+DEFAULT_CONCURRENCY = 1024
+
+# Open connections kept per prober, and how long an idle one stays usable
+POOL_SIZE = 256
+POOL_IDLE_SECONDS = 30.0
+
+# Resolved addresses are reused for this long
+DNS_TTL = 60.0
+
+Target = Tuple[str, int]
+
+def parse_target(target: Any) -> Target:
+    """(host, port) from 'host:port', '[v6]:port', a [host, port] pair or a dict"""
+    try:
+        if isinstance(target, dict):
+            host, port = str(target['host']), int(target['port'])
+        elif isinstance(target, (list, tuple)):
+            host, port = str(target[0]), int(target[1])
+        else:
+            host, sep, port = str(target).rpartition(':')
+            if not sep or not host:
+                raise ValueError('needs a port')
+            host, port = host.strip('[]'), int(port)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise ValueError(f'Invalid target {target}: {e}')
+    if not 0 < port < 65536:
+        raise ValueError(f'Invalid target {target}: port out of range')
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        try:
+            host.encode('idna')
+        except UnicodeError:
+            raise ValueError(f'Invalid target {target}: bad host name')
+    return host, port
+
+def configured_targets() -> List[str]:
+    """Targets from WAYNEOS_PROBE_TARGETS (comma-separated), else the defaults"""
+    value = os.environ.get('WAYNEOS_PROBE_TARGETS', '')
+    targets = [item.strip() for item in value.split(',') if item.strip()]
+    return targets or list(DEFAULT_TARGETS)
+
+def _failure(error: BaseException) -> Dict[str, Any]:
+    """Classify a failed connect for the report"""
+    if isinstance(error, asyncio.TimeoutError):
+        return {'reason': 'timeout'}
+    if isinstance(error, socket.gaierror):
+        return {'reason': 'dns', 'message': str(error)}
+    if isinstance(error, ConnectionRefusedError):
+        return {'reason': 'refused'}
+    if isinstance(error, OSError) and error.errno in (errno.ENETUNREACH, errno.EHOSTUNREACH):
+        return {'reason': 'unreachable', 'message': os.strerror(error.errno)}
+    return {'reason': type(error).__name__, 'message': str(error)}
+
+def latency_summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    """Nearest-rank percentiles of connect latencies given in milliseconds"""
+    if not samples:
+        return {'min': None, 'p50': None, 'p90': None, 'p99': None, 'max': None, 'mean': None}
+    ordered = sorted(samples)
+    summary = {'min': ordered[0]}
+    for p in (50, 90, 99):
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+        summary[f'p{p}'] = ordered[rank]
+    summary['max'] = ordered[-1]
+    summary['mean'] = round(sum(ordered) / len(ordered), 3)
+    return summary
+
+class _ProbeProtocol(asyncio.Protocol):
+    """Holds a probe connection open, discarding data, and notes when it ends"""
+    
+    def __init__(self):
+        self.alive = True
+    
+    def data_received(self, data: bytes):
+        pass
+    
+    def eof_received(self) -> bool:
+        self.alive = False
+        return False
+    
+    def connection_lost(self, exc: Optional[Exception]):
+        self.alive = False
+
+class ConnectivityProber:
+    """Checks many TCP endpoints at once
+    
+    Every target gets its own connect with its own timeout, and all of them
+    run concurrently up to a limit, so a probe takes about as long as the
+    slowest target rather than the sum. With reuse=True a successful
+    connection is kept open in a small pool: while the peer has neither
+    closed nor reset it and it has been idle for less than POOL_IDLE_SECONDS,
+    the next such probe of that target reuses it instead of opening a new
+    socket. Such a result is marked cached and has no latency sample, since a
+    peer that vanished without closing is only noticed by a fresh connect, so
+    reuse is off by default and every probe measures a real handshake. Host
+    names are resolved once per DNS_TTL; IP literals skip the resolver
+    thread pool entirely. A target that cannot be parsed or probed is
+    reported as failed on its own without affecting the others.
+    """
+    
+    def __init__(self, pool_size: int = POOL_SIZE, idle_seconds: float = POOL_IDLE_SECONDS):
+        self.pool_size = pool_size
+        self.idle_seconds = idle_seconds
+        # (host, port) -> (transport, protocol, last used)
+        self.pool: Dict[Target, Tuple[asyncio.Transport, _ProbeProtocol, float]] = {}
+        self.addresses: Dict[Target, Tuple[str, float]] = {}
+        self.probes = 0
+        self.reused = 0
+    
+    def _pooled(self, target: Target, now: float) -> bool:
+        """True when a healthy pooled connection to target can be reused"""
+        entry = self.pool.get(target)
+        if entry is None:
+            return False
+        transport, protocol, used = entry
+        if transport.is_closing() or not protocol.alive or now - used > self.idle_seconds:
+            self._discard(target)
+            return False
+        self.pool[target] = (transport, protocol, now)
+        return True
+    
+    def _discard(self, target: Target):
+        entry = self.pool.pop(target, None)
+        if entry is not None:
+            entry[0].close()
+    
+    def _keep(self, target: Target, transport: asyncio.Transport, protocol: _ProbeProtocol,
+              now: float):
+        if self.pool_size <= 0:
+            transport.close()
+            return
+        self._discard(target)
+        if len(self.pool) >= self.pool_size:
+            # Evict the connection idle the longest
+            self._discard(min(self.pool, key=lambda key: self.pool[key][2]))
+        self.pool[target] = (transport, protocol, now)
+    
+    async def _resolve(self, host: str, port: int) -> str:
+        """Address to connect to, from the cache when fresh"""
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        now = time.monotonic()
+        cached = self.addresses.get((host, port))
+        if cached is not None and now - cached[1] < DNS_TTL:
+            return cached[0]
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        address = infos[0][4][0]
+        self.addresses[(host, port)] = (address, now)
+        return address
+    
+    async def _probe_one(self, target: Target, timeout: float, reuse: bool,
+                         slots: asyncio.Semaphore) -> Dict[str, Any]:
+        host, port = target
+        result: Dict[str, Any] = {'target': f'{host}:{port}'}
+        if reuse and self._pooled(target, time.monotonic()):
+            self.reused += 1
+            result.update(reachable=True, reused=True, cached=True)
+            return result
+        
+        async with slots:
+            start = time.perf_counter()
+            try:
+                # The timeout covers resolution and the handshake together
+                address = await asyncio.wait_for(self._resolve(host, port), timeout)
+                transport, protocol = await asyncio.wait_for(
+                    asyncio.get_running_loop().create_connection(_ProbeProtocol, address, port),
+                    max(0.0, timeout - (time.perf_counter() - start))
+                )
+            except Exception as e:
+                result.update(reachable=False, **_failure(e))
+                return result
+            elapsed = time.perf_counter() - start
+        
+        if reuse:
+            self._keep(target, transport, protocol, time.monotonic())
+        else:
+            transport.close()
+        result.update(reachable=True, reused=False, latency_ms=round(elapsed * 1000, 3))
+        return result
+    
+    async def probe(self, targets: List[Any], timeout: float = DEFAULT_TIMEOUT,
+                    concurrency: int = DEFAULT_CONCURRENCY, reuse: bool = False) -> Dict[str, Any]:
+        """Probe every target concurrently and summarize the outcome"""
+        parsed: Dict[Target, None] = {}
+        invalid = []
+        for target in targets:
+            try:
+                parsed[parse_target(target)] = None
+            except ValueError as e:
+                invalid.append({'target': str(target), 'reachable': False,
+                                'reason': 'invalid', 'message': str(e)})
+        slots = asyncio.Semaphore(max(1, concurrency))
+        start = time.perf_counter()
+        results = invalid + await asyncio.gather(
+            *(self._probe_one(target, timeout, reuse, slots) for target in parsed)
+        )
+        elapsed = time.perf_counter() - start
+        self.probes += len(parsed)
+        
+        latencies = [result['latency_ms'] for result in results if 'latency_ms' in result]
+        failures = [result for result in results if not result['reachable']]
+        reachable = len(results) - len(failures)
+        reasons: Dict[str, int] = {}
+        for failure in failures:
+            reasons[failure['reason']] = reasons.get(failure['reason'], 0) + 1
+        
+        return {
+            'targets': len(results),
+            'reachable': reachable,
+            'failed': len(failures),
+            # Reported reachable from a pooled connection, not a fresh connect
+            'reused': sum(1 for result in results if result.get('reused')),
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'timeout_ms': round(timeout * 1000, 3),
+            'latency_ms': latency_summary(latencies),
+            'failure_reasons': reasons,
+            'failures': failures
+        }
+    
+    def close(self):
+        """Close every pooled connection"""
+        for target in list(self.pool):
+            self._discard(target)
@@ -0,0 +1,301 @@
+"""Directory Index - In-memory file index with incremental refresh"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import re
+import sys
+import time
+
+class _DirEntry:
+    """Listing of one directory as of its recorded mtime"""
+    
+    __slots__ = ('mtime_ns', 'files', 'subdirs')
+    
+    def __init__(self, mtime_ns: int, files: List[Tuple[str, int, float]], subdirs: List[str]):
+        self.mtime_ns = mtime_ns
+        self.files = files
+        self.subdirs = subdirs
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a path glob to a line-anchored regex
+    
+    '*' and '?' stay within one path component, '**' spans components and
+    '**/' also matches no directory at all.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**', i):
+                i += 2
+                if pattern.startswith('/', i):
+                    i += 1
+                    out.append('(?:[^\\n]*/)?')
+                else:
+                    out.append('[^\\n]*')
+                continue
+            out.append('[^/\\n]*')
+        elif char == '?':
+            out.append('[^/\\n]')
+        elif char == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) else i + 1)
+            if end < 0:
+                out.append('\\[')
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return '^' + ''.join(out) + '$'
+
+def _literal_prefix(pattern: str) -> str:
+    """Part of a glob before its first wildcard"""
+    match = re.search(r'[*?\[]', pattern)
+    return pattern[:match.start()] if match else pattern
+
+def _longest_literal(pattern: str) -> str:
+    """Longest run of a glob containing no wildcard or character class"""
+    runs = re.split(r'\*+|\?|\[[^\]]*\]', pattern)
+    return max(runs, key=len) if runs else ''
+
+class DirectoryIndex:
+    """Index of every file under a root, queryable without touching the disk
+    
+    Paths are kept sorted in one newline-joined string so prefix queries are
+    a bisect and glob queries are a single regex scan over the matching
+    prefix range. Size and mtime have sorted secondary indexes. A refresh
+    re-lists only directories whose mtime changed since the last scan.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self.dirs: Dict[str, _DirEntry] = {}
+        self.paths: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.offsets: List[int] = []
+        self.text = ''
+        self.names = ''
+        self.size_order = array('q')
+        self.sorted_sizes = array('q')
+        self.mtime_order = array('q')
+        self.sorted_mtimes = array('d')
+        self.scanned_at: Optional[float] = None
+        
+    def refresh(self) -> Dict[str, Any]:
+        """Walk the tree, re-listing only directories whose mtime changed"""
+        start = time.perf_counter()
+        dirs: Dict[str, _DirEntry] = {}
+        rescanned = 0
+        stack = ['']
+        
+        while stack:
+            rel = stack.pop()
+            full = os.path.join(self.root, rel) if rel else self.root
+            try:
+                mtime_ns = os.stat(full).st_mtime_ns
+            except OSError:
+                continue
+            
+            entry = self.dirs.get(rel)
+            if entry is None or entry.mtime_ns != mtime_ns:
+                entry = self._list(full, mtime_ns)
+                rescanned += 1
+            dirs[rel] = entry
+            for name in entry.subdirs:
+                stack.append(f'{rel}/{name}' if rel else name)
+        
+        changed = rescanned > 0 or dirs.keys() != self.dirs.keys()
+        self.dirs = dirs
+        if changed:
+            self._rebuild()
+        self.scanned_at = time.time()
+        
+        return {
+            'directories': len(dirs),
+            'rescanned': rescanned,
+            'files': len(self.paths),
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+    
+    def _list(self, full: str, mtime_ns: int) -> _DirEntry:
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(full) as entries:
+                for item in entries:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.name)
+                        elif item.is_file(follow_symlinks=False):
+                            info = item.stat(follow_symlinks=False)
+                            files.append((item.name, info.st_size, info.st_mtime))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return _DirEntry(mtime_ns, files, subdirs)
+    
+    def _rebuild(self):
+        """Recompute the sorted path table and secondary indexes"""
+        rows = []
+        for rel, entry in self.dirs.items():
+            prefix = f'{rel}/' if rel else ''
+            for name, size, mtime in entry.files:
+                rows.append((prefix + name, size, mtime))
+        rows.sort()
+        
+        paths = [row[0] for row in rows]
+        sizes = array('q', (row[1] for row in rows))
+        mtimes = array('d', (row[2] for row in rows))
+        offsets = []
+        position = 0
+        for path in paths:
+            offsets.append(position)
+            position += len(path) + 1
+        
+        size_order = array('q', sorted(range(len(rows)), key=sizes.__getitem__))
+        mtime_order = array('q', sorted(range(len(rows)), key=mtimes.__getitem__))
+        
+        # Swap in complete structures so readers never see a half-built index
+        self.paths, self.sizes, self.mtimes, self.offsets = paths, sizes, mtimes, offsets
+        self.text = '\n'.join(paths)
+        self.names = '\n'.join(path.rpartition('/')[2] for path in paths)
+        self.size_order = size_order
+        self.sorted_sizes = array('q', (sizes[i] for i in size_order))
+        self.mtime_order = mtime_order
+        self.sorted_mtimes = array('d', (mtimes[i] for i in mtime_order))
+    
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        low = bisect_left(self.paths, prefix)
+        high = bisect_left(self.paths, prefix + '\U0010ffff', low)
+        return low, high
+    
+    def _glob(self, pattern: str) -> List[int]:
+        """Indexes of paths matching a glob, in path order"""
+        low, high = self._prefix_range(_literal_prefix(pattern))
+        if low >= high:
+            return []
+        text, offsets, paths = self.text, self.offsets, self.paths
+        start = offsets[low]
+        end = offsets[high - 1] + len(paths[high - 1])
+        
+        # A rare literal is cheaper to find with str.find than by running the
+        # regex over every line; only lines containing it are matched
+        literal = _longest_literal(pattern)
+        if len(literal) >= 2 and text.count(literal, start, end) * 64 < high - low:
+            regex = re.compile(glob_to_regex(pattern))
+            matches = []
+            position = text.find(literal, start, end)
+            while position >= 0:
+                line = bisect_right(offsets, position) - 1
+                if regex.match(paths[line]):
+                    matches.append(line)
+                next_line = line + 1
+                if next_line >= high:
+                    break
+                position = text.find(literal, offsets[next_line], end)
+            return matches
+        
+        # '**/name' only constrains the final component, so scan the much
+        # shorter file-name text instead of the full paths
+        if pattern.startswith('**/') and '/' not in pattern[3:]:
+            return self._scan(self.names, glob_to_regex(pattern[3:]), 0, 0)
+        
+        return self._scan(text, glob_to_regex(pattern), low, start, end)
+    
+    def _scan(self, text: str, pattern: str, line: int, start: int,
+              end: Optional[int] = None) -> List[int]:
+        """One multiline regex scan; line numbers come from counting newlines
+        between consecutive matches"""
+        regex = re.compile(pattern, re.MULTILINE)
+        matches = []
+        position = start
+        count = text.count
+        for match in regex.finditer(text, start, len(text) if end is None else end):
+            line += count('\n', position, match.start())
+            position = match.start()
+            matches.append(line)
+        return matches
+    
+    def query(self, glob: Optional[str] = None, prefix: Optional[str] = None,
+              min_size: Optional[int] = None, max_size: Optional[int] = None,
+              modified_after: Optional[float] = None, modified_before: Optional[float] = None,
+              sort: str = 'path', descending: bool = False, limit: int = 1000) -> Dict[str, Any]:
+        """Return files matching every given filter"""
+        start = time.perf_counter()
+        
+        # Start from the most selective structure available, then filter
+        if glob:
+            candidates = self._glob(glob)
+            if prefix:
+                candidates = [i for i in candidates if self.paths[i].startswith(prefix)]
+        elif prefix is not None:
+            low, high = self._prefix_range(prefix)
+            candidates = range(low, high)
+        elif min_size is not None or max_size is not None:
+            low = bisect_left(self.sorted_sizes, min_size) if min_size is not None else 0
+            high = bisect_right(self.sorted_sizes, max_size) if max_size is not None else len(self.paths)
+            candidates = sorted(self.size_order[low:high])
+        elif modified_after is not None or modified_before is not None:
+            low = bisect_right(self.sorted_mtimes, modified_after) if modified_after is not None else 0
+            high = bisect_left(self.sorted_mtimes, modified_before) if modified_before is not None else len(self.paths)
+            candidates = sorted(self.mtime_order[low:high])
+        else:
+            candidates = range(len(self.paths))
+        
+        sizes, mtimes = self.sizes, self.mtimes
+        matches = [
+            i for i in candidates
+            if (min_size is None or sizes[i] >= min_size)
+            and (max_size is None or sizes[i] <= max_size)
+            and (modified_after is None or mtimes[i] > modified_after)
+            and (modified_before is None or mtimes[i] < modified_before)
+        ]
+        
+        if sort == 'size':
+            matches.sort(key=sizes.__getitem__, reverse=descending)
+        elif sort == 'mtime':
+            matches.sort(key=mtimes.__getitem__, reverse=descending)
+        elif descending:
+            matches.reverse()
+        
+        return {
+            'total': len(matches),
+            'files': [
+                {'path': self.paths[i], 'size': sizes[i], 'mtime': mtimes[i]}
+                for i in matches[:limit]
+            ],
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+    
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index"""
+        total = sys.getsizeof(self.text) + sys.getsizeof(self.names) + sys.getsizeof(self.paths) + sys.getsizeof(self.dirs)
+        total += sum(sys.getsizeof(path) for path in self.paths)
+        total += sys.getsizeof(self.offsets) + sum(sys.getsizeof(offset) for offset in self.offsets)
+        for arr in (self.sizes, self.mtimes, self.size_order,
+                    self.sorted_sizes, self.mtime_order, self.sorted_mtimes):
+            total += sys.getsizeof(arr)
+        for rel, entry in self.dirs.items():
+            total += sys.getsizeof(rel) + sys.getsizeof(entry) + sys.getsizeof(entry.files)
+            total += sys.getsizeof(entry.subdirs)
+            for item in entry.files:
+                total += sys.getsizeof(item) + sys.getsizeof(item[0])
+        return total
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'root': self.root,
+            'directories': len(self.dirs),
+            'files': len(self.paths),
+            'memory_bytes': self.memory_bytes(),
+            'scanned_at': self.scanned_at
+        }
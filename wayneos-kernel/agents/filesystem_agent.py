@@ -1,20 +1,55 @@
-"""FileSystem Agent - Manages file operations and email simulation"""
+"""FileSystem Agent - Manages file operations and the local mailbox"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator
 from datetime import datetime
-import random
+import asyncio
+import base64
+import codecs
+import mmap
+import os
+import sqlite3
 from .base_agent import BaseAgent
+from .directory_index import DirectoryIndex
+from .mail_store import MailStore, default_mail_dir
+
+# Largest file content returned inline in a single response
+DEFAULT_INLINE_LIMIT = 1024 * 1024
+
+# Default size of streamed read chunks and buffered write slices
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+# Most files returned by a single directory query
+MAX_QUERY_LIMIT = 10000
+
+# Emails returned per read_emails page by default and at most
+DEFAULT_EMAIL_PAGE = 50
+MAX_EMAIL_PAGE = 1000
+
+def default_root() -> str:
+    """Sandbox root from WAYNEOS_FS_ROOT, else ~/wayneos"""
+    return os.environ.get('WAYNEOS_FS_ROOT') or os.path.join(os.path.expanduser('~'), 'wayneos')
+
+class SandboxError(ValueError):
+    """Raised when a path resolves outside the sandbox root"""
 
 class FileSystemAgent(BaseAgent):
-    """Handles filesystem operations including email simulation"""
+    """Handles filesystem operations including the local mailbox"""
     
-    def __init__(self):
+    def __init__(self, root: Optional[str] = None, inline_limit: int = DEFAULT_INLINE_LIMIT,
+                 mail_dir: Optional[str] = None):
         super().__init__('filesystem')
         self.capabilities = [
             'read_emails',
             'file_operations',
             'directory_management'
         ]
+        self.root = os.path.realpath(root or default_root())
+        self.inline_limit = inline_limit
+        self.mail_dir = mail_dir or default_mail_dir(self.root)
+        self.mail_store: Optional[MailStore] = None
+        self._mail_lock = asyncio.Lock()
+        self.indexes: Dict[str, DirectoryIndex] = {}
+        self._index_locks: Dict[str, asyncio.Lock] = {}
         
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute filesystem actions"""
@@ -23,93 +58,313 @@ class FileSystemAgent(BaseAgent):
             return await self._read_emails(params)
         elif action == 'file_operation':
             return await self._file_operation(params)
+        elif action == 'directory_operation':
+            return await self._directory_operation(params)
         else:
             return {'error': f'Unknown action: {action}'}
     
     async def _read_emails(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Simulate reading emails"""
+        """Read one page of the mailbox from its header index"""
         category = params.get('category', 'all')
-        
-        # Simulate email data
-        work_emails = [
-            {
-                'from': 'ceo@company.com',
-                'subject': 'Q3 Projections Review',
-                'date': datetime.now().isoformat(),
-                'important': True
-            },
-            {
-                'from': 'team@tanoak.com',
-                'subject': 'Contract Review - Urgent',
-                'date': datetime.now().isoformat(),
-                'important': True
-            }
-        ]
-        
-        personal_emails = [
-            {
-                'from': 'dentist@clinic.com',
-                'subject': 'Appointment Reminder',
-                'date': datetime.now().isoformat(),
-                'important': True
-            },
-            {
-                'from': 'friend@email.com',
-                'subject': 'Weekend Plans',
-                'date': datetime.now().isoformat(),
-                'important': False
+        try:
+            offset = max(0, int(params.get('offset', 0)))
+            limit = min(max(0, int(params.get('limit', DEFAULT_EMAIL_PAGE))), MAX_EMAIL_PAGE)
+            
+            loop = asyncio.get_running_loop()
+            async with self._mail_lock:
+                if self.mail_store is None:
+                    self.mail_store = await loop.run_in_executor(None, MailStore, self.mail_dir)
+            # Only messages delivered or renamed since the last call are read
+            await loop.run_in_executor(None, self.mail_store.sync)
+            page = await loop.run_in_executor(
+                None, self.mail_store.query, category, offset, limit, bool(params.get('unread_only'))
+            )
+        except (OSError, ValueError, TypeError, sqlite3.Error) as e:
+            return {
+                'status': 'error',
+                'message': str(e)
             }
-        ]
-        
-        # Filter based on category
-        if category == 'work':
-            emails = work_emails
-        elif category == 'personal':
-            emails = personal_emails
-        else:
-            emails = work_emails + personal_emails
-        
-        # Add more random emails
-        for i in range(random.randint(10, 20)):
-            emails.append({
-                'from': f'sender{i}@example.com',
-                'subject': f'Email subject {i}',
-                'date': datetime.now().isoformat(),
-                'important': random.choice([True, False])
-            })
         
+        next_offset = offset + len(page['emails'])
         return {
             'status': 'success',
-            'emails': emails,
-            'count': len(emails),
-            'unread': random.randint(5, 15),
-            'important': len([e for e in emails if e.get('important')])
+            'category': category,
+            'emails': page['emails'],
+            'count': len(page['emails']),
+            'total': page['total'],
+            'offset': offset,
+            'next_offset': next_offset if next_offset < page['total'] else None,
+            'unread': page['unread'],
+            'important': page['important']
         }
     
+    def _resolve(self, path: str) -> str:
+        """Map a sandbox path such as /home/user/a.txt to a real path under root"""
+        real = os.path.realpath(os.path.join(self.root, path.lstrip('/')))
+        if real != self.root and not real.startswith(self.root + os.sep):
+            raise SandboxError(f'Path escapes sandbox: {path}')
+        return real
+    
     async def _file_operation(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle file operations"""
         operation = params.get('operation', 'read')
         path = params.get('path', '/home/user/document.txt')
         
-        if operation == 'read':
+        try:
+            real_path = self._resolve(path)
+            if operation == 'read':
+                return await self._read_file(real_path, path, params)
+            elif operation == 'read_range':
+                return await self._read_range(real_path, path, params)
+            elif operation == 'write':
+                return await self._write_file(real_path, path, params)
+            elif operation == 'stat':
+                info = os.stat(real_path)
+                return {
+                    'status': 'success',
+                    'path': path,
+                    'size': info.st_size,
+                    'modified': datetime.fromtimestamp(info.st_mtime).isoformat()
+                }
+            else:
+                return {
+                    'status': 'error',
+                    'message': f'Unknown operation: {operation}'
+                }
+        except (SandboxError, OSError, ValueError) as e:
             return {
-                'status': 'success',
-                'content': 'File content would be here',
-                'size': 1024,
-                'modified': datetime.now().isoformat()
-            }
-        elif operation == 'write':
-            return {
-                'status': 'success',
-                'message': f'File written to {path}',
-                'size': len(params.get('content', ''))
+                'status': 'error',
+                'message': str(e)
             }
-        else:
+    
+    async def _read_file(self, real_path: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a whole file inline, or stream it in chunks when over the inline limit"""
+        encoding = params.get('encoding', 'utf-8')
+        info = os.stat(real_path)
+        limit = min(int(params.get('max_inline', self.inline_limit)), self.inline_limit)
+        result = {
+            'status': 'success',
+            'path': path,
+            'size': info.st_size,
+            'encoding': encoding,
+            'modified': datetime.fromtimestamp(info.st_mtime).isoformat()
+        }
+        
+        if info.st_size <= limit:
+            data = await asyncio.get_running_loop().run_in_executor(None, _read_bytes, real_path)
+            result['content'] = _encode(data, encoding)
+            return result
+        
+        chunk_size = _chunk_size(params, limit, encoding)
+        if not params.get('stream', True):
+            # Callers that aggregate responses get the first window and page on
+            data = await asyncio.get_running_loop().run_in_executor(
+                None, _read_span, real_path, 0, chunk_size
+            )
+            result.update({
+                'status': 'partial',
+                'content': _encode(data, encoding),
+                'next_offset': len(data)
+            })
+            return result
+        
+        result.update({
+            'status': 'streaming',
+            'chunk_size': chunk_size,
+            'chunks': -(-info.st_size // chunk_size),
+            'stream': _stream_chunks(real_path, info.st_size, chunk_size, encoding)
+        })
+        return result
+    
+    async def _read_range(self, real_path: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a byte range through a memory map, capped at the inline limit"""
+        offset = max(0, int(params.get('offset', 0)))
+        length = min(max(0, int(params.get('length', self.inline_limit))), self.inline_limit)
+        encoding = params.get('encoding', 'utf-8')
+        
+        data, size = await asyncio.get_running_loop().run_in_executor(
+            None, _read_mapped, real_path, offset, length
+        )
+        return {
+            'status': 'success',
+            'path': path,
+            'offset': offset,
+            'length': len(data),
+            'size': size,
+            'encoding': encoding,
+            'content': _encode(data, encoding),
+            'next_offset': offset + len(data) if offset + len(data) < size else None
+        }
+    
+    async def _write_file(self, real_path: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Write content in slices; offset or append mode lets clients stream large files"""
+        content = params.get('content', '')
+        encoding = params.get('encoding', 'utf-8')
+        data = base64.b64decode(content) if encoding == 'base64' else content.encode(encoding)
+        mode = params.get('mode', 'overwrite')
+        offset = params.get('offset')
+        
+        size = await asyncio.get_running_loop().run_in_executor(
+            None, _write_bytes, real_path, data, mode, offset
+        )
+        return {
+            'status': 'success',
+            'message': f'File written to {path}',
+            'path': path,
+            'size': len(data),
+            'file_size': size
+        }
+    
+    async def _directory_operation(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Build, query and inspect in-memory indexes of sandbox directories"""
+        operation = params.get('operation', 'query')
+        path = params.get('path', '/')
+        
+        try:
+            real_path = self._resolve(path)
+            if operation == 'index':
+                scan = await self._refresh_index(real_path)
+                return {
+                    'status': 'success',
+                    'path': path,
+                    **scan,
+                    'memory_bytes': self.indexes[real_path].memory_bytes()
+                }
+            elif operation == 'query':
+                return await self._query_index(real_path, path, params)
+            elif operation == 'stats':
+                index = self.indexes.get(real_path)
+                if index is None:
+                    return {'status': 'error', 'message': f'Directory not indexed: {path}'}
+                stats = index.stats()
+                stats.pop('root')
+                return {'status': 'success', 'path': path, **stats}
+            elif operation == 'drop':
+                dropped = self.indexes.pop(real_path, None) is not None
+                self._index_locks.pop(real_path, None)
+                return {'status': 'success', 'path': path, 'dropped': dropped}
+            else:
+                return {
+                    'status': 'error',
+                    'message': f'Unknown operation: {operation}'
+                }
+        except (SandboxError, OSError, ValueError, TypeError) as e:
             return {
                 'status': 'error',
-                'message': f'Unknown operation: {operation}'
+                'message': str(e)
             }
     
+    async def _refresh_index(self, real_path: str) -> Dict[str, Any]:
+        """Create or incrementally refresh the index for a directory"""
+        if not os.path.isdir(real_path):
+            raise NotADirectoryError(f'Not a directory: {real_path}')
+        lock = self._index_locks.setdefault(real_path, asyncio.Lock())
+        async with lock:
+            index = self.indexes.get(real_path) or DirectoryIndex(real_path)
+            scan = await asyncio.get_running_loop().run_in_executor(None, index.refresh)
+            self.indexes[real_path] = index
+            return scan
+    
+    async def _query_index(self, real_path: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a glob/prefix/size/mtime query from memory, indexing on first use"""
+        if real_path not in self.indexes or params.get('refresh'):
+            await self._refresh_index(real_path)
+        index = self.indexes[real_path]
+        
+        limit = min(max(0, int(params.get('limit', 1000))), MAX_QUERY_LIMIT)
+        result = index.query(
+            glob=params.get('glob'),
+            prefix=params.get('prefix'),
+            min_size=params.get('min_size'),
+            max_size=params.get('max_size'),
+            modified_after=params.get('modified_after'),
+            modified_before=params.get('modified_before'),
+            sort=params.get('sort', 'path'),
+            descending=bool(params.get('descending', False)),
+            limit=limit
+        )
+        base = path.rstrip('/')
+        for item in result['files']:
+            item['path'] = f"{base}/{item['path']}"
+        return {
+            'status': 'success',
+            'path': path,
+            'scanned_at': index.scanned_at,
+            **result
+        }
+    
     def get_capabilities(self) -> List[str]:
         """Return agent capabilities"""
-        return self.capabilities
\ No newline at end of file
+        return self.capabilities
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _read_span(path: str, offset: int, length: int) -> bytes:
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+def _read_mapped(path: str, offset: int, length: int):
+    """Slice a file through mmap so only the touched pages are read"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or offset >= size:
+            return b'', size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[offset:offset + length], size
+
+def _write_bytes(path: str, data: bytes, mode: str, offset: Optional[int]) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if offset is not None:
+        file_mode = 'r+b' if os.path.exists(path) else 'wb'
+    else:
+        file_mode = 'ab' if mode == 'append' else 'wb'
+    
+    view = memoryview(data)
+    with open(path, file_mode) as f:
+        if offset is not None:
+            f.seek(int(offset))
+        for start in range(0, len(view), DEFAULT_CHUNK_SIZE):
+            f.write(view[start:start + DEFAULT_CHUNK_SIZE])
+        f.flush()
+        return os.fstat(f.fileno()).st_size
+
+def _chunk_size(params: Dict[str, Any], limit: int, encoding: str) -> int:
+    size = min(max(1, int(params.get('chunk_size', DEFAULT_CHUNK_SIZE))), limit)
+    if encoding == 'base64':
+        # Keep every chunk independently decodable
+        size = max(3, size - size % 3)
+    return size
+
+def _encode(data: bytes, encoding: str) -> str:
+    if encoding == 'base64':
+        return base64.b64encode(data).decode('ascii')
+    return data.decode(encoding, errors='replace')
+
+async def _stream_chunks(path: str, size: int, chunk_size: int,
+                         encoding: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the first size bytes of a file as chunk dicts, reading off the event loop"""
+    loop = asyncio.get_running_loop()
+    # An incremental decoder keeps multi-byte characters split across chunks intact
+    decoder = None if encoding == 'base64' else codecs.getincrementaldecoder(encoding)('replace')
+    with open(path, 'rb') as f:
+        index = 0
+        offset = 0
+        while True:
+            data = await loop.run_in_executor(None, f.read, min(chunk_size, size - offset))
+            final = not data or offset + len(data) >= size
+            content = base64.b64encode(data).decode('ascii') if decoder is None \
+                else decoder.decode(data, final)
+            yield {
+                'index': index,
+                'offset': offset,
+                'length': len(data),
+                'content': content,
+                'final': final
+            }
+            if final:
+                return
+            index += 1
+            offset += len(data)
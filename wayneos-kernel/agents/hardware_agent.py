@@ -1,7 +1,144 @@
 """Hardware Agent - Manages hardware configuration"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
+import glob
+import os
 from .base_agent import BaseAgent
+from .runtime import CPU_COUNT
+from .telemetry import MIN_SAMPLE_INTERVAL
+
+# Runtime settings per profile, applied live through KernelRuntime.configure
+RUNTIME_PROFILES = {
+    # Throughput for many small commands: wide pools, large caches
+    'work': {
+        'thread_pool': min(64, CPU_COUNT * 4),
+        'process_pool': CPU_COUNT,
+        'max_concurrent': 128,
+        'intent_cache': 8192,
+        'sampler_interval': 1.0
+    },
+    # Leave the cores to the game: small kernel footprint, rare sampling
+    'gaming': {
+        'thread_pool': 2,
+        'process_pool': 1,
+        'max_concurrent': 8,
+        'intent_cache': 512,
+        'sampler_interval': 5.0
+    },
+    'balanced': {
+        'thread_pool': min(32, CPU_COUNT + 4),
+        'process_pool': CPU_COUNT,
+        'max_concurrent': 64,
+        'intent_cache': 4096,
+        'sampler_interval': 1.0
+    },
+    'performance': {
+        'thread_pool': min(128, CPU_COUNT * 8),
+        'process_pool': CPU_COUNT,
+        'max_concurrent': 256,
+        'intent_cache': 16384,
+        'sampler_interval': 0.5
+    },
+    'low_power': {
+        'thread_pool': 1,
+        'process_pool': 1,
+        'max_concurrent': 4,
+        'intent_cache': 256,
+        'sampler_interval': 10.0
+    }
+}
+
+# Settings a caller may override on top of a profile, as (minimum, maximum);
+# values outside the range are clamped to it
+SETTING_LIMITS = {
+    'thread_pool': (1, 128),
+    'process_pool': (1, CPU_COUNT),
+    'max_concurrent': (1, 1024),
+    'intent_cache': (0, 65536),
+    'sampler_interval': (MIN_SAMPLE_INTERVAL, 60.0)
+}
+
+def clamp_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Overrides limited to SETTING_LIMITS; raises ValueError for anything else"""
+    clamped = {}
+    for name, value in settings.items():
+        if name not in SETTING_LIMITS:
+            raise ValueError(f"Setting {name} cannot be overridden; allowed: {', '.join(SETTING_LIMITS)}")
+        minimum, maximum = SETTING_LIMITS[name]
+        value = type(minimum)(value)
+        clamped[name] = min(max(value, minimum), maximum)
+    return clamped
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def detect_hardware() -> Dict[str, Any]:
+    """CPU, memory, GPU and block devices as reported by /proc and /sys"""
+    model = None
+    cores = set()
+    clock_mhz = None
+    cpuinfo = _read('/proc/cpuinfo') or ''
+    for line in cpuinfo.splitlines():
+        key, _, value = line.partition(':')
+        key, value = key.strip(), value.strip()
+        if key in ('model name', 'Model', 'Hardware') and model is None:
+            model = value
+        elif key == 'cpu MHz' and clock_mhz is None:
+            clock_mhz = float(value)
+        elif key == 'core id':
+            cores.add(value)
+    physical = len({line for line in cpuinfo.splitlines() if line.startswith('physical id')}) or 1
+    
+    memory = {}
+    for line in (_read('/proc/meminfo') or '').splitlines():
+        key, _, value = line.partition(':')
+        if key in ('MemTotal', 'MemAvailable', 'SwapTotal'):
+            memory[key] = int(value.split()[0]) * 1024
+    
+    gpus = []
+    for card in sorted(glob.glob('/sys/class/drm/card[0-9]')):
+        device = os.path.join(card, 'device')
+        driver = os.path.join(device, 'driver')
+        gpus.append({
+            'card': os.path.basename(card),
+            'vendor': _read(os.path.join(device, 'vendor')),
+            'device': _read(os.path.join(device, 'device')),
+            'driver': os.path.basename(os.readlink(driver)) if os.path.islink(driver) else None
+        })
+    
+    storage = []
+    for block in sorted(glob.glob('/sys/block/*')):
+        name = os.path.basename(block)
+        sectors = _read(os.path.join(block, 'size'))
+        if name.startswith(('loop', 'ram', 'zram')) or not sectors or sectors == '0':
+            continue
+        storage.append({
+            'device': name,
+            'size_bytes': int(sectors) * 512,
+            'rotational': _read(os.path.join(block, 'queue', 'rotational')) == '1',
+            'model': _read(os.path.join(block, 'device', 'model'))
+        })
+    
+    return {
+        'cpu': {
+            'model': model,
+            'cores': len(cores) * physical if cores else CPU_COUNT,
+            'threads': CPU_COUNT,
+            'clock_mhz': clock_mhz
+        },
+        'memory': {
+            'total_bytes': memory.get('MemTotal'),
+            'available_bytes': memory.get('MemAvailable'),
+            'swap_bytes': memory.get('SwapTotal')
+        },
+        'gpu': gpus,
+        'storage': storage
+    }
 
 class HardwareAgent(BaseAgent):
     """Handles hardware optimization and configuration"""
@@ -13,8 +150,8 @@ class HardwareAgent(BaseAgent):
             'get_hardware_info',
             'monitor_performance'
         ]
-        self.current_profile = 'balanced'
-        
+        self.hardware: Optional[Dict[str, Any]] = None
+    
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute hardware actions"""
         
@@ -28,117 +165,75 @@ class HardwareAgent(BaseAgent):
             return {'error': f'Unknown action: {action}'}
     
     async def _optimize_hardware(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Optimize hardware for specific use case"""
-        profile = params.get('profile', 'balanced')
+        """Apply a profile's runtime settings, plus any explicit overrides, live
         
-        profiles = {
-            'work': {
-                'cpu': {
-                    'governor': 'balanced',
-                    'cores': 8,
-                    'turbo': False
-                },
-                'gpu': {
-                    'mode': 'power_saving',
-                    'memory_clock': 'low'
-                },
-                'memory': {
-                    'allocation': '16GB',
-                    'swap': 'enabled'
-                }
-            },
-            'gaming': {
-                'cpu': {
-                    'governor': 'performance',
-                    'cores': 32,
-                    'turbo': True
-                },
-                'gpu': {
-                    'mode': 'maximum_performance',
-                    'memory_clock': 'high'
-                },
-                'memory': {
-                    'allocation': '32GB',
-                    'swap': 'disabled'
-                }
-            },
-            'balanced': {
-                'cpu': {
-                    'governor': 'balanced',
-                    'cores': 16,
-                    'turbo': True
-                },
-                'gpu': {
-                    'mode': 'balanced',
-                    'memory_clock': 'medium'
-                },
-                'memory': {
-                    'allocation': '24GB',
-                    'swap': 'enabled'
-                }
+        The runtime is shared by every session of the process, so the
+        profile applies to, and is reported by, all of them; where that is a
+        daemon's many clients, only its operator can allow the change.
+        """
+        if not self.runtime.tunable:
+            return {
+                'status': 'error',
+                'message': 'Runtime tuning is disabled for shared kernels; the operator can enable it with --allow-tuning'
             }
-        }
+        profile = str(params.get('profile') or 'balanced').lower()
+        if profile not in RUNTIME_PROFILES:
+            profile = 'balanced'
         
-        config = profiles.get(profile, profiles['balanced'])
-        self.current_profile = profile
+        try:
+            overrides = params.get('settings') or {}
+            if not isinstance(overrides, dict):
+                raise TypeError('settings must be an object')
+            settings = {**RUNTIME_PROFILES[profile], **clamp_settings(overrides)}
+            config = self.runtime.configure(**settings)
+        except (TypeError, ValueError) as e:
+            return {
+                'status': 'error',
+                'message': f'Invalid runtime settings: {e}'
+            }
+        self.runtime.profile = profile
         
         return {
             'status': 'configured',
             'profile': profile,
             'configuration': config,
-            'message': f'Hardware optimized for {profile}',
-            'performance_impact': {
-                'cpu_boost': '+25%' if profile == 'gaming' else '0%',
-                'power_usage': '+50%' if profile == 'gaming' else '-20%'
-            }
+            'message': f'Runtime tuned for {profile}'
         }
     
     async def _get_hardware_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Get hardware information"""
+        """Get detected hardware, probed once per agent"""
+        if self.hardware is None or params.get('refresh'):
+            loop = asyncio.get_running_loop()
+            self.hardware = await loop.run_in_executor(None, detect_hardware)
         return {
             'status': 'success',
-            'hardware': {
-                'cpu': {
-                    'model': 'AMD Ryzen 9 3950X',
-                    'cores': 16,
-                    'threads': 32,
-                    'clock': '3.5 GHz'
-                },
-                'memory': {
-                    'total': '32GB',
-                    'available': '24GB',
-                    'type': 'DDR4'
-                },
-                'gpu': {
-                    'model': 'Virtual GPU',
-                    'memory': '8GB',
-                    'driver': 'latest'
-                },
-                'storage': {
-                    'system': '100GB NVMe',
-                    'data': '500GB HDD'
-                }
-            }
+            'hardware': self.hardware
         }
     
     async def _monitor_performance(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Monitor hardware performance"""
-        import random
+        """Monitor hardware performance from the background sampler's history"""
+        sampler = self.runtime.sampler
+        # No-op once running; covers kernels embedded without runtime.start()
+        sampler.start()
+        try:
+            seconds = max(1.0, float(params.get('seconds', 60)))
+        except (TypeError, ValueError):
+            return {
+                'status': 'error',
+                'message': f"Invalid window: {params.get('seconds')}"
+            }
         
         return {
             'status': 'monitoring',
+            'profile': self.runtime.profile,
             'metrics': {
-                'cpu_usage': random.randint(10, 50),
-                'memory_usage': random.randint(20, 60),
-                'gpu_usage': random.randint(0, 30),
-                'temperature': {
-                    'cpu': random.randint(40, 70),
-                    'gpu': random.randint(35, 65)
-                },
-                'ops_per_sec': 313150 + random.randint(-5000, 5000)
-            }
+                **sampler.current(),
+                'ops_per_sec': self.runtime.metrics.ops_per_sec()
+            },
+            'window': sampler.window(seconds),
+            'sampler': sampler.stats()
         }
     
     def get_capabilities(self) -> List[str]:
         """Return agent capabilities"""
-        return self.capabilities
\ No newline at end of file
+        return self.capabilities
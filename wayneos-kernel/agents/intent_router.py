@@ -0,0 +1,85 @@
+"""Intent Router - Precompiled command patterns with a keyword prefilter"""
+
+from typing import Dict, List, Optional, Tuple
+import re
+
+# Characters that end a literal run in a regex pattern
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+
+def required_literal(pattern: str) -> str:
+    """Return a literal substring that every match of the pattern contains
+    
+    Only the leading literal run is used, which is enough for the routing
+    patterns ('open\\s+(\\w+)' -> 'open'). Patterns with a top-level
+    alternation get '' and are never prefiltered.
+    """
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return ''
+        i += 1
+    
+    start = 1 if pattern.startswith('^') else 0
+    literal = []
+    for i in range(start, len(pattern)):
+        if pattern[i] in _REGEX_META:
+            # A quantifier applies to the previous character only
+            if pattern[i] in '?*{' and literal:
+                literal.pop()
+            break
+        literal.append(pattern[i])
+    return ''.join(literal)
+
+class IntentRouter:
+    """Matches commands against an ordered pattern table in a single pass
+    
+    Patterns are compiled once. Each pattern is indexed by its required
+    literal, so a command only runs the regexes whose literal it contains,
+    in the original table order; the first match wins exactly as it does
+    when every pattern is tried in turn.
+    """
+    
+    def __init__(self, command_patterns: Dict[str, List[tuple]]):
+        self.routes: List[Tuple[str, str, re.Pattern]] = []
+        self.unfiltered: List[int] = []
+        self.by_literal: Dict[str, List[int]] = {}
+        
+        for category, patterns in command_patterns.items():
+            for pattern, action in patterns:
+                index = len(self.routes)
+                self.routes.append((category, action, re.compile(pattern)))
+                literal = required_literal(pattern)
+                if literal:
+                    self.by_literal.setdefault(literal, []).append(index)
+                else:
+                    self.unfiltered.append(index)
+    
+    def match(self, text: str) -> Optional[Tuple[str, str, re.Match]]:
+        """Return (category, action, match) for the first matching pattern"""
+        candidates = list(self.unfiltered)
+        for literal, indexes in self.by_literal.items():
+            if literal in text:
+                candidates.extend(indexes)
+        candidates.sort()
+        
+        for index in candidates:
+            category, action, regex = self.routes[index]
+            match = regex.search(text)
+            if match:
+                return category, action, match
+        return None
@@ -0,0 +1,65 @@
+"""LRU Cache - Size-bounded cache with hit, miss and eviction counters"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Hashable
+
+class LRUCache:
+    """Least-recently-used cache holding at most max_size entries
+    
+    A max_size of 0 disables caching; lookups then always miss.
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max(0, max_size)
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it most recently used"""
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries if full"""
+        if self.max_size == 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self._evict()
+    
+    def resize(self, max_size: int):
+        """Change the capacity, evicting entries that no longer fit"""
+        self.max_size = max(0, max_size)
+        self._evict()
+    
+    def clear(self):
+        """Drop every entry; counters are kept"""
+        self.entries.clear()
+    
+    def _evict(self):
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size and counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'maxSize': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+    
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,236 @@
+"""Mail Store - Maildir mailbox with a persistent SQLite header index"""
+
+from datetime import datetime
+from email.parser import BytesHeaderParser
+from email.utils import parseaddr, parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+import mailbox
+import os
+import re
+import sqlite3
+import threading
+import time
+
+INDEX_FILENAME = '.wayneos-index.sqlite'
+
+# Bytes read from each message when indexing; headers rarely exceed this
+HEADER_READ_SIZE = 16 * 1024
+
+# Senders at these domains default to the personal category
+PERSONAL_DOMAINS = frozenset({
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+    'live.com', 'icloud.com', 'me.com', 'aol.com', 'proton.me', 'protonmail.com',
+    'email.com'
+})
+
+PERSONAL_SUBJECT = re.compile(r'\b(appointment|birthday|weekend|family|dinner|party|vacation)\b', re.I)
+URGENT_SUBJECT = re.compile(r'\b(urgent|asap|important|action required)\b', re.I)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS messages (
+    key TEXT PRIMARY KEY,
+    subpath TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    date REAL NOT NULL,
+    category TEXT NOT NULL,
+    important INTEGER NOT NULL,
+    unread INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date DESC);
+CREATE INDEX IF NOT EXISTS messages_category_date ON messages (category, date DESC);
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+def default_mail_dir(root: str) -> str:
+    """Maildir from WAYNEOS_MAIL_DIR, else <sandbox root>/mail"""
+    return os.environ.get('WAYNEOS_MAIL_DIR') or os.path.join(root, 'mail')
+
+def _split_name(name: str) -> Tuple[str, str]:
+    """Split a Maildir file name into its unique key and flags"""
+    key, _, info = name.partition(':')
+    flags = info[2:] if info.startswith('2,') else ''
+    return key, flags
+
+def _classify(headers, sender: str, subject: str, flags: str) -> Tuple[str, bool]:
+    """Category and importance for one message from its headers and flags"""
+    category = (headers.get('X-Category') or '').strip().lower()
+    if not category:
+        domain = sender.rpartition('@')[2].lower()
+        personal = domain in PERSONAL_DOMAINS or PERSONAL_SUBJECT.search(subject)
+        category = 'personal' if personal else 'work'
+    
+    priority = (headers.get('X-Priority') or '').strip()[:1]
+    importance = (headers.get('Importance') or headers.get('Priority') or '').strip().lower()
+    important = (
+        'F' in flags
+        or priority in ('1', '2')
+        or importance in ('high', 'urgent')
+        or bool(URGENT_SUBJECT.search(subject))
+    )
+    return category, important
+
+class MailStore:
+    """Header index over a Maildir, kept in SQLite next to the mail
+    
+    sync() compares the new/ and cur/ directory mtimes with the last sync
+    and, when either changed, lists file names only. Messages are parsed
+    once, when their key first appears; renames that only change flags
+    (read, flagged) update the stored row without re-reading the file.
+    """
+    
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Creates new/, cur/ and tmp/ for an empty store
+        self.maildir = mailbox.Maildir(path, factory=None, create=True)
+        self.index_path = index_path or os.path.join(path, INDEX_FILENAME)
+        self.db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.parser = BytesHeaderParser()
+    
+    def close(self):
+        with self.lock:
+            self.db.close()
+    
+    def _state(self, name: str) -> Optional[int]:
+        row = self.db.execute('SELECT value FROM state WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+    
+    def sync(self) -> Dict[str, Any]:
+        """Bring the index up to date with the Maildir"""
+        with self.lock:
+            return self._sync()
+    
+    def _sync(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        mtimes = {}
+        for subdir in ('new', 'cur'):
+            mtimes[subdir] = os.stat(os.path.join(self.path, subdir)).st_mtime_ns
+        if all(self._state(f'{subdir}_mtime') == mtime for subdir, mtime in mtimes.items()):
+            return {'added': 0, 'updated': 0, 'removed': 0, 'elapsed_ms': 0.0}
+        
+        on_disk: Dict[str, Tuple[str, str]] = {}
+        for subdir in ('new', 'cur'):
+            with os.scandir(os.path.join(self.path, subdir)) as entries:
+                for item in entries:
+                    if item.name.startswith('.'):
+                        continue
+                    key, flags = _split_name(item.name)
+                    on_disk[key] = (f'{subdir}/{item.name}', flags)
+        
+        indexed = dict(self.db.execute('SELECT key, subpath FROM messages'))
+        added, updated = [], []
+        complete = True
+        for key, (subpath, flags) in on_disk.items():
+            previous = indexed.pop(key, None)
+            if previous is None:
+                row = self._parse(key, subpath, flags)
+                if row is None:
+                    complete = False
+                else:
+                    added.append(row)
+            elif previous != subpath:
+                unread = subpath.startswith('new/') or 'S' not in flags
+                updated.append((subpath, int(unread), int('F' in flags), key))
+        removed = [(key,) for key in indexed]
+        
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)', added)
+            # A flagged rename can only raise importance, never clear a header-derived one
+            self.db.executemany(
+                'UPDATE messages SET subpath = ?, unread = ?, important = MAX(important, ?) WHERE key = ?',
+                updated
+            )
+            self.db.executemany('DELETE FROM messages WHERE key = ?', removed)
+            # Leave the mtimes stale after a missed message so the next sync relists
+            self.db.executemany(
+                'INSERT OR REPLACE INTO state VALUES (?, ?)',
+                [(f'{subdir}_mtime', mtime) for subdir, mtime in mtimes.items()] if complete else []
+            )
+        
+        return {
+            'added': len(added),
+            'updated': len(updated),
+            'removed': len(removed),
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+    
+    def _parse(self, key: str, subpath: str, flags: str) -> Optional[Tuple]:
+        """Index row for one message, read from its header block only"""
+        full = os.path.join(self.path, subpath)
+        try:
+            with open(full, 'rb') as f:
+                head = f.read(HEADER_READ_SIZE)
+            mtime = os.stat(full).st_mtime
+        except OSError:
+            # Moved or deleted since the listing
+            return None
+        end = head.find(b'\n\n')
+        if end < 0:
+            end = head.find(b'\r\n\r\n')
+        headers = self.parser.parsebytes(head[:end] if end >= 0 else head)
+        
+        sender = parseaddr(str(headers.get('From', '')))[1] or str(headers.get('From', ''))
+        subject = ' '.join(str(headers.get('Subject', '')).split())
+        try:
+            date = parsedate_to_datetime(str(headers['Date'])).timestamp()
+        except (KeyError, TypeError, ValueError, IndexError):
+            date = mtime
+        category, important = _classify(headers, sender, subject, flags)
+        unread = subpath.startswith('new/') or 'S' not in flags
+        return (key, subpath, sender, subject, date, category, int(important), int(unread))
+    
+    def query(self, category: str = 'all', offset: int = 0, limit: int = 50,
+              unread_only: bool = False) -> Dict[str, Any]:
+        """One page of messages, newest first, with counts for the whole filter"""
+        where, args = [], []
+        if category and category != 'all':
+            where.append('category = ?')
+            args.append(category)
+        if unread_only:
+            where.append('unread = 1')
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        
+        with self.lock:
+            total, unread, important = self.db.execute(
+                f'SELECT COUNT(*), COALESCE(SUM(unread), 0), COALESCE(SUM(important), 0) '
+                f'FROM messages {clause}', args
+            ).fetchone()
+            rows = self.db.execute(
+                f'SELECT key, sender, subject, date, category, important, unread '
+                f'FROM messages {clause} ORDER BY date DESC, key LIMIT ? OFFSET ?',
+                args + [limit, offset]
+            ).fetchall()
+        
+        return {
+            'total': total,
+            'unread': unread,
+            'important': important,
+            'emails': [
+                {
+                    'id': key,
+                    'from': sender,
+                    'subject': subject,
+                    'date': datetime.fromtimestamp(date).isoformat(),
+                    'category': category,
+                    'important': bool(is_important),
+                    'unread': bool(is_unread)
+                }
+                for key, sender, subject, date, category, is_important, is_unread in rows
+            ]
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            categories = dict(self.db.execute('SELECT category, COUNT(*) FROM messages GROUP BY category'))
+        return {
+            'path': self.path,
+            'messages': sum(categories.values()),
+            'categories': categories,
+            'index_bytes': os.path.getsize(self.index_path)
+        }
@@ -0,0 +1,148 @@
+"""Metrics - Low-overhead call counters and latency histograms"""
+
+from typing import Dict, Any, Tuple
+import time
+
+# Log-linear bucket layout: 2**SUB_BITS linear sub-buckets per power of two
+SUB_BITS = 3
+SUB_BUCKETS = 1 << SUB_BITS
+# Enough buckets to cover one microsecond up to roughly 2**40 us (12 days)
+BUCKET_COUNT = (40 - SUB_BITS) * SUB_BUCKETS
+
+# Shared histogram for command types and actions nobody registered, so a
+# client sending arbitrary names cannot grow the statistics without bound
+OTHER = 'other'
+
+def _bucket_index(micros: int) -> int:
+    """Bucket holding a latency in whole microseconds"""
+    if micros < 2 * SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BITS - 1
+    index = (shift + 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+def _bucket_upper(index: int) -> int:
+    """Exclusive upper bound of a bucket in microseconds"""
+    if index < 2 * SUB_BUCKETS:
+        return index + 1
+    shift = index // SUB_BUCKETS - 1
+    return (SUB_BUCKETS + index % SUB_BUCKETS + 1) << shift
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with about 12% relative bucket error"""
+    
+    __slots__ = ('counts', 'count', 'errors', 'total', 'max')
+    
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        
+    def record(self, seconds: float, error: bool = False):
+        """Add one observation"""
+        self.counts[_bucket_index(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+    
+    def percentile(self, fraction: float) -> float:
+        """Latency in seconds at or below which the given fraction falls"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(fraction * self.count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(_bucket_upper(index) / 1_000_000, self.max)
+        return self.max
+    
+    def summary(self) -> Dict[str, Any]:
+        """Counts and latency percentiles in milliseconds"""
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50) * 1000, 3),
+            'p90_ms': round(self.percentile(0.90) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+class ThroughputWindow:
+    """Events per second over a sliding window of one-second slots"""
+    
+    def __init__(self, window_seconds: int = 60):
+        self.window = max(1, window_seconds)
+        self.seconds = [-1] * self.window
+        self.counts = [0] * self.window
+        self.started = time.monotonic()
+        
+    def add(self, now: float):
+        second = int(now)
+        slot = second % self.window
+        if self.seconds[slot] != second:
+            self.seconds[slot] = second
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+    
+    def rate(self) -> float:
+        """Average events per second over the window (or uptime if shorter)"""
+        now = time.monotonic()
+        oldest = int(now) - self.window
+        total = sum(
+            count for second, count in zip(self.seconds, self.counts) if second > oldest
+        )
+        span = min(float(self.window), max(now - self.started, 1.0))
+        return total / span
+
+class KernelMetrics:
+    """Per-command-type and per-agent-action latency and error statistics"""
+    
+    def __init__(self, window_seconds: int = 60):
+        self.commands: Dict[str, LatencyHistogram] = {}
+        self.actions: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.throughput = ThroughputWindow(window_seconds)
+        self.start_time = time.monotonic()
+        
+    def record_action(self, agent: str, action: str, seconds: float, error: bool = False):
+        """Record one agent call"""
+        histogram = self.actions.get((agent, action))
+        if histogram is None:
+            histogram = self.actions[(agent, action)] = LatencyHistogram()
+        histogram.record(seconds, error)
+    
+    def record_command(self, command_type: str, seconds: float, error: bool = False):
+        """Record one bridge command and count it towards throughput"""
+        histogram = self.commands.get(command_type)
+        if histogram is None:
+            histogram = self.commands[command_type] = LatencyHistogram()
+        histogram.record(seconds, error)
+        self.throughput.add(time.monotonic())
+    
+    def ops_per_sec(self) -> float:
+        """Measured commands per second over the sliding window"""
+        return self.throughput.rate()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """All statistics as plain data"""
+        agents: Dict[str, Dict[str, Any]] = {}
+        for (agent, action), histogram in sorted(self.actions.items()):
+            agents.setdefault(agent, {})[action] = histogram.summary()
+        return {
+            'uptime': round(time.monotonic() - self.start_time, 3),
+            'throughput': {
+                'window_seconds': self.throughput.window,
+                'ops_per_sec': round(self.ops_per_sec(), 3)
+            },
+            'commands': {
+                command_type: histogram.summary()
+                for command_type, histogram in sorted(self.commands.items())
+            },
+            'agents': agents
+        }
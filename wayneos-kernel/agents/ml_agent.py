@@ -2,7 +2,15 @@
 
 from typing import Dict, Any, List
 from datetime import datetime
+import asyncio
+import re
 from .base_agent import BaseAgent
+from .task_extraction import TaskExtractor
+
+DEFAULT_TASK_LIMIT = 50
+
+# Mailboxes at least this large are classified off the event loop
+OFFLOAD_THRESHOLD = 5000
 
 class MLAgent(BaseAgent):
     """Handles ML-related operations like task generation"""
@@ -14,7 +22,8 @@ class MLAgent(BaseAgent):
             'analyze_patterns',
             'predict_usage'
         ]
-        
+        self.extractor = TaskExtractor()
+    
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute ML actions"""
         
@@ -28,81 +37,53 @@ class MLAgent(BaseAgent):
             return {'error': f'Unknown action: {action}'}
     
     async def _generate_task_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate task list from emails and context"""
+        """Generate a ranked task list from emails"""
         source = params.get('source', {})
+        emails = source.get('emails', []) if isinstance(source, dict) else []
         
-        # Extract tasks from email data
-        tasks = []
-        
-        # High priority tasks from important emails
-        if isinstance(source, dict) and 'emails' in source:
-            for email in source['emails']:
-                if email.get('important'):
-                    if 'Q3' in email.get('subject', ''):
-                        tasks.append({
-                            'priority': 'high',
-                            'task': 'Reply to CEO about Q3 projections',
-                            'due': 'today',
-                            'category': 'work'
-                        })
-                    elif 'Contract' in email.get('subject', ''):
-                        tasks.append({
-                            'priority': 'high',
-                            'task': 'Review contract from TanOak',
-                            'due': 'today',
-                            'category': 'work'
-                        })
-                    elif 'Appointment' in email.get('subject', ''):
-                        tasks.append({
-                            'priority': 'medium',
-                            'task': 'Schedule dentist appointment',
-                            'due': 'this week',
-                            'category': 'personal'
-                        })
-        
-        # Add some general tasks
-        tasks.extend([
-            {
-                'priority': 'medium',
-                'task': 'Prepare for Grant Hooper meeting',
-                'due': 'Friday',
-                'category': 'work'
-            },
-            {
-                'priority': 'low',
-                'task': 'Update project documentation',
-                'due': 'end of week',
-                'category': 'work'
-            }
-        ])
+        try:
+            extractor = self.extractor
+            if params.get('rules') or params.get('weights'):
+                extractor = extractor.with_overrides(params.get('rules'), params.get('weights'))
+            limit = max(0, int(params.get('limit', DEFAULT_TASK_LIMIT)))
+            if len(emails) >= OFFLOAD_THRESHOLD:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None, extractor.extract, emails, limit
+                )
+            else:
+                result = extractor.extract(emails, limit)
+        except (KeyError, IndexError, TypeError, ValueError, re.error) as e:
+            return {'status': 'error', 'message': f'Invalid task rules: {e}'}
         
+        tasks = result['tasks']
         return {
             'status': 'success',
             'tasks': tasks,
-            'summary': f'Generated {len(tasks)} tasks from analysis',
-            'date': datetime.now().strftime('%Y-%m-%d')
+            'scanned': len(emails),
+            'matched': result['matched'],
+            'duplicates': result['duplicates'],
+            'summary': f'Generated {len(tasks)} tasks from {len(emails)} emails',
+            'date': params.get('date') or datetime.now().strftime('%Y-%m-%d')
         }
     
     async def _analyze_patterns(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze usage patterns"""
+        """Analyze usage patterns from the kernel's usage model"""
+        usage = getattr(self.runtime, 'usage', None)
+        if usage is None:
+            return {'status': 'error', 'message': 'Usage model unavailable'}
         return {
             'status': 'success',
-            'patterns': {
-                'peak_hours': '9-11 AM',
-                'common_tasks': ['email', 'browser', 'documents'],
-                'efficiency': 0.87
-            }
+            'patterns': usage.patterns(max(1, int(params.get('top', 10))))
         }
     
     async def _predict_usage(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Predict future usage"""
+        """Predict next-hour usage from the kernel's usage model"""
+        usage = getattr(self.runtime, 'usage', None)
+        if usage is None:
+            return {'status': 'error', 'message': 'Usage model unavailable'}
         return {
             'status': 'success',
-            'predictions': {
-                'next_hour': 'high activity',
-                'suggested_optimization': 'performance mode',
-                'confidence': 0.92
-            }
+            'predictions': usage.predict()
         }
     
     def get_capabilities(self) -> List[str]:
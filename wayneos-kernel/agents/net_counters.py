@@ -0,0 +1,105 @@
+"""Net Counters - Interface traffic rates and TCP states from /proc/net"""
+
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+import re
+import time
+
+# Snapshots of /proc/net/dev kept for windowed rates
+DEFAULT_HISTORY = 300
+
+TCP_TABLES = ('/proc/net/tcp', '/proc/net/tcp6')
+
+# include/net/tcp_states.h
+TCP_STATES = {
+    b'01': 'established', b'02': 'syn_sent', b'03': 'syn_recv', b'04': 'fin_wait1',
+    b'05': 'fin_wait2', b'06': 'time_wait', b'07': 'close', b'08': 'close_wait',
+    b'09': 'last_ack', b'0A': 'listen', b'0B': 'closing', b'0C': 'new_syn_recv'
+}
+
+# The state is the two hex digits after the remote port; nothing else in a
+# row is a colon, four hex digits and a space, so one match per socket
+_STATE = re.compile(rb':[0-9A-F]{4} ([0-9A-F]{2}) ')
+
+# /proc/net/dev columns kept per interface
+FIELDS = ('rx_bytes', 'rx_packets', 'rx_errors', 'rx_drops',
+          'tx_bytes', 'tx_packets', 'tx_errors', 'tx_drops')
+
+Counters = Dict[str, Tuple[int, ...]]
+
+def read_interfaces(path: str = '/proc/net/dev') -> Counters:
+    """Counters per interface, in FIELDS order"""
+    interfaces = {}
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()[2:]
+    for line in lines:
+        name, _, rest = line.partition(b':')
+        values = rest.split()
+        interfaces[name.strip().decode()] = (
+            int(values[0]), int(values[1]), int(values[2]), int(values[3]),
+            int(values[8]), int(values[9]), int(values[10]), int(values[11])
+        )
+    return interfaces
+
+def count_tcp_states(paths=TCP_TABLES) -> Dict[str, int]:
+    """Sockets per TCP state across the given tables, one regex pass each"""
+    counts: Counter = Counter()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                counts.update(_STATE.findall(f.read()))
+        except OSError:
+            # No IPv6 in this kernel or namespace
+            continue
+    return {TCP_STATES.get(code, code.decode()): count for code, count in counts.items()}
+
+def _rates(old: Tuple[int, ...], new: Tuple[int, ...], seconds: float) -> Dict[str, float]:
+    rates = {}
+    for name, before, after in zip(FIELDS, old, new):
+        # A counter that went backwards was reset (interface recreated)
+        delta = after - before if after >= before else after
+        rates[name] = round(delta / seconds, 2)
+    return rates
+
+class TrafficMonitor:
+    """Bounded history of /proc/net/dev snapshots
+    
+    Each sample() appends one (time, counters) snapshot; rates are deltas
+    between the newest snapshot and the oldest one inside the requested
+    window, so a client polling every second gets per-second rates and a
+    longer window smooths them without any extra reads.
+    """
+    
+    def __init__(self, history: int = DEFAULT_HISTORY):
+        self.snapshots: deque = deque(maxlen=max(2, history))
+    
+    def sample(self) -> Counters:
+        counters = read_interfaces()
+        self.snapshots.append((time.monotonic(), counters))
+        return counters
+    
+    def rates(self, seconds: Optional[float] = None) -> Tuple[float, Dict[str, Dict[str, float]]]:
+        """(elapsed, per-interface rates) between the newest snapshot and the window start"""
+        if len(self.snapshots) < 2:
+            return 0.0, {}
+        newest_time, newest = self.snapshots[-1]
+        start_time, start = self.snapshots[-2]
+        if seconds is not None:
+            for stamp, counters in reversed(self.snapshots):
+                if newest_time - stamp > seconds:
+                    break
+                if stamp < newest_time:
+                    start_time, start = stamp, counters
+        elapsed = newest_time - start_time
+        if elapsed <= 0:
+            return 0.0, {}
+        return elapsed, {
+            name: _rates(start[name], counters, elapsed)
+            for name, counters in newest.items() if name in start
+        }
+    
+    def span(self) -> float:
+        """Seconds covered by the history"""
+        if len(self.snapshots) < 2:
+            return 0.0
+        return self.snapshots[-1][0] - self.snapshots[0][0]
@@ -1,8 +1,15 @@
 """Network Agent - Manages network operations"""
 
 from typing import Dict, Any, List
-import random
+import asyncio
 from .base_agent import BaseAgent
+from .connectivity import (
+    ConnectivityProber, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, configured_targets
+)
+from .net_counters import FIELDS, TrafficMonitor, count_tcp_states
+
+# Seconds between the two samples taken when there is no earlier one
+FIRST_SAMPLE_DELAY = 0.25
 
 class NetworkAgent(BaseAgent):
     """Handles network-related operations"""
@@ -14,7 +21,9 @@ class NetworkAgent(BaseAgent):
             'configure_network',
             'monitor_traffic'
         ]
-        
+        self.prober = ConnectivityProber()
+        self.traffic = TrafficMonitor()
+    
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute network actions"""
         
@@ -28,15 +37,28 @@ class NetworkAgent(BaseAgent):
             return {'error': f'Unknown action: {action}'}
     
     async def _check_connectivity(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Check network connectivity"""
-        return {
-            'status': 'connected',
-            'internet': True,
-            'latency': random.randint(10, 50),
-            'speed': {
-                'download': random.randint(50, 500),
-                'upload': random.randint(10, 100)
+        """Check network connectivity by probing TCP endpoints concurrently"""
+        targets = params.get('targets') or configured_targets()
+        if isinstance(targets, str):
+            targets = [item.strip() for item in targets.split(',') if item.strip()]
+        try:
+            report = await self.prober.probe(
+                targets,
+                timeout=max(0.001, float(params.get('timeout', DEFAULT_TIMEOUT))),
+                concurrency=int(params.get('concurrency', DEFAULT_CONCURRENCY)),
+                reuse=bool(params.get('reuse', False))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            return {
+                'status': 'error',
+                'message': f'Invalid targets: {e}'
             }
+        
+        return {
+            'status': 'connected' if report['reachable'] else 'disconnected',
+            'internet': report['reachable'] > 0,
+            'latency': report['latency_ms']['p50'],
+            **report
         }
     
     async def _configure_network(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -50,13 +72,51 @@ class NetworkAgent(BaseAgent):
         }
     
     async def _monitor_traffic(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Monitor network traffic"""
+        """Monitor interface rates and TCP connection states from /proc/net"""
+        try:
+            seconds = float(params['seconds']) if params.get('seconds') is not None else None
+        except (TypeError, ValueError):
+            return {
+                'status': 'error',
+                'message': f"Invalid window: {params.get('seconds')}"
+            }
+        include_loopback = bool(params.get('include_loopback', False))
+        
+        loop = asyncio.get_running_loop()
+        try:
+            # Large socket tables take milliseconds to read; keep them off the loop
+            states = loop.run_in_executor(None, count_tcp_states)
+            if not self.traffic.snapshots:
+                self.traffic.sample()
+                await asyncio.sleep(FIRST_SAMPLE_DELAY)
+            counters = self.traffic.sample()
+            states = await states
+        except OSError as e:
+            return {
+                'status': 'error',
+                'message': f'Network counters unavailable: {e}'
+            }
+        elapsed, rates = self.traffic.rates(seconds)
+        
+        interfaces = {
+            name: {**rates.get(name, {}), 'totals': dict(zip(FIELDS, values))}
+            for name, values in counters.items()
+        }
+        counted = [rates[name] for name in rates if include_loopback or name != 'lo']
+        
         return {
             'status': 'monitoring',
             'traffic': {
-                'incoming': random.randint(1000, 10000),
-                'outgoing': random.randint(500, 5000),
-                'connections': random.randint(10, 50)
+                'incoming': round(sum(rate['rx_bytes'] for rate in counted), 2),
+                'outgoing': round(sum(rate['tx_bytes'] for rate in counted), 2),
+                'connections': states.get('established', 0)
+            },
+            'interfaces': interfaces,
+            'tcp_states': states,
+            'interval_seconds': round(elapsed, 3),
+            'history': {
+                'samples': len(self.traffic.snapshots),
+                'span_seconds': round(self.traffic.span(), 3)
             }
         }
     
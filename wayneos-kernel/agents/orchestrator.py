@@ -1,16 +1,51 @@
 """Orchestrator - Coordinates all agents and routes commands"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import asyncio
+import json
 import re
+import time
 from datetime import datetime
+from .intent_router import IntentRouter
+from .lru_cache import LRUCache
+from .metrics import KernelMetrics, OTHER
+from .plan import PlanStep, run_plan
+from .policy import PolicyEngine, DEFAULT_USER
+from .usage_model import UsageModel
+
+# Default number of parsed intents kept in the orchestrator's LRU cache
+DEFAULT_INTENT_CACHE_SIZE = 4096
+
+# Most recent emails a task-list command mines for tasks
+TASK_EMAIL_WINDOW = 1000
+
+def normalize_command(command: str) -> str:
+    """Lowercase a command and collapse runs of whitespace"""
+    return ' '.join(command.lower().split())
+
+# Separators between the clauses of a composite command
+CLAUSE_SEPARATOR = re.compile(r'\s*(?:[,;]|\band then\b|\bthen\b|\band\b)\s*', re.IGNORECASE)
 
 class Orchestrator:
     """Main orchestrator that routes commands to appropriate agents"""
     
-    def __init__(self, distribution: str):
+    def __init__(self, distribution: str, intent_cache_size: int = DEFAULT_INTENT_CACHE_SIZE,
+                 metrics: Optional[KernelMetrics] = None, usage: Optional[UsageModel] = None,
+                 policy: Optional[PolicyEngine] = None):
         self.distribution = distribution
+        self.metrics = metrics or KernelMetrics()
+        self.usage = usage
+        # Consulted before every filesystem and process action
+        self.policy = policy
         self.command_patterns = self._build_command_patterns()
+        self.router = IntentRouter(self.command_patterns)
+        self.intent_cache = LRUCache(intent_cache_size)
+        
+    def register_patterns(self, category: str, patterns: List[tuple]):
+        """Add routing patterns for a category and recompile the router"""
+        self.command_patterns.setdefault(category, []).extend(patterns)
+        self.router = IntentRouter(self.command_patterns)
+        self.intent_cache.clear()
         
     def _build_command_patterns(self) -> Dict[str, List[tuple]]:
         """Build regex patterns for command routing"""
@@ -39,51 +74,36 @@ class Orchestrator:
                 (r'create.*file', 'file_operation'),
                 (r'read.*file', 'file_operation'),
                 (r'save.*file', 'file_operation')
+            ],
+            'security': [
+                (r'scan.*(threat|virus|malware)', 'scan_threats')
+            ],
+            'usage': [
+                (r'predict.*(usage|load|activity)', 'predict_usage'),
+                (r'analy[sz]e.*(usage|patterns)', 'analyze_patterns')
             ]
         }
     
     async def execute(self, command: str, params: Dict[str, Any], agents: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a command by routing to appropriate agent(s)"""
         
-        # Parse command intent
-        intent = self._parse_intent(command)
+        # Parse command intent; composite commands yield one intent per clause
+        intents = self._parse_clauses(command) or [self._parse_intent(command)]
+        steps = self._build_plan(intents, params)
         
         # Route to appropriate agent(s)
-        if intent['category'] == 'email':
-            agent = agents.get('filesystem')
-            if agent:
-                return await agent.execute(intent['action'], {
-                    **params,
-                    'category': intent.get('filter', 'all')
-                })
-                
-        elif intent['category'] == 'task':
-            ml_agent = agents.get('ml')
-            fs_agent = agents.get('filesystem')
-            if ml_agent and fs_agent:
-                # First read emails
-                emails = await fs_agent.execute('read_emails', {'category': 'all'})
-                # Then create task list
-                return await ml_agent.execute('generate_task_list', {
-                    'source': emails,
-                    'date': datetime.now().strftime('%Y-%m-%d')
-                })
-                
-        elif intent['category'] == 'application':
-            agent = agents.get('process')
-            if agent:
-                return await agent.execute('launch_application', {
-                    'app': intent.get('target', 'firefox'),
-                    'url': params.get('url')
-                })
-                
-        elif intent['category'] == 'hardware':
-            agent = agents.get('hardware')
-            if agent:
-                return await agent.execute('optimize_hardware', {
-                    'profile': intent.get('target', 'work'),
-                    'duration': params.get('duration')
-                })
+        if steps and all(step.agent in agents for step in steps):
+            if len(steps) == 1:
+                step = steps[0]
+                return await self.invoke(agents, step.agent, step.action, step.params)
+            
+            plan = await self.run_steps(steps, agents)
+            if len(intents) == 1:
+                # A single multi-step intent answers with its final result
+                final = plan['steps'][-1]
+                if final['status'] == 'completed':
+                    return {**final['result'], 'plan': self._plan_timing(plan)}
+            return plan
         
         # Fallback response
         return {
@@ -94,36 +114,195 @@ class Orchestrator:
             }
         }
     
+    async def invoke(self, agents: Dict[str, Any], agent_name: str, action: str,
+                     params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single agent action and record its latency"""
+        agent = agents.get(agent_name)
+        if agent is None:
+            return {'error': f'Unknown agent: {agent_name}'}
+        if self.policy is not None:
+            # The session's user, bound when it opened; params cannot change it
+            user = getattr(agents, 'user', DEFAULT_USER)
+            denied = self.policy.authorize(self.distribution, agent_name, action, params, user)
+            if denied is not None:
+                self._record(agent_name, action, 0.0, True)
+                return denied
+        
+        start = time.perf_counter()
+        try:
+            result = await agent.execute(action, params)
+        except Exception:
+            self._record(agent_name, action, time.perf_counter() - start, True)
+            raise
+        failed = isinstance(result, dict) and ('error' in result or result.get('status') == 'error')
+        if failed and str(result.get('error', '')).startswith('Unknown action'):
+            action = OTHER
+        self._record(agent_name, action, time.perf_counter() - start, failed)
+        return result
+    
+    def _record(self, agent_name: str, action: str, seconds: float, failed: bool):
+        self.metrics.record_action(agent_name, action, seconds, failed)
+        if self.usage is not None:
+            self.usage.record(agent_name, action, seconds, failed)
+    
+    def warm(self, commands: List[str]) -> int:
+        """Parse commands ahead of time so their intents are cached"""
+        for command in commands:
+            self._parse_intent(command)
+        return len(commands)
+    
+    async def run_steps(self, steps: List[Any], agents: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a plan given as PlanStep objects or plain dicts"""
+        steps = [step if isinstance(step, PlanStep) else PlanStep(**step) for step in steps]
+        
+        async def invoke(agent_name: str, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+            # Plan results are aggregated into one response, so nothing may stream
+            return await self.invoke(agents, agent_name, action, {**params, 'stream': False})
+        
+        return await run_plan(steps, invoke)
+    
+    def _parse_clauses(self, command: str) -> List[Dict[str, Any]]:
+        """Split a composite command into per-clause intents
+        
+        Returns an empty list unless there are at least two clauses and every
+        one of them routes somewhere, so ordinary commands are untouched.
+        """
+        clauses = [clause for clause in CLAUSE_SEPARATOR.split(command) if clause]
+        if len(clauses) < 2:
+            return []
+        intents = [self._parse_intent(clause) for clause in clauses]
+        if any(intent['category'] == 'general' for intent in intents):
+            return []
+        return intents
+    
+    def _build_plan(self, intents: List[Dict[str, Any]], params: Dict[str, Any]) -> Optional[List[PlanStep]]:
+        """Turn intents into plan steps, sharing identical steps between clauses"""
+        steps: List[PlanStep] = []
+        seen: Dict[str, str] = {}
+        
+        for index, intent in enumerate(intents):
+            suffix = f'-{index}' if len(intents) > 1 else ''
+            intent_steps = self._steps_for_intent(intent, params, suffix)
+            if intent_steps is None:
+                return None
+            
+            renamed: Dict[str, str] = {}
+            for step in intent_steps:
+                step.inputs = {name: renamed.get(ref, ref) for name, ref in step.inputs.items()}
+                signature = json.dumps(
+                    [step.agent, step.action, step.params, step.inputs],
+                    sort_keys=True, default=str
+                )
+                if signature in seen:
+                    renamed[step.id] = seen[signature]
+                    continue
+                seen[signature] = step.id
+                steps.append(step)
+        
+        return steps
+    
+    def _steps_for_intent(self, intent: Dict[str, Any], params: Dict[str, Any],
+                          suffix: str) -> Optional[List[PlanStep]]:
+        """Plan steps for one intent, or None if it has no agent route"""
+        category = intent['category']
+        
+        if category == 'email':
+            return [PlanStep(f'emails{suffix}', 'filesystem', intent['action'], {
+                **params,
+                'category': intent.get('filter', 'all')
+            })]
+        
+        elif category == 'task':
+            # First read emails, then create the task list from them
+            emails = f'emails{suffix}'
+            return [
+                PlanStep(emails, 'filesystem', 'read_emails', {
+                    'category': 'all',
+                    'limit': TASK_EMAIL_WINDOW
+                }),
+                PlanStep(f'tasks{suffix}', 'ml', 'generate_task_list', {
+                    'date': datetime.now().strftime('%Y-%m-%d')
+                }, inputs={'source': emails})
+            ]
+        
+        elif category == 'application':
+            return [PlanStep(f'application{suffix}', 'process', 'launch_application', {
+                'app': intent.get('target', 'firefox'),
+                'url': params.get('url')
+            })]
+        
+        elif category == 'hardware':
+            return [PlanStep(f'hardware{suffix}', 'hardware', 'optimize_hardware', {
+                'profile': intent.get('target', 'work'),
+                'duration': params.get('duration')
+            })]
+        
+        elif category == 'security':
+            return [PlanStep(f'security{suffix}', 'security', intent['action'], dict(params))]
+        
+        elif category == 'usage':
+            return [PlanStep(f'usage{suffix}', 'ml', intent['action'], dict(params))]
+        
+        elif category == 'file':
+            command = normalize_command(intent['raw_command'])
+            return [PlanStep(f'file{suffix}', 'filesystem', intent['action'], {
+                **params,
+                'operation': params.get('operation') or ('read' if 'read' in command else 'write')
+            })]
+        
+        return None
+    
+    def _plan_timing(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Plan report without step results"""
+        return {
+            'elapsed_ms': plan['elapsed_ms'],
+            'sequential_ms': plan['sequential_ms'],
+            'steps': [
+                {key: value for key, value in step.items() if key != 'result'}
+                for step in plan['steps']
+            ]
+        }
+    
     def _parse_intent(self, command: str) -> Dict[str, Any]:
         """Parse user intent from natural language command"""
-        command_lower = command.lower()
-        
-        for category, patterns in self.command_patterns.items():
-            for pattern, action in patterns:
-                match = re.search(pattern, command_lower)
-                if match:
-                    result = {
-                        'category': category,
-                        'action': action,
-                        'raw_command': command
-                    }
-                    
-                    # Extract additional parameters from match groups
-                    if match.groups():
-                        if category == 'application':
-                            result['target'] = match.group(1)
-                        elif category == 'hardware':
-                            result['target'] = match.group(1)
-                        elif category == 'email' and 'work' in command_lower:
-                            result['filter'] = 'work'
-                        elif category == 'email' and 'personal' in command_lower:
-                            result['filter'] = 'personal'
-                    
-                    return result
+        key = normalize_command(command)
+        intent = self.intent_cache.get(key)
+        if intent is None:
+            intent = self._match_intent(key)
+            self.intent_cache.put(key, intent)
+        
+        # Copy so callers never mutate the cached entry
+        return {**intent, 'raw_command': command}
+    
+    def _match_intent(self, command_lower: str) -> Dict[str, Any]:
+        """Match a normalized command against the routing patterns"""
+        routed = self.router.match(command_lower)
+        if routed:
+            category, action, match = routed
+            result = {
+                'category': category,
+                'action': action
+            }
+            
+            # Extract additional parameters from match groups
+            if match.groups():
+                if category == 'application':
+                    result['target'] = match.group(1)
+                elif category == 'hardware':
+                    result['target'] = match.group(1)
+                elif category == 'email' and 'work' in command_lower:
+                    result['filter'] = 'work'
+                elif category == 'email' and 'personal' in command_lower:
+                    result['filter'] = 'personal'
+            
+            return result
         
         # Default intent
         return {
             'category': 'general',
-            'action': 'process',
-            'raw_command': command
-        }
\ No newline at end of file
+            'action': 'process'
+        }
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return intent cache counters"""
+        return self.intent_cache.stats()
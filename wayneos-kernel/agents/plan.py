@@ -0,0 +1,134 @@
+"""Plan - Dependency DAG of agent actions executed with maximum parallelism"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Callable, Awaitable
+import asyncio
+import time
+
+@dataclass
+class PlanStep:
+    """One agent action in a plan
+    
+    inputs maps a parameter name to the id of an earlier step whose result
+    is passed in as that parameter ('emails') or to a field of that result
+    ('emails.count'). Every step named in inputs is an implicit dependency.
+    """
+    id: str
+    agent: str
+    action: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    inputs: Dict[str, str] = field(default_factory=dict)
+    
+    def dependencies(self) -> List[str]:
+        """Ids of every step this one waits for"""
+        deps = list(self.depends_on)
+        for reference in self.inputs.values():
+            step_id = reference.split('.', 1)[0]
+            if step_id not in deps:
+                deps.append(step_id)
+        return deps
+
+class PlanError(ValueError):
+    """Raised when a plan is not a valid DAG"""
+
+def validate_plan(steps: List[PlanStep]):
+    """Check ids are unique, references exist and there are no cycles"""
+    by_id = {}
+    for step in steps:
+        if step.id in by_id:
+            raise PlanError(f'Duplicate step id: {step.id}')
+        by_id[step.id] = step
+    
+    remaining = {step.id: set(step.dependencies()) for step in steps}
+    for step_id, deps in remaining.items():
+        unknown = deps - by_id.keys()
+        if unknown:
+            raise PlanError(f'Step {step_id} depends on unknown steps: {sorted(unknown)}')
+    
+    # Kahn's algorithm: whatever cannot be ordered is on a cycle
+    ready = [step_id for step_id, deps in remaining.items() if not deps]
+    ordered = 0
+    while ready:
+        done = ready.pop()
+        ordered += 1
+        for step_id, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(step_id)
+    if ordered != len(steps):
+        raise PlanError('Plan contains a dependency cycle')
+
+def _resolve_input(reference: str, results: Dict[str, Any]) -> Any:
+    """Look up 'step' or 'step.field.subfield' in finished step results"""
+    step_id, _, path = reference.partition('.')
+    value = results[step_id]
+    for key in path.split('.') if path else []:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+async def run_plan(steps: List[PlanStep],
+                   invoke: Callable[[str, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Execute a plan, starting each step as soon as its dependencies finish
+    
+    invoke(agent, action, params) performs one agent call. A step fails when
+    invoke raises or returns a result with an 'error' key or status 'error',
+    the same test Orchestrator.invoke records failures with; steps depending on
+    a failed step are skipped while independent branches keep running.
+    """
+    validate_plan(steps)
+    
+    started = time.perf_counter()
+    results: Dict[str, Any] = {}
+    reports: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+    
+    async def run_step(step: PlanStep) -> bool:
+        deps = step.dependencies()
+        if deps:
+            outcomes = await asyncio.gather(*(tasks[dep] for dep in deps))
+            if not all(outcomes):
+                reports[step.id] = {'status': 'skipped', 'error': 'A dependency failed'}
+                return False
+        
+        params = dict(step.params)
+        for name, reference in step.inputs.items():
+            params[name] = _resolve_input(reference, results)
+        
+        step_start = time.perf_counter()
+        report = {'started_ms': round((step_start - started) * 1000, 3)}
+        try:
+            result = await invoke(step.agent, step.action, params)
+            ok = not (isinstance(result, dict)
+                      and ('error' in result or result.get('status') == 'error'))
+        except Exception as e:
+            result = None
+            ok = False
+            report['error'] = str(e)
+        report['elapsed_ms'] = round((time.perf_counter() - step_start) * 1000, 3)
+        
+        if result is not None:
+            results[step.id] = result
+            report['result'] = result
+            if not ok:
+                report['error'] = result.get('error') or result.get('message')
+        report['status'] = 'completed' if ok else 'failed'
+        reports[step.id] = report
+        return ok
+    
+    # Tasks are created before any of them runs, so every dependency lookup succeeds
+    for step in steps:
+        tasks[step.id] = asyncio.ensure_future(run_step(step))
+    await asyncio.gather(*tasks.values())
+    
+    step_reports = [
+        {'id': step.id, 'agent': step.agent, 'action': step.action, **reports[step.id]}
+        for step in steps
+    ]
+    return {
+        'status': 'completed' if all(r['status'] == 'completed' for r in step_reports) else 'failed',
+        'steps': step_reports,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        'sequential_ms': round(sum(r.get('elapsed_ms', 0) for r in step_reports), 3)
+    }
@@ -0,0 +1,363 @@
+"""Policy - Per-user, per-distribution path permissions compiled into a trie"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, FrozenSet, List, Optional, Tuple
+import fnmatch
+import json
+import logging
+import os
+import posixpath
+import re
+import time
+from .lru_cache import LRUCache
+
+logger = logging.getLogger('wayneos.policy')
+
+READ, WRITE, EXECUTE = 1, 2, 4
+PERMISSIONS = {'read': READ, 'write': WRITE, 'execute': EXECUTE}
+ALL = READ | WRITE | EXECUTE
+
+# Decisions kept per engine, keyed by (user, distribution, path)
+DEFAULT_DECISION_CACHE = 65536
+
+# Minimum seconds between checks of the policy file's mtime
+RELOAD_CHECK_INTERVAL = 1.0
+
+# User a session acts as when none is configured
+DEFAULT_USER = 'user'
+
+_O_PATH = getattr(os, 'O_PATH', 0) if os.path.isdir('/proc/self/fd') else 0
+
+# File operations that only read; any other operation needs write
+READ_OPERATIONS = frozenset({'read', 'read_range', 'stat', 'list'})
+
+def _sandbox_root() -> str:
+    return os.environ.get('WAYNEOS_FS_ROOT') or os.path.join(os.path.expanduser('~'), 'wayneos')
+
+def default_policy_file() -> str:
+    """Policy from WAYNEOS_POLICY, else policy.json in the filesystem sandbox root"""
+    return os.environ.get('WAYNEOS_POLICY') or os.path.join(_sandbox_root(), 'policy.json')
+
+def _real_path(path: str) -> str:
+    """os.path.realpath, resolved by the kernel in one open() where Linux allows"""
+    if _O_PATH:
+        try:
+            fd = os.open(path, _O_PATH)
+        except OSError:
+            # Not there yet (a file about to be written): resolve what exists
+            return os.path.realpath(path)
+        try:
+            return os.readlink(f'/proc/self/fd/{fd}')
+        except OSError:
+            return os.path.realpath(path)
+        finally:
+            os.close(fd)
+    return os.path.realpath(path)
+
+def normalize_path(path: str) -> str:
+    """Absolute, normalized form used for matching and cache keys"""
+    return posixpath.normpath('/' + str(path).lstrip('/'))
+
+def _mask(names: Any) -> int:
+    if isinstance(names, str):
+        names = [names]
+    mask = 0
+    for name in names or []:
+        if name not in PERMISSIONS:
+            raise ValueError(f'Unknown permission: {name}')
+        mask |= PERMISSIONS[name]
+    return mask
+
+def _names(mask: int) -> Dict[str, bool]:
+    return {name: bool(mask & bit) for name, bit in PERMISSIONS.items()}
+
+@dataclass
+class PolicyRule:
+    """Grants and revokes permissions on a path prefix or a glob
+    
+    A rule applies to everyone unless it names users or distributions.
+    '{user}' in a path or glob is replaced with the user being checked.
+    """
+    path: Optional[str] = None
+    glob: Optional[str] = None
+    allow: int = 0
+    deny: int = 0
+    users: Optional[FrozenSet[str]] = None
+    distributions: Optional[FrozenSet[str]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PolicyRule':
+        if ('path' in data) == ('glob' in data):
+            raise ValueError(f'Rule needs exactly one of path or glob: {data}')
+        return cls(
+            path=data.get('path'),
+            glob=data.get('glob'),
+            allow=_mask(data.get('allow')),
+            deny=_mask(data.get('deny')),
+            users=frozenset(data['users']) if data.get('users') else None,
+            distributions=frozenset(data['distributions']) if data.get('distributions') else None
+        )
+    
+    @property
+    def personal(self) -> bool:
+        """True when the rule depends on who is asking"""
+        return self.users is not None or '{user}' in (self.path or self.glob)
+    
+    def applies(self, user: str, distribution: str) -> bool:
+        return ((self.users is None or user in self.users)
+                and (self.distributions is None or distribution in self.distributions))
+
+class _Node:
+    __slots__ = ('children', 'allow', 'deny')
+    
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.allow = 0
+        self.deny = 0
+
+class RuleTrie:
+    """Prefix rules in a trie of path components, plus compiled globs"""
+    
+    def __init__(self, rules: List[PolicyRule], user: str = ''):
+        self.root = _Node()
+        self.globs: List[Tuple[Any, bool, int, int]] = []
+        for rule in rules:
+            if rule.path is not None:
+                node = self.root
+                for part in normalize_path(rule.path.replace('{user}', user)).split('/'):
+                    if part:
+                        node = node.children.setdefault(part, _Node())
+                node.allow |= rule.allow
+                node.deny |= rule.deny
+            else:
+                pattern = rule.glob.replace('{user}', user)
+                self.globs.append((
+                    re.compile(fnmatch.translate(pattern)),
+                    '/' not in pattern, rule.allow, rule.deny
+                ))
+
+def evaluate(path: str, default: int, shared: RuleTrie, personal: RuleTrie) -> int:
+    """Permission mask for a normalized path
+    
+    Both tries are walked together from the root. Every node on the way
+    applies its grants and then its denials, so deeper rules override
+    shallower ones and a deny beats an allow in the same rule set; at the
+    same depth a user's own rules are applied after the shared ones. Globs
+    are applied last, shared then personal, each in file order; a glob
+    without '/' matches the file name, otherwise the whole path.
+    """
+    a, b = shared.root, personal.root
+    mask = (((default | a.allow) & ~a.deny) | b.allow) & ~b.deny
+    for part in path.split('/'):
+        if not part:
+            continue
+        if a is not None:
+            a = a.children.get(part)
+            if a is not None:
+                mask = (mask | a.allow) & ~a.deny
+        if b is not None:
+            b = b.children.get(part)
+            if b is not None:
+                mask = (mask | b.allow) & ~b.deny
+        if a is None and b is None:
+            break
+    if shared.globs or personal.globs:
+        name = path.rpartition('/')[2]
+        for regex, on_name, allow, deny in shared.globs + personal.globs:
+            if regex.match(name if on_name else path):
+                mask = (mask | allow) & ~deny
+    return mask
+
+def _file_target(params: Dict[str, Any]) -> Tuple[str, int]:
+    read = params.get('operation', 'read') in READ_OPERATIONS
+    return params.get('path', '/home/user/document.txt'), READ if read else WRITE
+
+# Path and permission each guarded action needs; processes and
+# applications are checked under virtual /processes and /applications trees
+ACTION_TARGETS: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Tuple[str, int]]] = {
+    ('filesystem', 'file_operation'): _file_target,
+    ('filesystem', 'directory_operation'): lambda params: (params.get('path', '/'), READ),
+    ('filesystem', 'read_emails'): lambda params: ('/mail', READ),
+    ('security', 'scan_threats'): lambda params: (params.get('path') or '/', READ),
+    ('process', 'launch_application'):
+        lambda params: (f"/applications/{str(params.get('app', 'firefox')).lower()}", EXECUTE),
+    ('process', 'kill_process'): lambda params: (f"/processes/{params.get('pid')}", WRITE),
+    ('process', 'list_processes'): lambda params: ('/processes', READ)
+}
+
+# Actions whose path names a file in the sandbox, checked with symlinks resolved
+SANDBOX_ACTIONS = frozenset({('filesystem', 'file_operation'), ('filesystem', 'directory_operation')})
+
+# Actions whose path is taken under the scan root, also checked resolved
+SCAN_ACTIONS = frozenset({('security', 'scan_threats')})
+
+class PolicyEngine:
+    """Loads the policy file and answers permission checks
+    
+    The file is JSON: {"default": [permissions], "rules": [{"path" or
+    "glob", "allow", "deny", "users", "distributions"}]}. Rules that apply
+    to everyone are compiled once per distribution and the few that name
+    users or '{user}' once per (user, distribution), both on first use.
+    Decisions are kept in an LRU cache, so a repeated check is one
+    dictionary lookup. The file's
+    mtime is checked at most once per RELOAD_CHECK_INTERVAL; a reload
+    discards compiled rules and cached decisions. Without a policy file
+    everything is allowed. Sandbox and scan paths are checked after
+    resolving symlinks under root or scan_root, so a link cannot lead out
+    of an allowed tree.
+    """
+    
+    def __init__(self, path: Optional[str] = None, cache_size: int = DEFAULT_DECISION_CACHE,
+                 root: Optional[str] = None, scan_root: Optional[str] = None):
+        self.path = path or default_policy_file()
+        self.root = os.path.realpath(root or _sandbox_root())
+        # Where the security agent scans, as in security_agent.default_scan_root
+        self.scan_root = os.path.realpath(scan_root or os.environ.get('WAYNEOS_SCAN_ROOT') or self.root)
+        self.rules: List[PolicyRule] = []
+        self.default = ALL
+        self.version = 0
+        # Rules that apply to everyone, per distribution, and the rest per user
+        self.shared: Dict[str, RuleTrie] = {}
+        self.personal: Dict[Tuple[str, str], RuleTrie] = {}
+        self.cache = LRUCache(cache_size)
+        self.loaded_mtime: Optional[int] = None
+        self.checked_at = float('-inf')
+    
+    def load_rules(self, data: Dict[str, Any]):
+        """Replace the policy; raises ValueError and keeps the old one if data is invalid"""
+        if not isinstance(data, dict):
+            raise ValueError('Policy must be a JSON object')
+        try:
+            default = _mask(data['default']) if 'default' in data else ALL
+            rules = [PolicyRule.from_dict(rule) for rule in data.get('rules', [])]
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f'Malformed policy: {e}')
+        self.rules, self.default = rules, default
+        self.version += 1
+        self.shared.clear()
+        self.personal.clear()
+        self.cache.clear()
+    
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the policy file if it changed; True when the policy changed"""
+        self.checked_at = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            if self.loaded_mtime is None:
+                return False
+            # File removed: back to allowing everything
+            self.loaded_mtime = None
+            self.load_rules({})
+            logger.info(f"Policy {self.path} removed; all actions allowed")
+            return True
+        if mtime == self.loaded_mtime and not force:
+            return False
+        with open(self.path) as f:
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise ValueError(f'Invalid policy {self.path}: {e}')
+        self.load_rules(data)
+        self.loaded_mtime = mtime
+        logger.info(f"Loaded policy {self.path}: {len(self.rules)} rules, version {self.version}")
+        return True
+    
+    def _maybe_reload(self):
+        if time.monotonic() - self.checked_at < RELOAD_CHECK_INTERVAL:
+            return
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            logger.error(f"Keeping previous policy: {e}")
+    
+    def check(self, path: str, user: str = DEFAULT_USER, distribution: str = 'wayneos') -> int:
+        """Permission mask of user on path under distribution"""
+        self._maybe_reload()
+        # Keyed by the path as given so a hit skips normalization
+        key = (user, distribution, path)
+        mask = self.cache.get(key)
+        if mask is None:
+            mask = evaluate(normalize_path(path), self.default,
+                            self._shared(distribution), self._personal(user, distribution))
+            self.cache.put(key, mask)
+        return mask
+    
+    def _shared(self, distribution: str) -> RuleTrie:
+        trie = self.shared.get(distribution)
+        if trie is None:
+            trie = self.shared[distribution] = RuleTrie([
+                rule for rule in self.rules
+                if not rule.personal and rule.applies('', distribution)
+            ])
+        return trie
+    
+    def _personal(self, user: str, distribution: str) -> RuleTrie:
+        trie = self.personal.get((user, distribution))
+        if trie is None:
+            trie = self.personal[(user, distribution)] = RuleTrie([
+                rule for rule in self.rules
+                if rule.personal and rule.applies(user, distribution)
+            ], user)
+        return trie
+    
+    def resolve(self, path: str, root: Optional[str] = None) -> str:
+        """Sandbox path with symlinks resolved; escapes are left to the sandbox to refuse
+        
+        root defaults to the sandbox root; the result is relative to it.
+        """
+        root = root or self.root
+        # Joined as given, like the filesystem agent does: '..' after a
+        # symlink must climb from the link's target, not collapse lexically
+        real = _real_path(os.path.join(root, str(path).lstrip('/')))
+        if real == root:
+            return '/'
+        if real.startswith(root + os.sep):
+            return real[len(root):].replace(os.sep, '/')
+        return normalize_path(path)
+    
+    def permissions(self, path: str, user: str = DEFAULT_USER,
+                    distribution: str = 'wayneos') -> Dict[str, bool]:
+        return _names(self.check(path, user, distribution))
+    
+    def authorize(self, distribution: str, agent: str, action: str,
+                  params: Dict[str, Any], user: str = DEFAULT_USER) -> Optional[Dict[str, Any]]:
+        """None when the action is allowed, else an error result to return
+        
+        user is the session's, never taken from params, so a client cannot
+        act as someone else.
+        """
+        target = ACTION_TARGETS.get((agent, action))
+        if target is None:
+            return None
+        self._maybe_reload()
+        if not self.rules and self.default == ALL:
+            return None
+        path, permission = target(params)
+        if (agent, action) in SANDBOX_ACTIONS:
+            path = self.resolve(path)
+        elif (agent, action) in SCAN_ACTIONS:
+            path = self.resolve(path, self.scan_root)
+        else:
+            path = normalize_path(path)
+        if self.check(path, user, distribution) & permission:
+            return None
+        name = next(name for name, bit in PERMISSIONS.items() if bit == permission)
+        return {
+            'status': 'error',
+            'message': f'Permission denied: {user} may not {name} {path}',
+            'permission': name,
+            'path': path,
+            'user': user
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'root': self.root,
+            'scan_root': self.scan_root,
+            'version': self.version,
+            'rules': len(self.rules),
+            'compiled': len(self.shared) + len(self.personal),
+            'cache': self.cache.stats()
+        }
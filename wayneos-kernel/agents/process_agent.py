@@ -1,22 +1,101 @@
-"""Process Agent - Manages application processes"""
+"""Process Agent - Launches and supervises application processes"""
 
-from typing import Dict, Any, List
-import random
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import time
+from urllib.parse import urlsplit
 from .base_agent import BaseAgent
+from .process_table import ProcessRecord, ProcessTable
+
+logger = logging.getLogger('wayneos.process')
+
+# Applications that may be launched, as name -> argv template; '{url}'
+# arguments, and the '--' ending options before them, are dropped when no
+# URL is given. Launchers that do not parse '--' (firefox, xdg-open) rely on
+# the URL check alone
+DEFAULT_APPLICATIONS = {
+    'firefox': ['firefox', '{url}'],
+    'chromium': ['chromium', '--', '{url}'],
+    'chrome': ['google-chrome', '--', '{url}'],
+    'terminal': ['x-terminal-emulator'],
+    'files': ['xdg-open', '{url}'],
+    'editor': ['gedit'],
+    'code': ['code', '--', '{url}']
+}
+
+# URL schemes a client may hand to a launched application
+URL_SCHEMES = ('http', 'https')
+
+# Seconds a process gets between SIGTERM and SIGKILL
+DEFAULT_KILL_GRACE = 5.0
+
+# Minimum seconds between /proc samples; faster polls reuse the last one
+SAMPLE_INTERVAL = 0.5
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def load_applications() -> Dict[str, List[str]]:
+    """Allowlist from the JSON file in WAYNEOS_APPLICATIONS, else the defaults"""
+    path = os.environ.get('WAYNEOS_APPLICATIONS')
+    if not path:
+        return dict(DEFAULT_APPLICATIONS)
+    try:
+        with open(path) as f:
+            return {name: list(argv) for name, argv in json.load(f).items()}
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        logger.error(f"Invalid application allowlist {path}: {e}")
+        return {}
+
+def valid_url(url: str) -> bool:
+    """True for an absolute http(s) URL that cannot be read as an option"""
+    if url.startswith('-') or any(c.isspace() or not c.isprintable() for c in url):
+        return False
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return parts.scheme.lower() in URL_SCHEMES and bool(parts.netloc)
+
+def read_proc_stats(pids: List[int]) -> Dict[int, tuple]:
+    """(cpu ticks, rss bytes, threads, state) per live pid, one read per process"""
+    stats = {}
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        # comm may contain spaces and parentheses; fields resume after the last ')'
+        fields = data[data.rindex(b')') + 2:].split()
+        stats[pid] = (
+            int(fields[11]) + int(fields[12]),
+            int(fields[21]) * PAGE_SIZE,
+            int(fields[17]),
+            fields[0].decode()
+        )
+    return stats
 
 class ProcessAgent(BaseAgent):
     """Handles process and application management"""
     
-    def __init__(self):
+    def __init__(self, applications: Optional[Dict[str, List[str]]] = None):
         super().__init__('process')
         self.capabilities = [
             'launch_application',
             'kill_process',
             'list_processes'
         ]
-        self.running_processes = {}
-        self.next_pid = 10000
-        
+        self.applications = load_applications() if applications is None else applications
+        self.table = ProcessTable()
+        self.handles: Dict[int, asyncio.subprocess.Process] = {}
+        self.sampled_at = 0.0
+    
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute process-related actions"""
         
@@ -30,21 +109,50 @@ class ProcessAgent(BaseAgent):
             return {'error': f'Unknown action: {action}'}
     
     async def _launch_application(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Launch an application"""
-        app_name = params.get('app', 'firefox')
-        url = params.get('url', '')
+        """Launch an allowlisted application as a child process"""
+        app_name = str(params.get('app', 'firefox')).lower()
+        url = params.get('url') or ''
         
-        # Simulate launching
-        pid = self.next_pid
-        self.next_pid += 1
+        template = self.applications.get(app_name)
+        if template is None:
+            return {
+                'status': 'error',
+                'message': f'Application not allowed: {app_name}'
+            }
+        if url and not (isinstance(url, str) and valid_url(url)):
+            return {
+                'status': 'error',
+                'message': 'Only http and https URLs can be opened'
+            }
+        argv = [arg.replace('{url}', url) for arg in template
+                if url or ('{url}' not in arg and arg != '--')]
+        executable = shutil.which(argv[0])
+        if executable is None:
+            return {
+                'status': 'error',
+                'message': f'Application not installed: {app_name}'
+            }
         
-        self.running_processes[pid] = {
-            'name': app_name,
-            'pid': pid,
-            'memory': random.randint(100, 500),
-            'cpu': random.uniform(0.1, 5.0),
-            'url': url
-        }
+        try:
+            # A new session gives the app its own process group to signal
+            process = await asyncio.create_subprocess_exec(
+                executable, *argv[1:],
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            return {
+                'status': 'error',
+                'message': f'Failed to launch {app_name}: {e}'
+            }
+        
+        pid = process.pid
+        self.handles[pid] = process
+        self.table.add(ProcessRecord(pid, app_name, url))
+        asyncio.ensure_future(self._reap(pid, process))
+        logger.info(f"Launched {app_name} as pid {pid}")
         
         return {
             'status': 'launched',
@@ -54,31 +162,95 @@ class ProcessAgent(BaseAgent):
             'message': f'{app_name.capitalize()} launched successfully'
         }
     
+    async def _reap(self, pid: int, process: asyncio.subprocess.Process):
+        """Wait for a child to exit and drop it from the table"""
+        returncode = await process.wait()
+        self.handles.pop(pid, None)
+        record = self.table.remove(pid)
+        if record is not None:
+            logger.info(f"{record.name} (pid {pid}) exited with {returncode}")
+    
     async def _kill_process(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Kill a process"""
-        pid = params.get('pid')
-        
-        if pid in self.running_processes:
-            process = self.running_processes.pop(pid)
+        """Terminate a child, escalating to SIGKILL after a grace period"""
+        try:
+            pid = int(params.get('pid'))
+            grace = max(0.0, float(params.get('grace', DEFAULT_KILL_GRACE)))
+        except (TypeError, ValueError):
             return {
-                'status': 'killed',
-                'pid': pid,
-                'name': process['name']
+                'status': 'error',
+                'message': f"Invalid pid: {params.get('pid')}"
             }
-        else:
+        
+        process = self.handles.get(pid)
+        if process is None:
             return {
                 'status': 'error',
                 'message': f'Process {pid} not found'
             }
-    
-    async def _list_processes(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """List running processes"""
+        name = self.table.get(pid).name
+        
+        signals = [signal.SIGKILL] if params.get('force') else [signal.SIGTERM, signal.SIGKILL]
+        for sig in signals:
+            try:
+                os.killpg(pid, sig)
+            except ProcessLookupError:
+                break
+            except PermissionError:
+                process.send_signal(sig)
+            try:
+                await asyncio.wait_for(asyncio.shield(process.wait()), grace)
+                break
+            except asyncio.TimeoutError:
+                logger.warning(f"{name} (pid {pid}) ignored {sig.name}")
+        returncode = await process.wait()
+        
         return {
-            'status': 'success',
-            'processes': list(self.running_processes.values()),
-            'count': len(self.running_processes)
+            'status': 'killed',
+            'pid': pid,
+            'name': name,
+            'signal': sig.name,
+            'returncode': returncode
         }
     
+    def _sample(self):
+        """Refresh CPU and RSS of every tracked child in one batched pass"""
+        now = time.monotonic()
+        if now - self.sampled_at < SAMPLE_INTERVAL:
+            return
+        self.sampled_at = now
+        for pid, (ticks, rss, threads, state) in read_proc_stats(self.table.pids()).items():
+            record = self.table.get(pid)
+            if record is None:
+                continue
+            elapsed = now - record.sampled
+            cpu = round((ticks - record.cpu_ticks) / CLOCK_TICKS / elapsed * 100, 1) if elapsed > 0 else record.cpu
+            record.cpu_ticks = ticks
+            record.sampled = now
+            self.table.update(pid, cpu, round(rss / (1024 * 1024), 1), threads, state)
+    
+    async def _list_processes(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """List processes, or only changes since a version, with live resource usage"""
+        self._sample()
+        try:
+            since_version = params.get('since_version')
+            limit = params.get('limit')
+            result = self.table.query(
+                since_version=int(since_version) if since_version is not None else None,
+                name=params.get('name'),
+                state=params.get('state'),
+                min_cpu=float(params['min_cpu']) if params.get('min_cpu') is not None else None,
+                min_memory=float(params['min_memory']) if params.get('min_memory') is not None else None,
+                sort=params.get('sort', 'pid'),
+                descending=bool(params.get('descending', False)),
+                limit=max(0, int(limit)) if limit is not None else None
+            )
+        except (TypeError, ValueError) as e:
+            return {
+                'status': 'error',
+                'message': f'Invalid query: {e}'
+            }
+        return {'status': 'success', **result}
+    
     def get_capabilities(self) -> List[str]:
         """Return agent capabilities"""
-        return self.capabilities
\ No newline at end of file
+        return self.capabilities
@@ -0,0 +1,179 @@
+"""Process Table - Slotted process records with versioned change tracking"""
+
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import time
+
+# Removed pids remembered for delta queries; older clients get a full listing
+DEFAULT_TOMBSTONE_LIMIT = 4096
+
+# Resource changes smaller than these do not bump a record's version
+CPU_EPSILON = 0.5
+MEMORY_EPSILON = 0.1
+
+SORT_KEYS = ('pid', 'name', 'cpu', 'memory', 'started', 'threads')
+
+class ProcessRecord:
+    """One tracked process"""
+    
+    __slots__ = ('pid', 'name', 'url', 'started', 'memory', 'cpu', 'threads',
+                 'state', 'cpu_ticks', 'sampled', 'version')
+    
+    def __init__(self, pid: int, name: str, url: str = ''):
+        self.pid = pid
+        self.name = name
+        self.url = url
+        self.started = time.time()
+        self.memory = 0.0
+        self.cpu = 0.0
+        self.threads = 1
+        self.state = 'R'
+        self.cpu_ticks = 0
+        self.sampled = time.monotonic()
+        self.version = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'pid': self.pid,
+            'memory': self.memory,
+            'cpu': self.cpu,
+            'threads': self.threads,
+            'state': self.state,
+            'url': self.url,
+            'started': self.started,
+            'version': self.version
+        }
+
+class ProcessTable:
+    """Process records keyed by pid, with a monotonically increasing version
+    
+    Every add, visible change and removal takes the next version. Live pids
+    are kept in an OrderedDict ordered by their last version and removals in
+    a bounded one, so a delta query walks back from the newest entry only as
+    far as the client's version: its cost follows the amount of change, not
+    the table size.
+    """
+    
+    def __init__(self, tombstone_limit: int = DEFAULT_TOMBSTONE_LIMIT):
+        self.records: Dict[int, ProcessRecord] = {}
+        self.version = 0
+        self.updated: OrderedDict = OrderedDict()
+        self.removed: OrderedDict = OrderedDict()
+        self.tombstone_limit = tombstone_limit
+        # Deltas from before this version may have lost tombstones
+        self.horizon = 0
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __contains__(self, pid: int) -> bool:
+        return pid in self.records
+    
+    def get(self, pid: int) -> Optional[ProcessRecord]:
+        return self.records.get(pid)
+    
+    def pids(self) -> List[int]:
+        return list(self.records)
+    
+    def _touch(self, record: ProcessRecord):
+        self.version += 1
+        record.version = self.version
+        self.updated[record.pid] = self.version
+        self.updated.move_to_end(record.pid)
+    
+    def add(self, record: ProcessRecord):
+        self.records[record.pid] = record
+        self.removed.pop(record.pid, None)
+        self._touch(record)
+    
+    def remove(self, pid: int) -> Optional[ProcessRecord]:
+        record = self.records.pop(pid, None)
+        if record is None:
+            return None
+        self.updated.pop(pid, None)
+        self.version += 1
+        self.removed[pid] = self.version
+        self.removed.move_to_end(pid)
+        while len(self.removed) > self.tombstone_limit:
+            _, version = self.removed.popitem(last=False)
+            self.horizon = version
+        return record
+    
+    def update(self, pid: int, cpu: float, memory: float, threads: int, state: str):
+        """Store a resource sample, bumping the version only on visible change"""
+        record = self.records.get(pid)
+        if record is None:
+            return
+        changed = (
+            abs(cpu - record.cpu) >= CPU_EPSILON
+            or abs(memory - record.memory) >= MEMORY_EPSILON
+            or threads != record.threads
+            or state != record.state
+        )
+        record.cpu, record.memory, record.threads, record.state = cpu, memory, threads, state
+        if changed:
+            self._touch(record)
+    
+    def _since(self, entries: OrderedDict, since_version: int) -> List[Tuple[int, int]]:
+        """(version, key) of OrderedDict entries newer than since_version"""
+        changes = []
+        for pid, version in reversed(entries.items()):
+            if version <= since_version:
+                break
+            changes.append((version, pid))
+        return changes
+    
+    def query(self, since_version: Optional[int] = None, name: Optional[str] = None,
+              state: Optional[str] = None, min_cpu: Optional[float] = None,
+              min_memory: Optional[float] = None, sort: str = 'pid',
+              descending: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Full listing, or only what changed after since_version, filtered and sorted
+        
+        A delta reports changed records that no longer pass the filters
+        under removed, alongside pids that exited. With a limit it holds the
+        oldest changes only and its version is that of the last change
+        included, with more set, so resuming from it loses nothing.
+        """
+        name = name.lower() if name else None
+        
+        def passes(record: ProcessRecord) -> bool:
+            return ((name is None or name in record.name.lower())
+                    and (state is None or record.state == state)
+                    and (min_cpu is None or record.cpu >= min_cpu)
+                    and (min_memory is None or record.memory >= min_memory))
+        
+        version = self.version
+        more = False
+        removed: List[int] = []
+        full = since_version is None or since_version < self.horizon or since_version > self.version
+        if full:
+            matches = [record for record in self.records.values() if passes(record)]
+        else:
+            changes = sorted(self._since(self.updated, since_version)
+                             + self._since(self.removed, since_version))
+            if limit is not None and len(changes) > limit:
+                changes = changes[:limit]
+                version = changes[-1][0] if changes else since_version
+                more = True
+            matches = []
+            for _, pid in changes:
+                record = self.records.get(pid)
+                if record is not None and passes(record):
+                    matches.append(record)
+                else:
+                    removed.append(pid)
+        
+        if sort not in SORT_KEYS:
+            sort = 'pid'
+        matches.sort(key=lambda record: getattr(record, sort), reverse=descending)
+        
+        return {
+            'version': version,
+            'full': full,
+            'more': more,
+            'processes': [record.to_dict() for record in (matches[:limit] if full else matches)],
+            'removed': removed,
+            'matched': len(matches),
+            'count': len(self.records)
+        }
@@ -0,0 +1,146 @@
+"""Profiling - Opt-in per-command profiling with pstats or collapsed-stack output"""
+
+from collections import Counter
+from typing import Dict, Any, List, Callable, Awaitable, Tuple
+import cProfile
+import itertools
+import os
+import pstats
+import re
+import signal
+import tempfile
+import time
+
+# Default directory for profile output
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'wayneos-profiles')
+
+# CPU-time interval between stack samples in collapsed mode
+STACK_SAMPLE_INTERVAL = 0.001
+
+class _StackSampler:
+    """SIGPROF-driven sampler of the main thread's Python stack"""
+    
+    def __init__(self, interval: float = STACK_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.previous_handler = None
+        
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(stack))] += 1
+    
+    def enable(self):
+        self.previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+    
+    def disable(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler or signal.SIG_DFL)
+
+class CommandProfiler:
+    """Profiles selected commands and writes one output file per command
+    
+    With sample_every=N every Nth command is profiled; a command can also
+    force profiling with params.profile. Only one command is profiled at a
+    time because the profiler also sees any task that runs meanwhile.
+    """
+    
+    def __init__(self, output_dir: str = DEFAULT_PROFILE_DIR, sample_every: int = 0,
+                 output_format: str = 'pstats', top: int = 5):
+        if output_format not in ('pstats', 'collapsed'):
+            raise ValueError(f'Unknown profile format: {output_format}')
+        self.output_dir = output_dir
+        self.sample_every = sample_every
+        self.output_format = output_format
+        self.top = top
+        self.seen = 0
+        self.active = False
+        self.sequence = itertools.count(1)
+        
+    def wants(self, forced: bool) -> bool:
+        """Decide whether the next command is profiled"""
+        self.seen += 1
+        if self.active:
+            return False
+        return forced or (self.sample_every > 0 and self.seen % self.sample_every == 0)
+    
+    async def run(self, label: str,
+                  work: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Await work() under the profiler and return (result, summary)
+        
+        A profile that cannot be written never fails the command: the
+        summary then carries 'error' instead of 'file'.
+        """
+        # The label comes from the client, so it must not name another directory
+        label = re.sub(r'[^\w.-]', '_', str(label))
+        name = f'{int(time.time())}-{os.getpid()}-{next(self.sequence)}-{label}'
+        
+        self.active = True
+        start = time.perf_counter()
+        if self.output_format == 'pstats':
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                result = await work()
+            finally:
+                profile.disable()
+                self.active = False
+            path = os.path.join(self.output_dir, f'{name}.prof')
+            hotspots = self._pstats_hotspots(pstats.Stats(profile))
+            write = lambda: profile.dump_stats(path)
+        else:
+            sampler = _StackSampler()
+            sampler.enable()
+            try:
+                result = await work()
+            finally:
+                sampler.disable()
+                self.active = False
+            path = os.path.join(self.output_dir, f'{name}.collapsed')
+            hotspots = self._collapsed_hotspots(sampler.stacks)
+            
+            def write():
+                with open(path, 'w') as f:
+                    for stack, count in sampler.stacks.most_common():
+                        f.write(f'{stack} {count}\n')
+        
+        summary = {
+            'format': self.output_format,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+            'hotspots': hotspots
+        }
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            write()
+            summary['file'] = path
+        except OSError as e:
+            summary['error'] = f'Could not write profile {path}: {e.strerror or e}'
+        return result, summary
+    
+    def _pstats_hotspots(self, stats: pstats.Stats) -> List[Dict[str, Any]]:
+        """Top functions by own time"""
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                'function': f'{os.path.basename(filename)}:{line}({function})',
+                'calls': calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            }
+            for (filename, line, function), (_, calls, tottime, cumtime, _) in rows[:self.top]
+        ]
+    
+    def _collapsed_hotspots(self, stacks: Counter) -> List[Dict[str, Any]]:
+        """Top leaf frames by sample count"""
+        leaves: Counter = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {'function': leaf, 'samples': count, 'share': round(count / total, 3)}
+            for leaf, count in leaves.most_common(self.top)
+        ]
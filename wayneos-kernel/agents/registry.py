@@ -0,0 +1,101 @@
+"""Agent Registry - Imports and constructs agents on first use"""
+
+from collections.abc import Mapping
+from typing import Dict, Any, List, Iterator
+import importlib
+import logging
+from .policy import DEFAULT_USER
+
+logger = logging.getLogger('wayneos.registry')
+
+# Agents shared by every distribution, as name -> 'module:Class'
+BASE_AGENTS = {
+    'user': 'agents.user_agent:UserAgent',
+    'filesystem': 'agents.filesystem_agent:FileSystemAgent',
+    'process': 'agents.process_agent:ProcessAgent',
+    'network': 'agents.network_agent:NetworkAgent',
+    'ml': 'agents.ml_agent:MLAgent',
+    'security': 'agents.security_agent:SecurityAgent',
+    'hardware': 'agents.hardware_agent:HardwareAgent'
+}
+
+# Distribution agent packs, as distribution -> 'module:Class' providing get_agents()
+DISTRIBUTION_PACKS = {
+    'wayneos-top': 'agents.automotive:AutomotiveAgents',
+    'wayneos-sspb': 'agents.healthcare:HealthcareAgents',
+    'wayneos-financial': 'agents.financial:FinancialAgents'
+}
+
+# Every distribution a kernel or daemon session may run as
+DISTRIBUTIONS = ('wayneos', *DISTRIBUTION_PACKS)
+
+def _resolve(spec: str) -> Any:
+    """Import 'module:attribute' and return the attribute"""
+    module_name, attribute = spec.split(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+class AgentRegistry(Mapping):
+    """Read-only mapping of agent name to agent, built lazily
+    
+    Nothing is imported at construction time. The distribution pack, if any,
+    is loaded on the first lookup so its agents can still override base
+    agents of the same name; each base agent module is imported and the
+    agent constructed the first time it is looked up. user is who the
+    session acts as; the orchestrator checks the policy for that user.
+    """
+    
+    def __init__(self, distribution: str = 'wayneos', runtime: Any = None,
+                 user: str = DEFAULT_USER):
+        self.distribution = distribution
+        self.runtime = runtime
+        self.user = user
+        self.specs = dict(BASE_AGENTS)
+        self.instances: Dict[str, Any] = {}
+        self.pack_spec = DISTRIBUTION_PACKS.get(distribution)
+        self.pack_loaded = self.pack_spec is None
+        
+    def _load_pack(self):
+        """Load the distribution's agent pack once"""
+        self.pack_loaded = True
+        try:
+            pack = _resolve(self.pack_spec)
+            for name, agent in pack.get_agents().items():
+                agent.runtime = self.runtime
+                agent.distribution = self.distribution
+                agent.user = self.user
+                self.instances[name] = agent
+        except (ImportError, AttributeError) as e:
+            logger.error(f"Agent pack for {self.distribution} unavailable: {e}")
+    
+    def __getitem__(self, name: str) -> Any:
+        if not self.pack_loaded:
+            self._load_pack()
+        
+        agent = self.instances.get(name)
+        if agent is None:
+            spec = self.specs.get(name)
+            if spec is None:
+                raise KeyError(name)
+            agent = _resolve(spec)()
+            agent.runtime = self.runtime
+            agent.distribution = self.distribution
+            agent.user = self.user
+            self.instances[name] = agent
+        return agent
+    
+    def __iter__(self) -> Iterator[str]:
+        if not self.pack_loaded:
+            self._load_pack()
+        return iter({**self.specs, **self.instances})
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __contains__(self, name: object) -> bool:
+        if not self.pack_loaded:
+            self._load_pack()
+        return name in self.instances or name in self.specs
+    
+    def loaded(self) -> List[str]:
+        """Names of agents constructed so far"""
+        return list(self.instances)
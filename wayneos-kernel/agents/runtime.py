@@ -0,0 +1,212 @@
+"""Kernel Runtime - Services shared by the kernel, orchestrator and agents"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict, fields
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import os
+import weakref
+from .lru_cache import LRUCache
+from .metrics import KernelMetrics
+from .policy import PolicyEngine, DEFAULT_DECISION_CACHE
+from .profiling import CommandProfiler
+from .telemetry import HardwareSampler, DEFAULT_SAMPLE_INTERVAL, MIN_SAMPLE_INTERVAL
+from .usage_model import UsageModel
+
+logger = logging.getLogger('wayneos.runtime')
+
+CPU_COUNT = os.cpu_count() or 1
+
+@dataclass
+class RuntimeConfig:
+    """Tunable settings of the running kernel"""
+    # Workers of the event loop's default executor (run_in_executor(None, ...))
+    thread_pool: int = min(32, CPU_COUNT + 4)
+    # Workers of the shared process pool for CPU-bound agent work
+    process_pool: int = CPU_COUNT
+    # Commands executed concurrently per connection
+    max_concurrent: int = 64
+    # Entries of each orchestrator's parsed-intent cache
+    intent_cache: int = 4096
+    # Seconds between hardware telemetry samples
+    sampler_interval: float = DEFAULT_SAMPLE_INTERVAL
+    # Permission decisions kept by the policy engine
+    policy_cache: int = DEFAULT_DECISION_CACHE
+
+class ConcurrencyLimiter:
+    """Semaphore whose limit can be changed while permits are held
+    
+    Lowering the limit never revokes permits; new acquisitions wait until
+    enough holders have released.
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.waiters: deque = deque()
+    
+    async def acquire(self):
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled: hand the permit on
+                self.release()
+            else:
+                self.waiters.remove(waiter)
+            raise
+    
+    def release(self):
+        self.active -= 1
+        self._wake()
+    
+    def resize(self, limit: int):
+        self.limit = max(1, limit)
+        self._wake()
+    
+    def _wake(self):
+        while self.waiters and self.active < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+@dataclass
+class KernelRuntime:
+    """Process-wide state handed to every agent as agent.runtime
+    
+    The stdio bridge owns one runtime; the daemon shares one across all
+    sessions so measurements cover the whole process. configure() changes
+    RuntimeConfig settings live: executors are swapped, and registered
+    concurrency limiters and caches are resized in place.
+    """
+    metrics: KernelMetrics = field(default_factory=KernelMetrics)
+    usage: UsageModel = field(default_factory=UsageModel)
+    # Set when --profile is given; created on demand for params.profile
+    profiler: Optional[CommandProfiler] = None
+    config: RuntimeConfig = field(default_factory=RuntimeConfig)
+    sampler: HardwareSampler = field(default_factory=HardwareSampler)
+    policy: PolicyEngine = field(default_factory=PolicyEngine)
+    # Hardware profile last applied; shared, like the settings it stands for
+    profile: str = 'balanced'
+    # Whether optimize_hardware may retune it; a daemon clears this unless
+    # its operator passes --allow-tuning, since every session would feel it
+    tunable: bool = True
+    # Created on first use by users(); SQLite is not imported before that
+    user_store: Optional[Any] = field(default=None, repr=False)
+    thread_executor: Optional[ThreadPoolExecutor] = field(default=None, repr=False)
+    process_executor: Optional[ProcessPoolExecutor] = field(default=None, repr=False)
+    limiters: Any = field(default_factory=weakref.WeakSet, repr=False)
+    caches: Dict[str, List[LRUCache]] = field(default_factory=dict, repr=False)
+    
+    def __post_init__(self):
+        self.policy.cache.resize(self.config.policy_cache)
+        self.register_cache('policy_cache', self.policy.cache)
+    
+    def start(self):
+        """Install the thread pool and start the sampler on the running loop"""
+        self._install_thread_pool()
+        self.sampler.set_interval(self.config.sampler_interval)
+        self.sampler.start()
+    
+    def close(self):
+        """Stop the sampler, flush the user store and shut down the executors"""
+        self.sampler.stop()
+        if self.user_store is not None:
+            self.user_store.close()
+        if self.process_executor is not None:
+            self.process_executor.shutdown(wait=False, cancel_futures=True)
+            self.process_executor = None
+    
+    def limiter(self, limit: Optional[int] = None) -> ConcurrencyLimiter:
+        """Concurrency limiter that follows max_concurrent changes"""
+        limiter = ConcurrencyLimiter(limit or self.config.max_concurrent)
+        self.limiters.add(limiter)
+        return limiter
+    
+    def register_cache(self, setting: str, cache: LRUCache):
+        """Resize cache whenever the named config setting changes"""
+        self.caches.setdefault(setting, []).append(cache)
+    
+    def users(self) -> Any:
+        """Shared UserStore, opened on first use"""
+        if self.user_store is None:
+            from .user_store import UserStore
+            self.user_store = UserStore()
+        return self.user_store
+    
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Shared process pool, created on first use"""
+        if self.process_executor is None:
+            self.process_executor = ProcessPoolExecutor(max_workers=self.config.process_pool)
+        return self.process_executor
+    
+    def _install_thread_pool(self):
+        loop = asyncio.get_running_loop()
+        previous = self.thread_executor
+        self.thread_executor = ThreadPoolExecutor(
+            max_workers=self.config.thread_pool, thread_name_prefix='wayneos'
+        )
+        loop.set_default_executor(self.thread_executor)
+        if previous is not None:
+            # Queued work still finishes on the old pool
+            previous.shutdown(wait=False)
+    
+    def configure(self, **settings: Any) -> Dict[str, Any]:
+        """Apply settings live and return the effective configuration"""
+        unknown = set(settings) - {item.name for item in fields(RuntimeConfig)}
+        if unknown:
+            raise ValueError(f"Unknown runtime settings: {', '.join(sorted(unknown))}")
+        
+        changed = {}
+        for name, value in settings.items():
+            if name == 'sampler_interval':
+                value, minimum = float(value), MIN_SAMPLE_INTERVAL
+            else:
+                value, minimum = int(value), 0 if name.endswith('_cache') else 1
+            if value < minimum:
+                raise ValueError(f'{name} must be at least {minimum}')
+            if getattr(self.config, name) != value:
+                setattr(self.config, name, value)
+                changed[name] = value
+        
+        if 'thread_pool' in changed:
+            try:
+                self._install_thread_pool()
+            except RuntimeError:
+                # No running loop yet; start() installs the pool
+                pass
+        if 'process_pool' in changed and self.process_executor is not None:
+            # In-flight work completes; the next use gets a pool of the new size
+            self.process_executor.shutdown(wait=False)
+            self.process_executor = None
+        if 'max_concurrent' in changed:
+            for limiter in list(self.limiters):
+                limiter.resize(self.config.max_concurrent)
+        if 'sampler_interval' in changed:
+            self.sampler.set_interval(self.config.sampler_interval)
+        for name, caches in self.caches.items():
+            if name in changed:
+                for cache in caches:
+                    cache.resize(changed[name])
+        
+        if changed:
+            logger.info(f"Runtime reconfigured: {changed}")
+        return self.effective()
+    
+    def effective(self) -> Dict[str, Any]:
+        """Configuration as currently in force"""
+        return {
+            **asdict(self.config),
+            'connections': len(self.limiters),
+            'caches': {name: len(caches) for name, caches in self.caches.items()},
+            'process_pool_active': self.process_executor is not None,
+            'sampler_running': self.sampler.stats()['running']
+        }
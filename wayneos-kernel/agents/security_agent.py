@@ -1,7 +1,19 @@
 """Security Agent - Manages security operations"""
 
+from datetime import datetime
 from typing import Dict, Any, List
+import os
 from .base_agent import BaseAgent
+from .filesystem_agent import default_root
+from .threat_scanner import SignatureSet, ThreatScanner
+
+def default_scan_root() -> str:
+    """Tree scanned for threats: WAYNEOS_SCAN_ROOT, else the filesystem sandbox root"""
+    return os.environ.get('WAYNEOS_SCAN_ROOT') or default_root()
+
+def default_signature_file() -> str:
+    """Signature list from WAYNEOS_SIGNATURES, else <sandbox root>/signatures.txt"""
+    return os.environ.get('WAYNEOS_SIGNATURES') or os.path.join(default_root(), 'signatures.txt')
 
 class SecurityAgent(BaseAgent):
     """Handles security-related operations"""
@@ -13,7 +25,9 @@ class SecurityAgent(BaseAgent):
             'scan_threats',
             'manage_firewall'
         ]
-        
+        self.signatures = SignatureSet(default_signature_file())
+        self.scanner = ThreatScanner(self.signatures)
+    
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute security actions"""
         
@@ -27,26 +41,80 @@ class SecurityAgent(BaseAgent):
             return {'error': f'Unknown action: {action}'}
     
     async def _check_permissions(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Check file/resource permissions"""
-        resource = params.get('resource', '/home/user')
+        """Check file/resource permissions against the policy engine"""
+        policy = self.runtime.policy
+        if params.get('reload'):
+            try:
+                policy.reload(force=True)
+            except (OSError, ValueError) as e:
+                return {
+                    'status': 'error',
+                    'message': f'Cannot reload policy: {e}'
+                }
+        resource = policy.resolve(params.get('resource', '/home/user'))
+        user = str(params.get('user') or self.user)
+        distribution = str(params.get('distribution') or self.distribution)
         
         return {
             'status': 'success',
             'resource': resource,
-            'permissions': {
-                'read': True,
-                'write': True,
-                'execute': False
-            }
+            'user': user,
+            'distribution': distribution,
+            'permissions': policy.permissions(resource, user, distribution),
+            'policy_version': policy.version
         }
     
     async def _scan_threats(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Scan for security threats"""
+        """Scan a tree under the scan root for files matching known threat signatures
+        
+        params.path is taken relative to the scan root, like filesystem
+        paths are to the sandbox root, and may not resolve outside it.
+        params.signatures likewise names a file under the sandbox root.
+        """
+        scan_root = os.path.realpath(default_scan_root())
+        root = os.path.realpath(os.path.join(scan_root, str(params.get('path') or '').lstrip('/')))
+        if root != scan_root and not root.startswith(scan_root + os.sep):
+            return {
+                'status': 'error',
+                'message': f"Scan path escapes the scan root: {params.get('path')}"
+            }
+        if not os.path.isdir(root):
+            return {
+                'status': 'error',
+                'message': f'Scan path is not a directory: {root}'
+            }
+        signature_file = params.get('signatures')
+        if signature_file:
+            sandbox = os.path.realpath(default_root())
+            signature_file = os.path.realpath(os.path.join(sandbox, str(signature_file).lstrip('/')))
+            if not signature_file.startswith(sandbox + os.sep):
+                return {
+                    'status': 'error',
+                    'message': f"Signature file escapes the sandbox root: {params.get('signatures')}"
+                }
+        try:
+            signatures = self.signatures.load(signature_file)
+        except OSError as e:
+            return {
+                'status': 'error',
+                'message': f'Cannot load signatures: {e}'
+            }
+        
+        report = await self.scanner.scan(
+            root,
+            self.runtime.process_pool(),
+            one_filesystem=bool(params.get('one_filesystem', True))
+        )
+        threats = len(report['threats'])
+        
         return {
-            'status': 'clean',
-            'threats_found': 0,
-            'last_scan': 'just now',
-            'message': 'No threats detected'
+            'status': 'threats_detected' if threats else 'clean',
+            'threats_found': threats,
+            'path': root,
+            'signatures': signatures,
+            'last_scan': datetime.now().isoformat(),
+            'message': f'{threats} threats detected' if threats else 'No threats detected',
+            **report
         }
     
     async def _manage_firewall(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,232 @@
+"""Telemetry - Background /proc and /sys sampler with ring-buffer history"""
+
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import glob
+import logging
+import os
+import time
+
+logger = logging.getLogger('wayneos.telemetry')
+
+DEFAULT_SAMPLE_INTERVAL = 1.0
+MIN_SAMPLE_INTERVAL = 0.05
+
+# Samples kept per series; at the default interval, ten minutes of history
+DEFAULT_HISTORY = 600
+
+class RingBuffer:
+    """Fixed-size float history; appending overwrites the oldest sample"""
+    
+    __slots__ = ('values', 'size', 'index', 'count')
+    
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.values = array('d', bytes(8 * self.size))
+        self.index = 0
+        self.count = 0
+    
+    def append(self, value: float):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+    
+    def latest(self, n: int) -> List[float]:
+        """Up to n most recent samples, newest first"""
+        n = min(n, self.count)
+        return [self.values[(self.index - 1 - i) % self.size] for i in range(n)]
+
+def _read_cpu_times() -> Tuple[int, int]:
+    """(busy, total) jiffies summed over all CPUs"""
+    with open('/proc/stat', 'rb') as f:
+        fields = f.readline().split()[1:]
+    times = [int(field) for field in fields[:8]]
+    idle = times[3] + times[4]
+    total = sum(times)
+    return total - idle, total
+
+def _read_meminfo(keys=(b'MemTotal:', b'MemAvailable:')) -> Dict[bytes, int]:
+    """Selected /proc/meminfo fields in kB"""
+    values = {}
+    with open('/proc/meminfo', 'rb') as f:
+        for line in f:
+            name, _, rest = line.partition(b' ')
+            if name in keys:
+                values[name] = int(rest.split()[0])
+                if len(values) == len(keys):
+                    break
+    return values
+
+def _read_loadavg() -> Tuple[float, float, float]:
+    with open('/proc/loadavg', 'rb') as f:
+        fields = f.read().split()
+    return float(fields[0]), float(fields[1]), float(fields[2])
+
+def thermal_zones() -> List[Tuple[str, str]]:
+    """(temp file, zone type) for each readable thermal zone"""
+    zones = []
+    for zone in sorted(glob.glob('/sys/class/thermal/thermal_zone*')):
+        try:
+            with open(os.path.join(zone, 'type')) as f:
+                kind = f.read().strip()
+        except OSError:
+            kind = os.path.basename(zone)
+        path = os.path.join(zone, 'temp')
+        if os.access(path, os.R_OK):
+            zones.append((path, kind))
+    return zones
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {'avg': 0.0, 'min': 0.0, 'max': 0.0}
+    return {
+        'avg': round(sum(values) / len(values), 2),
+        'min': round(min(values), 2),
+        'max': round(max(values), 2)
+    }
+
+def _latest(ring: RingBuffer) -> float:
+    return round(ring.latest(1)[0], 2) if ring.count else 0.0
+
+class HardwareSampler:
+    """Samples CPU, memory, load and temperature on a background task
+    
+    Each tick reads /proc/stat (first line only), two /proc/meminfo fields,
+    /proc/loadavg and the thermal zone files found at start, and appends one
+    value per series to fixed-size ring buffers, so memory is constant and a
+    tick costs a handful of small reads. Time spent sampling is accumulated
+    so the overhead can be reported.
+    """
+    
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL, history: int = DEFAULT_HISTORY):
+        self.interval = interval
+        self.times = RingBuffer(history)
+        self.cpu = RingBuffer(history)
+        self.memory = RingBuffer(history)
+        self.load = RingBuffer(history)
+        self.temperature = RingBuffer(history)
+        self.zones: List[Tuple[str, str]] = []
+        self.zone_temps: Dict[str, float] = {}
+        self.previous_cpu: Optional[Tuple[int, int]] = None
+        self.memory_total_kb = 0
+        self.busy_seconds = 0.0
+        self.started: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+    
+    def sample(self):
+        """Take one sample of every series"""
+        busy, total = _read_cpu_times()
+        if self.previous_cpu is not None and total > self.previous_cpu[1]:
+            cpu = (busy - self.previous_cpu[0]) / (total - self.previous_cpu[1]) * 100
+        else:
+            # First sample: average since boot
+            cpu = busy / total * 100 if total else 0.0
+        self.previous_cpu = (busy, total)
+        
+        memory = _read_meminfo()
+        self.memory_total_kb = memory.get(b'MemTotal:', 0)
+        available = memory.get(b'MemAvailable:', 0)
+        used = (1 - available / self.memory_total_kb) * 100 if self.memory_total_kb else 0.0
+        
+        hottest = 0.0
+        for path, kind in self.zones:
+            try:
+                with open(path, 'rb') as f:
+                    celsius = int(f.read()) / 1000
+            except (OSError, ValueError):
+                continue
+            self.zone_temps[kind] = celsius
+            hottest = max(hottest, celsius)
+        
+        self.times.append(time.time())
+        self.cpu.append(cpu)
+        self.memory.append(used)
+        self.load.append(_read_loadavg()[0])
+        self.temperature.append(hottest)
+    
+    def start(self):
+        """Start sampling on the running loop; a no-op while already running"""
+        if self.task is not None and not self.task.done():
+            return
+        try:
+            self.zones = thermal_zones()
+            self.sample()
+        except OSError as e:
+            logger.error(f"Hardware sampling unavailable: {e}")
+            return
+        self.started = time.monotonic()
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+    
+    def set_interval(self, interval: float):
+        """Change the interval; a sleeping sampler picks it up immediately"""
+        self.interval = max(MIN_SAMPLE_INTERVAL, interval)
+        if self.wakeup is not None:
+            self.wakeup.set()
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+                # Woken by set_interval: sleep again with the new interval
+                self.wakeup.clear()
+                continue
+            except asyncio.TimeoutError:
+                pass
+            start = time.perf_counter()
+            try:
+                self.sample()
+            except OSError as e:
+                logger.error(f"Hardware sample failed: {e}")
+            self.busy_seconds += time.perf_counter() - start
+    
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+    
+    def overhead_percent(self) -> float:
+        """Share of one core spent sampling since start"""
+        if self.started is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        return self.busy_seconds / elapsed * 100 if elapsed > 0 else 0.0
+    
+    def window(self, seconds: float) -> Dict[str, Any]:
+        """Averages, minima and maxima over the samples of the last seconds"""
+        oldest = time.time() - seconds
+        n = 0
+        for stamp in self.times.latest(self.times.count):
+            if stamp < oldest:
+                break
+            n += 1
+        n = max(1, n)
+        return {
+            'window_seconds': seconds,
+            'samples': min(n, self.times.count),
+            'cpu_usage': _summary(self.cpu.latest(n)),
+            'memory_usage': _summary(self.memory.latest(n)),
+            'load_1m': _summary(self.load.latest(n)),
+            'temperature': _summary(self.temperature.latest(n)) if self.zones else None
+        }
+    
+    def current(self) -> Dict[str, Any]:
+        """Most recent sample of every series"""
+        return {
+            'cpu_usage': _latest(self.cpu),
+            'memory_usage': _latest(self.memory),
+            'load_1m': _latest(self.load),
+            'temperature': dict(self.zone_temps)
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.task is not None and not self.task.done(),
+            'interval': self.interval,
+            'history': self.times.size,
+            'samples': self.times.count,
+            'overhead_percent': round(self.overhead_percent(), 4)
+        }
@@ -0,0 +1,235 @@
+"""Threat Scanner - Parallel file hashing against a signature index"""
+
+from concurrent.futures import Executor
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import stat
+import time
+
+logger = logging.getLogger('wayneos.security')
+
+CHUNK_SIZE = 1024 * 1024
+
+# Files per process-pool task; large enough to amortize pickling, small
+# enough to spread a few big files across workers
+BATCH_FILES = 256
+BATCH_BYTES = 64 * 1024 * 1024
+
+# Below this much data to hash, threads beat starting worker processes
+PROCESS_POOL_MIN_BYTES = 32 * 1024 * 1024
+
+# Never descended into when scanning from /
+PSEUDO_FILESYSTEMS = ('/proc', '/sys', '/dev', '/run')
+
+MAX_REPORTED_ERRORS = 20
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as f:
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+def hash_batch(paths: List[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """(path, digest, error) for each path; runs in a worker process"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, hash_file(path), None))
+        except OSError as e:
+            results.append((path, None, e.strerror or str(e)))
+    return results
+
+class SignatureSet:
+    """SHA-256 digests of known-bad files, indexed for O(1) lookup
+    
+    The file holds one signature per line, "<sha256> [name]", or ClamAV
+    .hsb style "<sha256>:<size>:<name>"; blank lines and # comments are
+    skipped. load() re-reads the file only when its mtime changed.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.index: Dict[str, str] = {}
+        self.loaded_mtime: Optional[int] = None
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def load(self, path: Optional[str] = None) -> int:
+        """Load or refresh the signatures; returns how many are held"""
+        if path and path != self.path:
+            self.path, self.loaded_mtime = path, None
+        if not self.path:
+            return len(self.index)
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self.index, self.loaded_mtime = {}, None
+            return 0
+        if mtime == self.loaded_mtime:
+            return len(self.index)
+        
+        index = {}
+        with open(self.path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if ':' in line:
+                    digest, _, rest = line.partition(':')
+                    name = rest.partition(':')[2] or rest
+                else:
+                    digest, _, name = line.partition(' ')
+                digest = digest.strip().lower()
+                if len(digest) == 64:
+                    index[digest] = name.strip() or digest[:12]
+        self.index, self.loaded_mtime = index, mtime
+        logger.info(f"Loaded {len(index)} signatures from {self.path}")
+        return len(index)
+    
+    def match(self, digest: str) -> Optional[str]:
+        return self.index.get(digest)
+
+class ThreatScanner:
+    """Walks a tree, hashes changed files in parallel and matches signatures
+    
+    Digests are cached per path together with (device, inode, size,
+    mtime); a file whose stat still matches is not read again, so a rescan
+    of an unchanged tree costs one stat per file. Files that changed are
+    hashed in batches on the shared process pool, or on the thread pool
+    when there is too little data to be worth the worker start-up. Cached
+    digests are matched again on every scan, so new signatures apply to
+    files hashed earlier.
+    """
+    
+    def __init__(self, signatures: SignatureSet):
+        self.signatures = signatures
+        # path -> (dev, inode, size, mtime_ns, digest)
+        self.cache: Dict[str, Tuple[int, int, int, int, str]] = {}
+        self.lock = asyncio.Lock()
+    
+    def _walk(self, root: str, one_filesystem: bool):
+        """(unchanged digests, changed files, files seen, total bytes, errors) under root"""
+        unchanged: List[Tuple[str, str]] = []
+        changed: List[Tuple[str, Tuple[int, int, int, int], int]] = []
+        errors: List[Dict[str, str]] = []
+        seen = 0
+        total_bytes = 0
+        root_device = os.stat(root).st_dev
+        stack = [root]
+        cache = self.cache
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                errors.append({'path': directory, 'error': e.strerror or str(e)})
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        info = entry.stat(follow_symlinks=False)
+                    except OSError as e:
+                        errors.append({'path': entry.path, 'error': e.strerror or str(e)})
+                        continue
+                    mode = info.st_mode
+                    if stat.S_ISDIR(mode):
+                        if one_filesystem and info.st_dev != root_device:
+                            continue
+                        if entry.path in PSEUDO_FILESYSTEMS:
+                            continue
+                        stack.append(entry.path)
+                    elif stat.S_ISREG(mode):
+                        seen += 1
+                        total_bytes += info.st_size
+                        key = (info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns)
+                        cached = cache.get(entry.path)
+                        if cached is not None and cached[:4] == key:
+                            unchanged.append((entry.path, cached[4]))
+                        else:
+                            changed.append((entry.path, key, info.st_size))
+        return unchanged, changed, seen, total_bytes, errors
+    
+    def _prune(self, root: str, seen: set):
+        """Forget cached files under root that no longer exist"""
+        prefix = root.rstrip(os.sep) + os.sep
+        for path in [path for path in self.cache if path.startswith(prefix) and path not in seen]:
+            del self.cache[path]
+    
+    async def scan(self, root: str, process_pool: Optional[Executor] = None,
+                   one_filesystem: bool = True) -> Dict[str, Any]:
+        """Scan every regular file under root"""
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            unchanged, changed, seen, total_bytes, errors = await loop.run_in_executor(
+                None, self._walk, root, one_filesystem
+            )
+            walked = time.perf_counter() - start
+            
+            batches: List[List[str]] = []
+            batch: List[str] = []
+            batch_bytes = 0
+            bytes_to_hash = 0
+            for path, _, size in changed:
+                batch.append(path)
+                batch_bytes += size
+                bytes_to_hash += size
+                if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+                    batches.append(batch)
+                    batch, batch_bytes = [], 0
+            if batch:
+                batches.append(batch)
+            
+            executor = process_pool if bytes_to_hash >= PROCESS_POOL_MIN_BYTES else None
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, hash_batch, batch) for batch in batches)
+            )
+            
+            keys = {path: key for path, key, _ in changed}
+            digests = list(unchanged)
+            bytes_hashed = 0
+            for batch_result in results:
+                for path, digest, error in batch_result:
+                    if digest is None:
+                        errors.append({'path': path, 'error': error})
+                        self.cache.pop(path, None)
+                        continue
+                    key = keys[path]
+                    self.cache[path] = (*key, digest)
+                    bytes_hashed += key[2]
+                    digests.append((path, digest))
+            self._prune(root, {path for path, _ in digests})
+            
+            threats = []
+            for path, digest in digests:
+                name = self.signatures.match(digest)
+                if name is not None:
+                    threats.append({'path': path, 'signature': name, 'sha256': digest})
+            elapsed = time.perf_counter() - start
+        
+        return {
+            'files_scanned': seen,
+            'files_hashed': len(changed),
+            'cache_hits': len(unchanged),
+            'bytes_scanned': total_bytes,
+            'bytes_hashed': bytes_hashed,
+            'elapsed_seconds': round(elapsed, 3),
+            'walk_seconds': round(walked, 3),
+            'files_per_sec': round(seen / elapsed, 1) if elapsed > 0 else 0.0,
+            'bytes_per_sec': round(bytes_hashed / (elapsed - walked), 1) if elapsed > walked else 0.0,
+            'hashed_in': 'processes' if executor is not None else 'threads',
+            'threats': threats,
+            'errors': len(errors),
+            'error_details': errors[:MAX_REPORTED_ERRORS]
+        }
@@ -0,0 +1,225 @@
+"""Usage Model - Fixed-memory online model of kernel usage"""
+
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+import time
+
+# Ring buffer lengths: per-minute counts for the last hour, hourly for a week
+MINUTES = 60
+HOURS = 7 * 24
+
+# Minutes into the hour after which an upcoming peak triggers pre-warming
+PREWARM_LEAD_MINUTE = 50
+
+# An hour counts as a peak when forecast at this multiple of the daily mean
+PEAK_FACTOR = 1.5
+
+class SpaceSaving:
+    """Streaming top-k heavy hitters in a fixed number of counters
+    
+    Space-Saving algorithm: an untracked key replaces the smallest counter
+    and inherits its count as error, so every tracked count overestimates
+    the true count by at most its error. Each counter also keeps a latency
+    EWMA and a failure count for the key.
+    """
+    
+    __slots__ = ('capacity', 'counters')
+    
+    def __init__(self, capacity: int = 32):
+        self.capacity = max(1, capacity)
+        # key -> [count, error, latency_ewma, failures]
+        self.counters: Dict[Hashable, List] = {}
+    
+    def add(self, key: Hashable, seconds: float = 0.0, failed: bool = False):
+        counter = self.counters.get(key)
+        if counter is None:
+            if len(self.counters) < self.capacity:
+                counter = self.counters[key] = [0, 0, seconds, 0]
+            else:
+                victim = min(self.counters, key=lambda k: self.counters[k][0])
+                floor = self.counters.pop(victim)[0]
+                counter = self.counters[key] = [floor, floor, seconds, 0]
+        counter[0] += 1
+        counter[2] += 0.2 * (seconds - counter[2])
+        if failed:
+            counter[3] += 1
+    
+    def top(self, n: int) -> List[Tuple[Hashable, List]]:
+        return sorted(self.counters.items(), key=lambda item: -item[1][0])[:n]
+
+class UsageModel:
+    """Online usage statistics whose memory never grows with uptime
+    
+    Every recorded call lands in a per-minute and a per-hour ring buffer and
+    in Space-Saving summaries of agent actions and command texts. When an
+    hour closes its count updates two exponentially smoothed series: an
+    overall level and a per-hour-of-day profile. The next-hour forecast
+    blends the two. All queries read a constant amount of state.
+    """
+    
+    def __init__(self, alpha: float = 0.3, seasonal_alpha: float = 0.2, top_k: int = 32):
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.utc_offset = time.localtime().tm_gmtoff
+        self.minute_ids = [-1] * MINUTES
+        self.minute_counts = [0] * MINUTES
+        self.hour_ids = [-1] * HOURS
+        self.hour_counts = [0] * HOURS
+        self.current_hour: Optional[int] = None
+        self.level: Optional[float] = None
+        self.daily: List[Optional[float]] = [None] * 24
+        self.hours_closed = 0
+        self.total = 0
+        self.failures = 0
+        self.actions = SpaceSaving(top_k)
+        self.agents = SpaceSaving(top_k)
+        self.commands = SpaceSaving(top_k)
+        self.prewarmed_hour = -1
+    
+    def record(self, agent: str, action: str, seconds: float, failed: bool = False,
+               now: Optional[float] = None):
+        """Count one agent call"""
+        minute = int(((now or time.time()) + self.utc_offset) // 60)
+        hour = minute // 60
+        if hour != self.current_hour:
+            self._advance(hour)
+        
+        slot = minute % MINUTES
+        if self.minute_ids[slot] != minute:
+            self.minute_ids[slot] = minute
+            self.minute_counts[slot] = 0
+        self.minute_counts[slot] += 1
+        slot = hour % HOURS
+        if self.hour_ids[slot] != hour:
+            self.hour_ids[slot] = hour
+            self.hour_counts[slot] = 0
+        self.hour_counts[slot] += 1
+        
+        self.total += 1
+        if failed:
+            self.failures += 1
+        self.actions.add((agent, action), seconds, failed)
+        self.agents.add(agent, seconds, failed)
+    
+    def record_command(self, command: str):
+        """Count one command text, used to warm the intent cache"""
+        self.commands.add(command)
+    
+    def _count(self, hour: int) -> int:
+        slot = hour % HOURS
+        return self.hour_counts[slot] if self.hour_ids[slot] == hour else 0
+    
+    def _advance(self, hour: int):
+        """Close every hour from the current one up to (not including) hour"""
+        if self.current_hour is None or hour < self.current_hour:
+            self.current_hour = hour
+            return
+        # After a week of silence every smoothed value has decayed the same way
+        for closed in range(max(self.current_hour, hour - HOURS), hour):
+            count = self._count(closed)
+            if self.level is None:
+                self.level = float(count)
+            else:
+                self.level += self.alpha * (count - self.level)
+            profile = self.daily[closed % 24]
+            if profile is None:
+                self.daily[closed % 24] = float(count)
+            else:
+                self.daily[closed % 24] = profile + self.seasonal_alpha * (count - profile)
+            self.hours_closed += 1
+        self.current_hour = hour
+    
+    def _sync(self):
+        """Close hours that passed with no calls before answering queries"""
+        hour = int((time.time() + self.utc_offset) // 3600)
+        if hour != self.current_hour:
+            self._advance(hour)
+    
+    def forecast(self, hour: int) -> float:
+        """Expected calls in an hour (as a local hour number)"""
+        profile = self.daily[hour % 24]
+        if self.level is None:
+            # Nothing closed yet: extrapolate the current hour
+            elapsed = max(60.0, (time.time() + self.utc_offset) % 3600)
+            return self._count(self.current_hour or 0) * 3600 / elapsed
+        if profile is None:
+            return self.level
+        return 0.5 * (self.level + profile)
+    
+    def _daily_mean(self) -> float:
+        known = [value for value in self.daily if value is not None]
+        return sum(known) / len(known) if known else 0.0
+    
+    def is_peak(self, hour: int) -> bool:
+        expected = self.forecast(hour)
+        return expected >= 1 and expected >= PEAK_FACTOR * self._daily_mean()
+    
+    def due_prewarm(self, now: Optional[float] = None) -> bool:
+        """True once per hour, late in an hour that precedes a forecast peak"""
+        minute = int(((now or time.time()) + self.utc_offset) // 60)
+        hour = minute // 60
+        if minute % 60 < PREWARM_LEAD_MINUTE or self.prewarmed_hour == hour:
+            return False
+        self.prewarmed_hour = hour
+        return self.hours_closed > 0 and self.is_peak(hour + 1)
+    
+    def prewarm_plan(self, agents: int = 8, commands: int = 32) -> Dict[str, List[str]]:
+        """Agents and command texts most worth having warm"""
+        return {
+            'agents': [agent for agent, _ in self.agents.top(agents)],
+            'commands': [command for command, _ in self.commands.top(commands)]
+        }
+    
+    def last_hour(self) -> int:
+        """Calls in the last 60 minutes"""
+        oldest = int((time.time() + self.utc_offset) // 60) - MINUTES
+        return sum(
+            count for minute, count in zip(self.minute_ids, self.minute_counts) if minute > oldest
+        )
+    
+    def predict(self) -> Dict[str, Any]:
+        """Next-hour forecast and what to prepare for it"""
+        self._sync()
+        next_hour = (self.current_hour or 0) + 1
+        expected = self.forecast(next_hour)
+        peak = self.hours_closed > 0 and self.is_peak(next_hour)
+        mean = self._daily_mean()
+        if peak:
+            activity = 'high activity'
+        elif expected >= 0.5 * mean and expected > 0:
+            activity = 'moderate activity'
+        else:
+            activity = 'low activity'
+        return {
+            'next_hour': activity,
+            'expected_commands': round(expected, 1),
+            'hour_of_day': next_hour % 24,
+            'peak': peak,
+            'suggested_optimization': 'work' if peak else 'balanced',
+            # Grows towards 1 as more hours of history are folded in
+            'confidence': round(self.hours_closed / (self.hours_closed + 24), 3),
+            'prewarm': self.prewarm_plan()
+        }
+    
+    def patterns(self, top: int = 10) -> Dict[str, Any]:
+        """Peak hours, common tasks and success rate"""
+        self._sync()
+        profile = [(hour, value) for hour, value in enumerate(self.daily) if value is not None]
+        peaks = sorted(profile, key=lambda item: -item[1])[:3]
+        return {
+            'peak_hours': [f'{hour:02d}:00' for hour, value in peaks if value > 0],
+            'common_tasks': [
+                {
+                    'agent': agent,
+                    'action': action,
+                    'count': count,
+                    'max_overcount': error,
+                    'latency_ms': round(latency * 1000, 3),
+                    'failures': failures
+                }
+                for (agent, action), (count, error, latency, failures) in self.actions.top(top)
+            ],
+            'last_hour': self.last_hour(),
+            'hourly_level': round(self.level, 2) if self.level is not None else None,
+            'observed': self.total,
+            'efficiency': round(1 - self.failures / self.total, 3) if self.total else None
+        }
@@ -1,10 +1,21 @@
 """User Agent - Manages user interactions and preferences"""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent
 
+# Returned for any preference a user has not set
+DEFAULT_PREFERENCES = {
+    'theme': 'dark',
+    'language': 'en',
+    'performance_mode': 'balanced'
+}
+
 class UserAgent(BaseAgent):
-    """Handles user-related operations"""
+    """Handles user-related operations
+    
+    Everything is scoped to the session's user, self.user; a user_id in
+    params is accepted only when it names that same user.
+    """
     
     def __init__(self):
         super().__init__('user')
@@ -13,7 +24,9 @@ class UserAgent(BaseAgent):
             'session_management',
             'profile_access'
         ]
-        
+        # Session started by this agent's first get_session
+        self.session_id: Optional[str] = None
+    
     async def execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute user-related actions"""
         
@@ -26,32 +39,87 @@ class UserAgent(BaseAgent):
         else:
             return {'error': f'Unknown action: {action}'}
     
+    def _foreign(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Error result when params names a user other than the session's"""
+        requested = params.get('user_id')
+        if requested is None or str(requested) == self.user:
+            return None
+        return {
+            'status': 'error',
+            'message': f'Permission denied: {self.user} may not access user {requested}'
+        }
+    
     async def _get_preferences(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Get user preferences"""
+        """Get user preferences from the in-memory store"""
+        denied = self._foreign(params)
+        if denied:
+            return denied
+        user_id = self.user
         return {
             'status': 'success',
-            'preferences': {
-                'theme': 'dark',
-                'language': 'en',
-                'performance_mode': 'balanced'
-            }
+            'user_id': user_id,
+            'preferences': {**DEFAULT_PREFERENCES, **self.runtime.users().get_preferences(user_id)}
         }
     
     async def _update_preferences(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Update user preferences"""
+        """Update user preferences; persisted by the store's write-behind flush"""
+        denied = self._foreign(params)
+        if denied:
+            return denied
+        user_id = self.user
+        updates = params.get('preferences')
+        if not isinstance(updates, dict) or not updates:
+            return {
+                'status': 'error',
+                'message': 'preferences must be a non-empty object'
+            }
+        try:
+            stored = self.runtime.users().update_preferences(user_id, updates)
+        except (TypeError, ValueError) as e:
+            return {
+                'status': 'error',
+                'message': f'Preference values must be JSON-serializable: {e}'
+            }
         return {
             'status': 'success',
+            'user_id': user_id,
+            'preferences': {**DEFAULT_PREFERENCES, **stored},
             'message': 'Preferences updated'
         }
     
     async def _get_session(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Get current session info"""
+        """Get current session info, starting a persistent session on first use
+        
+        Only sessions of the session's user are found; another user's
+        session id is reported as unknown.
+        """
+        denied = self._foreign(params)
+        if denied:
+            return denied
+        store = self.runtime.users()
+        session_id = params.get('session_id') or self.session_id
+        try:
+            session = (store.touch_session(session_id, params.get('data'), self.user)
+                       if session_id else None)
+        except (TypeError, ValueError) as e:
+            return {
+                'status': 'error',
+                'message': f'Session data must be JSON-serializable: {e}'
+            }
+        if session is None:
+            if params.get('session_id'):
+                return {
+                    'status': 'error',
+                    'message': f"Unknown session: {params['session_id']}"
+                }
+            session = store.start_session(self.user, self.distribution)
+            self.session_id = session['session_id']
+        
         return {
             'status': 'success',
             'session': {
-                'user_id': params.get('user_id'),
-                'distribution': params.get('distribution', 'wayneos'),
-                'uptime': 3600
+                **session,
+                'uptime': round(session['last_seen'] - session['started'], 3)
             }
         }
     
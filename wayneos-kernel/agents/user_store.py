@@ -0,0 +1,298 @@
+"""User Store - SQLite-backed preferences and sessions with write-behind caching"""
+
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from .filesystem_agent import default_root
+
+logger = logging.getLogger('wayneos.user')
+
+DB_FILENAME = 'users.sqlite'
+
+# Seconds between write-behind flushes
+FLUSH_INTERVAL = 0.5
+
+# Pending changes that trigger a flush before the interval is up
+FLUSH_BATCH = 5000
+
+# Sessions not seen for this many seconds are deleted
+SESSION_TTL = 7 * 24 * 3600
+
+# Sessions kept at most; past it the least recently seen are deleted
+MAX_SESSIONS = 10000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS preferences (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (user_id, key)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    distribution TEXT NOT NULL,
+    started REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    data TEXT NOT NULL
+);
+'''
+
+def default_user_db() -> str:
+    """Database from WAYNEOS_USER_DB, else <sandbox root>/users.sqlite"""
+    return os.environ.get('WAYNEOS_USER_DB') or os.path.join(default_root(), DB_FILENAME)
+
+class UserStore:
+    """Preferences and sessions served from memory, persisted behind the caller
+    
+    Everything is loaded into dictionaries when the store opens, so reads
+    never touch the database. Writes update the dictionaries and record the
+    changed (user, key) or session in a pending map, where repeated writes
+    to the same entry coalesce. A background task writes the pending map in
+    one transaction every FLUSH_INTERVAL, or sooner once FLUSH_BATCH changes
+    are waiting. close() writes whatever is left with synchronous=FULL and
+    checkpoints the WAL, so a clean shutdown loses nothing. Sessions idle
+    for longer than session_ttl are deleted when the store opens, and the
+    least recently seen whenever more than max_sessions are held.
+    """
+    
+    def __init__(self, path: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL,
+                 flush_batch: int = FLUSH_BATCH, session_ttl: float = SESSION_TTL,
+                 max_sessions: int = MAX_SESSIONS):
+        self.path = path or default_user_db()
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.session_ttl = session_ttl
+        self.max_sessions = max(1, max_sessions)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db: Optional[sqlite3.Connection] = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        with self.db:
+            self.db.execute('DELETE FROM sessions WHERE last_seen < ?', (time.time() - session_ttl,))
+        # Serializes database access between flushes and close()
+        self.lock = threading.Lock()
+        
+        self.preferences: Dict[str, Dict[str, Any]] = {}
+        for user_id, key, value in self.db.execute('SELECT user_id, key, value FROM preferences'):
+            self.preferences.setdefault(user_id, {})[key] = json.loads(value)
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        for session_id, user_id, distribution, started, last_seen, data in self.db.execute(
+            'SELECT session_id, user_id, distribution, started, last_seen, data FROM sessions'
+        ):
+            self.sessions[session_id] = {
+                'session_id': session_id,
+                'user_id': user_id,
+                'distribution': distribution,
+                'started': started,
+                'last_seen': last_seen,
+                'data': json.loads(data)
+            }
+        
+        # (user, key) -> (JSON text or None to delete, time); session id -> row or None to delete
+        self.pending_preferences: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+        self.pending_sessions: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Batch handed to the executor and not yet committed
+        self.inflight: Optional[Tuple[Dict, Dict]] = None
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.updates = 0
+        self.expired = 0
+        if len(self.sessions) > self.max_sessions:
+            self._expire(time.time())
+    
+    def get_preferences(self, user_id: str) -> Dict[str, Any]:
+        return dict(self.preferences.get(user_id, {}))
+    
+    def update_preferences(self, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply updates (None deletes a key) and return the user's preferences"""
+        now = time.time()
+        # Encode first so a value that cannot be stored changes nothing
+        encoded = {
+            key: None if value is None else json.dumps(value)
+            for key, value in updates.items()
+        }
+        stored = self.preferences.setdefault(user_id, {})
+        for key, value in updates.items():
+            if value is None:
+                stored.pop(key, None)
+            else:
+                stored[key] = value
+            self.pending_preferences[(user_id, str(key))] = (encoded[key], now)
+        self.updates += 1
+        self._schedule()
+        return dict(stored)
+    
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self.sessions.get(session_id)
+        return dict(session) if session is not None else None
+    
+    def start_session(self, user_id: str, distribution: str) -> Dict[str, Any]:
+        now = time.time()
+        session = {
+            'session_id': uuid.uuid4().hex,
+            'user_id': user_id,
+            'distribution': distribution,
+            'started': now,
+            'last_seen': now,
+            'data': {}
+        }
+        self.sessions[session['session_id']] = session
+        self.pending_sessions[session['session_id']] = session
+        if len(self.sessions) > self.max_sessions:
+            self._expire(now)
+        self._schedule()
+        return dict(session)
+    
+    def _expire(self, now: float):
+        """Delete idle sessions, then the least recently seen down to 90% of the cap"""
+        cutoff = now - self.session_ttl
+        ordered = sorted(self.sessions.values(), key=lambda session: session['last_seen'])
+        excess = len(ordered) - self.max_sessions * 9 // 10
+        for index, session in enumerate(ordered):
+            if index >= excess and session['last_seen'] >= cutoff:
+                break
+            del self.sessions[session['session_id']]
+            self.pending_sessions[session['session_id']] = None
+            self.expired += 1
+    
+    def touch_session(self, session_id: str, data: Optional[Dict[str, Any]] = None,
+                      user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Mark a session seen now, merging data into it; None if unknown or not user_id's"""
+        session = self.sessions.get(session_id)
+        if session is None or (user_id is not None and session['user_id'] != user_id):
+            return None
+        if data:
+            json.dumps(data)
+            session['data'] = {**session['data'], **data}
+        session['last_seen'] = time.time()
+        self.pending_sessions[session_id] = session
+        self._schedule()
+        return dict(session)
+    
+    def pending(self) -> int:
+        return len(self.pending_preferences) + len(self.pending_sessions)
+    
+    def _schedule(self):
+        """Start the flusher on first write; wake it early for a full batch"""
+        if self.task is None or self.task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No loop (synchronous use): close() writes everything
+                return
+            self.wakeup = asyncio.Event()
+            self.task = loop.create_task(self._run())
+        elif self.pending() >= self.flush_batch:
+            self.wakeup.set()
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """Write pending changes in one transaction; returns the rows written"""
+        if not self.pending() or self.inflight is not None or self.db is None:
+            return 0
+        batch = (self.pending_preferences, self.pending_sessions)
+        self.pending_preferences, self.pending_sessions = {}, {}
+        self.inflight = batch
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self._write_batch, batch)
+        except sqlite3.Error as e:
+            logger.error(f"User store flush failed, will retry: {e}")
+            # Requeue without overwriting anything written since
+            for key, value in batch[0].items():
+                self.pending_preferences.setdefault(key, value)
+            for key, value in batch[1].items():
+                self.pending_sessions.setdefault(key, value)
+            self.inflight = None
+            return 0
+    
+    def _write_batch(self, batch: Tuple[Dict, Dict]) -> int:
+        with self.lock:
+            if self.db is None:
+                # close() already wrote this batch
+                return 0
+            rows = self._write(*batch)
+            self.inflight = None
+            return rows
+    
+    def _write(self, preferences: Dict, sessions: Dict) -> int:
+        """Commit one batch; the caller holds self.lock"""
+        upserts = [
+            (user_id, key, value, updated)
+            for (user_id, key), (value, updated) in preferences.items() if value is not None
+        ]
+        deletes = [key for key, (value, _) in preferences.items() if value is None]
+        rows = [
+            (session['session_id'], session['user_id'], session['distribution'],
+             session['started'], session['last_seen'], json.dumps(session['data']))
+            for session in sessions.values() if session is not None
+        ]
+        ended = [(session_id,) for session_id, session in sessions.items() if session is None]
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO preferences (user_id, key, value, updated) VALUES (?, ?, ?, ?)',
+                upserts
+            )
+            self.db.executemany('DELETE FROM preferences WHERE user_id = ? AND key = ?', deletes)
+            self.db.executemany(
+                'INSERT OR REPLACE INTO sessions '
+                '(session_id, user_id, distribution, started, last_seen, data) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.db.executemany('DELETE FROM sessions WHERE session_id = ?', ended)
+        written = len(upserts) + len(deletes) + len(rows) + len(ended)
+        self.flushes += 1
+        self.rows_written += written
+        return written
+    
+    def close(self):
+        """Stop the flusher and durably write everything still pending"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        with self.lock:
+            if self.db is None:
+                return
+            preferences, sessions = self.pending_preferences, self.pending_sessions
+            if self.inflight is not None:
+                # Queued but not yet written: newer pending values win
+                preferences = {**self.inflight[0], **preferences}
+                sessions = {**self.inflight[1], **sessions}
+            self.db.execute('PRAGMA synchronous=FULL')
+            self._write(preferences, sessions)
+            self.db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.db.close()
+            self.db = None
+            self.pending_preferences, self.pending_sessions = {}, {}
+            self.inflight = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'users': len(self.preferences),
+            'sessions': len(self.sessions),
+            'expired_sessions': self.expired,
+            'pending': self.pending(),
+            'updates': self.updates,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written
+        }
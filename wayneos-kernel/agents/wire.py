@@ -0,0 +1,211 @@
+"""Wire - Message codecs for the kernel bridge protocol"""
+
+from typing import Dict, Any, List, Optional, Callable
+import asyncio
+import json
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Length prefix of framed codecs: unsigned 32-bit big-endian payload size
+FRAME_HEADER = struct.Struct('>I')
+
+# Largest single message accepted in any format
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+class FrameError(ValueError):
+    """Raised on a frame the stream cannot recover from"""
+
+class NDJSONCodec:
+    """Newline-delimited JSON, the default format"""
+    
+    name = 'ndjson'
+    label = 'JSON'
+    
+    async def read(self, reader) -> Optional[bytes]:
+        """Return the next raw message, or None at end of stream"""
+        line = await reader.readline()
+        return line or None
+    
+    def decode(self, payload: bytes) -> Any:
+        return json.loads(payload)
+    
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return json.dumps(message).encode() + b'\n'
+
+class FramedCodec:
+    """Length-prefixed frames carrying a serialized payload
+    
+    Frames skip line scanning on read, and payloads may contain raw
+    newlines or, with frame-bin and msgpack, binary data. frame-bin is a
+    tagged binary encoding built on struct, so a binary format is available
+    without optional packages: values are a one-byte tag followed by a
+    big-endian int64, float64, or u32 length or count and the contents.
+    """
+    
+    def __init__(self, name: str, label: str,
+                 dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]):
+        self.name = name
+        self.label = label
+        self.dumps = dumps
+        self.loads = loads
+        
+    async def read(self, reader) -> Optional[bytes]:
+        """Return the next frame payload, or None at a clean end of stream"""
+        try:
+            header = await reader.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise FrameError('Truncated frame header')
+        (length,) = FRAME_HEADER.unpack(header)
+        if length > MAX_MESSAGE_BYTES:
+            raise FrameError(f'Frame of {length} bytes exceeds {MAX_MESSAGE_BYTES}')
+        return await reader.readexactly(length)
+    
+    def decode(self, payload: bytes) -> Any:
+        return self.loads(payload)
+    
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        payload = self.dumps(message)
+        return FRAME_HEADER.pack(len(payload)) + payload
+
+def _compact_json(message: Any) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode()
+
+# Binary value tags of the frame-bin format
+_NONE, _TRUE, _FALSE, _INT, _BIGINT, _FLOAT, _STR, _BYTES, _LIST, _MAP = b'NTFiIdsblm'
+_INT64 = struct.Struct('>q')
+_FLOAT64 = struct.Struct('>d')
+_LENGTH = struct.Struct('>I')
+_TAGGED_INT = struct.Struct('>Bq')
+_TAGGED_FLOAT = struct.Struct('>Bd')
+_TAGGED_LENGTH = struct.Struct('>BI')
+
+# Nesting deeper than this is refused instead of exhausting the stack
+MAX_BINARY_DEPTH = 64
+
+def _pack(value: Any, out: List[bytes], depth: int = 0):
+    if depth > MAX_BINARY_DEPTH:
+        raise ValueError('Message nested too deeply')
+    kind = type(value)
+    if kind is str:
+        data = value.encode()
+        out.append(_TAGGED_LENGTH.pack(_STR, len(data)))
+        out.append(data)
+    elif kind is dict:
+        out.append(_TAGGED_LENGTH.pack(_MAP, len(value)))
+        for key, item in value.items():
+            _pack(key, out, depth + 1)
+            _pack(item, out, depth + 1)
+    elif kind is list or kind is tuple:
+        out.append(_TAGGED_LENGTH.pack(_LIST, len(value)))
+        for item in value:
+            _pack(item, out, depth + 1)
+    elif value is None:
+        out.append(b'N')
+    elif kind is bool:
+        out.append(b'T' if value else b'F')
+    elif kind is int:
+        if -(1 << 63) <= value < 1 << 63:
+            out.append(_TAGGED_INT.pack(_INT, value))
+        else:
+            data = str(value).encode()
+            out.append(_TAGGED_LENGTH.pack(_BIGINT, len(data)))
+            out.append(data)
+    elif kind is float:
+        out.append(_TAGGED_FLOAT.pack(_FLOAT, value))
+    elif kind is bytes or kind is bytearray:
+        out.append(_TAGGED_LENGTH.pack(_BYTES, len(value)))
+        out.append(bytes(value))
+    else:
+        raise TypeError(f'Object of type {kind.__name__} cannot be sent in binary frames')
+
+def _pack_binary(message: Any) -> bytes:
+    out: List[bytes] = []
+    _pack(message, out)
+    return b''.join(out)
+
+def _unpack(data: bytes, offset: int, depth: int):
+    """(value, next offset) of the value encoded at offset"""
+    if depth > MAX_BINARY_DEPTH:
+        raise ValueError('Message nested too deeply')
+    tag = data[offset]
+    offset += 1
+    if tag == _STR or tag == _BYTES or tag == _BIGINT:
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += 4
+        end = offset + length
+        if end > len(data):
+            raise ValueError('Truncated binary message')
+        chunk = data[offset:end]
+        if tag == _STR:
+            return chunk.decode(), end
+        return (chunk if tag == _BYTES else int(chunk)), end
+    if tag == _INT:
+        return _INT64.unpack_from(data, offset)[0], offset + 8
+    if tag == _MAP or tag == _LIST:
+        (count,) = _LENGTH.unpack_from(data, offset)
+        offset += 4
+        # Every element takes at least one byte, so a bogus count fails fast
+        if count > len(data) - offset:
+            raise ValueError('Truncated binary message')
+        if tag == _LIST:
+            items = []
+            for _ in range(count):
+                item, offset = _unpack(data, offset, depth + 1)
+                items.append(item)
+            return items, offset
+        mapping = {}
+        for _ in range(count):
+            key, offset = _unpack(data, offset, depth + 1)
+            item, offset = _unpack(data, offset, depth + 1)
+            mapping[key] = item
+        return mapping, offset
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, offset)[0], offset + 8
+    raise ValueError(f'Unknown binary tag {tag}')
+
+def _unpack_binary(payload: bytes) -> Any:
+    try:
+        value, end = _unpack(payload, 0, 0)
+    except (IndexError, struct.error, TypeError) as e:
+        # TypeError: an unhashable list or map used as a map key
+        raise ValueError(f'Malformed binary message: {e}')
+    if end != len(payload):
+        raise ValueError('Trailing bytes after binary message')
+    return value
+
+def available_codecs() -> List[str]:
+    """Names of the formats usable in this environment"""
+    names = ['ndjson', 'frame-json', 'frame-bin']
+    if msgpack is not None:
+        names.append('msgpack')
+    return names
+
+def get_codec(name: str):
+    """Return a codec by name; raises ValueError if it is unknown or unavailable"""
+    if name == 'ndjson':
+        return NDJSONCodec()
+    if name == 'frame-json':
+        return FramedCodec('frame-json', 'JSON', _compact_json, json.loads)
+    if name == 'frame-bin':
+        return FramedCodec('frame-bin', 'binary message', _pack_binary, _unpack_binary)
+    if name == 'msgpack':
+        if msgpack is None:
+            raise ValueError('msgpack wire format requires the msgpack package')
+        return FramedCodec(
+            'msgpack', 'msgpack',
+            lambda message: msgpack.packb(message, use_bin_type=True),
+            lambda payload: msgpack.unpackb(payload, raw=False)
+        )
+    raise ValueError(f'Unknown wire format: {name}')
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Connectivity prober benchmark
+Probes local stand-ins for remote endpoints: listeners that accept,
+closed ports that refuse, and listeners with a full accept backlog whose
+connects hang until the timeout. Runs a cold probe that pools its
+connections, then a warm one that reuses them, and reports both against
+the timeout
+"""
+
+import argparse
+import asyncio
+import socket
+
+from common import write_report
+from agents.connectivity import ConnectivityProber
+
+async def start_listeners(count: int):
+    servers = []
+    for _ in range(count):
+        server = await asyncio.start_server(lambda r, w: None, '127.0.0.1', 0)
+        servers.append(server)
+    return servers, [f"127.0.0.1:{server.sockets[0].getsockname()[1]}" for server in servers]
+
+def refused_ports(count: int):
+    targets = []
+    for _ in range(count):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            targets.append(f"127.0.0.1:{sock.getsockname()[1]}")
+    return targets
+
+def stalled_listeners(count: int):
+    """Listeners whose backlog is filled so further connects never complete"""
+    sockets, targets = [], []
+    for _ in range(count):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(0)
+        address = listener.getsockname()
+        sockets.append(listener)
+        for _ in range(3):
+            filler = socket.socket()
+            filler.setblocking(False)
+            try:
+                filler.connect(address)
+            except BlockingIOError:
+                pass
+            sockets.append(filler)
+        targets.append(f"127.0.0.1:{address[1]}")
+    return sockets, targets
+
+def summarize(report):
+    return {key: report[key] for key in
+            ('targets', 'reachable', 'failed', 'reused', 'elapsed_ms', 'latency_ms', 'failure_reasons')}
+
+async def run(args):
+    servers, live = await start_listeners(args.live)
+    refused = refused_ports(args.refused)
+    held, stalled = stalled_listeners(args.stalled)
+    targets = live + refused + stalled
+    
+    prober = ConnectivityProber(pool_size=args.live)
+    try:
+        cold = await prober.probe(targets, timeout=args.timeout, reuse=True)
+        warm = await prober.probe(targets, timeout=args.timeout, reuse=True)
+    finally:
+        prober.close()
+        for server in servers:
+            server.close()
+        for sock in held:
+            sock.close()
+    
+    return {
+        'benchmark': 'connectivity',
+        'timeout_ms': args.timeout * 1000,
+        'cold': summarize(cold),
+        'warm': summarize(warm),
+        'cold_elapsed_over_timeout': round(cold['elapsed_ms'] / (args.timeout * 1000), 3),
+        'warm_elapsed_over_timeout': round(warm['elapsed_ms'] / (args.timeout * 1000), 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='WayneOS connectivity prober benchmark')
+    parser.add_argument('--live', type=int, default=400, help='Accepting listeners')
+    parser.add_argument('--refused', type=int, default=50, help='Closed ports')
+    parser.add_argument('--stalled', type=int, default=50, help='Listeners that never accept')
+    parser.add_argument('--timeout', type=float, default=1.0)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    write_report(asyncio.run(run(args)), args.output)
+
+if __name__ == '__main__':
+    main()
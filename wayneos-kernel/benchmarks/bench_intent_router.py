@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Intent routing micro-benchmark
+Compares the compiled IntentRouter with the original loop of re.search calls
+over a large synthetic pattern table and command corpus, and checks that
+both pick the same category, action and match for every command
+"""
+
+import argparse
+import random
+import re
+import time
+
+from common import write_report
+from agents.orchestrator import Orchestrator
+
+VERBS = ['sync', 'backup', 'render', 'export', 'import', 'archive', 'deploy',
+         'index', 'compress', 'encrypt', 'mount', 'schedule', 'share', 'print']
+NOUNS = ['photos', 'music', 'contacts', 'calendar', 'notes', 'logs', 'reports',
+         'invoices', 'videos', 'drive', 'project', 'database', 'playlist']
+
+def legacy_match(command_patterns, text):
+    """Reference implementation: try every raw pattern in table order"""
+    for category, patterns in command_patterns.items():
+        for pattern, action in patterns:
+            match = re.search(pattern, text)
+            if match:
+                return category, action, match
+    return None
+
+def build_orchestrator(extra_categories: int, rng: random.Random) -> Orchestrator:
+    """Orchestrator with synthetic distribution-pack patterns appended"""
+    orchestrator = Orchestrator('wayneos')
+    for i in range(extra_categories):
+        verb = rng.choice(VERBS)
+        noun = rng.choice(NOUNS)
+        orchestrator.register_patterns(f'pack{i}', [
+            (rf'{verb}{i}.*{noun}', f'{verb}_{noun}'),
+            (rf'{verb}{i}\s+(\w+)', f'{verb}_target')
+        ])
+    return orchestrator
+
+def build_corpus(size: int, extra_categories: int, rng: random.Random):
+    """Mix of built-in commands, pack commands and unroutable chatter"""
+    builtin = ['check my work email', 'open firefox', 'optimize for gaming',
+               'create a task list', 'read file notes.txt', 'tune system for work',
+               'show personal mail', 'launch terminal', 'make a todo']
+    chatter = ['what time is it', 'hello there', 'how is the weather today',
+               'tell me a joke about kernels']
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.4:
+            corpus.append(rng.choice(builtin))
+        elif roll < 0.8 and extra_categories:
+            i = rng.randrange(extra_categories)
+            corpus.append(f'please {rng.choice(VERBS)}{i} my {rng.choice(NOUNS)}')
+        else:
+            corpus.append(rng.choice(chatter))
+    return corpus
+
+def time_per_call(fn, corpus) -> float:
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    return (time.perf_counter() - start) / len(corpus)
+
+def main():
+    parser = argparse.ArgumentParser(description='Intent routing micro-benchmark')
+    parser.add_argument('--commands', type=int, default=50000)
+    parser.add_argument('--extra-categories', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    orchestrator = build_orchestrator(args.extra_categories, rng)
+    corpus = [text.lower() for text in build_corpus(args.commands, args.extra_categories, rng)]
+    
+    for text in set(corpus):
+        expected = legacy_match(orchestrator.command_patterns, text)
+        actual = orchestrator.router.match(text)
+        same = (expected is None and actual is None) or (
+            expected is not None and actual is not None
+            and expected[:2] == actual[:2]
+            and expected[2].span() == actual[2].span()
+            and expected[2].groups() == actual[2].groups()
+        )
+        if not same:
+            raise AssertionError(f'Routing mismatch for {text!r}')
+    
+    legacy = time_per_call(lambda text: legacy_match(orchestrator.command_patterns, text), corpus)
+    routed = time_per_call(orchestrator.router.match, corpus)
+    
+    write_report({
+        'benchmark': 'intent_router',
+        'commands': args.commands,
+        'patterns': len(orchestrator.router.routes),
+        'legacy_us_per_command': round(legacy * 1e6, 3),
+        'router_us_per_command': round(routed * 1e6, 3),
+        'speedup': round(legacy / routed, 2)
+    }, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark for the WayneOS kernel
+Replays a weighted mix of commands touching all seven agents at a target
+rate, either through a kernel_bridge.py subprocess or against WayneOSKernel
+in-process, and reports throughput, latency percentiles, RSS and startup
+time as JSON
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Any, List
+
+from common import KERNEL_DIR, percentiles, write_report
+
+def plan(agent: str, action: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Single-step plan command addressing one agent action directly"""
+    return {
+        'type': 'plan',
+        'command': f'{agent}.{action}',
+        'params': {'steps': [{'id': 'step', 'agent': agent, 'action': action,
+                              'params': params or {}}]}
+    }
+
+def execute(command: str) -> Dict[str, Any]:
+    return {'type': 'execute', 'command': command, 'params': {}}
+
+# Weighted command mixes, as (weight, command)
+MIXES = {
+    'default': [
+        (20, execute('check my work email')),
+        (10, execute('create a task list')),
+        # Routed to launch_application but refused by the allowlist, so the
+        # benchmark exercises the launch path without spawning real apps
+        (10, execute('open benchmark-app')),
+        (5, execute('scan for threats')),
+        (10, plan('user', 'get_preferences')),
+        (5, plan('user', 'get_session')),
+        (8, plan('process', 'list_processes')),
+        (6, plan('network', 'check_connectivity')),
+        (4, plan('network', 'monitor_traffic')),
+        (5, plan('hardware', 'monitor_performance')),
+        (4, plan('security', 'check_permissions', {'resource': '/home/user'})),
+        (5, plan('ml', 'predict_usage'))
+    ],
+    'email': [
+        (1, execute('check my work email')),
+        (1, execute('show personal mail'))
+    ],
+    'dashboard': [
+        (1, {'type': 'batch', 'command': 'dashboard', 'params': {'commands': [
+            plan('hardware', 'get_hardware_info'),
+            plan('process', 'list_processes'),
+            plan('user', 'get_preferences'),
+            plan('network', 'check_connectivity')
+        ]}})
+    ]
+}
+
+def read_rss_kb(pid: int) -> Dict[str, int]:
+    """Current and peak resident set size of a process in KiB"""
+    result = {'rss_kb': 0, 'peak_rss_kb': 0}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    result['rss_kb'] = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    result['peak_rss_kb'] = int(line.split()[1])
+    except OSError:
+        pass
+    return result
+
+class SubprocessTarget:
+    """kernel_bridge.py driven over its stdin/stdout pipes"""
+    
+    def __init__(self, distribution: str, extra_args: List[str]):
+        self.distribution = distribution
+        self.extra_args = extra_args
+        self.waiters: Dict[int, asyncio.Future] = {}
+        
+    async def start(self) -> float:
+        start = time.perf_counter()
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, 'kernel_bridge.py', '--distribution', self.distribution,
+            *self.extra_args,
+            cwd=KERNEL_DIR, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL, limit=64 * 1024 * 1024
+        )
+        self.reader = asyncio.ensure_future(self._read_responses())
+        await self.send(0, plan('process', 'list_processes'))
+        return time.perf_counter() - start
+    
+    async def _read_responses(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            waiter = self.waiters.pop(response.get('id'), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(response)
+        for waiter in self.waiters.values():
+            waiter.set_exception(ConnectionError('kernel bridge exited'))
+    
+    async def send(self, request_id: int, command: Dict[str, Any]) -> Dict[str, Any]:
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[request_id] = waiter
+        self.process.stdin.write(json.dumps({**command, 'id': request_id}).encode() + b'\n')
+        await self.process.stdin.drain()
+        return await waiter
+    
+    def memory(self) -> Dict[str, int]:
+        return read_rss_kb(self.process.pid)
+    
+    async def stop(self):
+        self.process.stdin.close()
+        await self.process.wait()
+        self.reader.cancel()
+
+class InProcessTarget:
+    """WayneOSKernel called directly, without the bridge I/O"""
+    
+    def __init__(self, distribution: str, extra_args: List[str]):
+        self.distribution = distribution
+        
+    async def start(self) -> float:
+        start = time.perf_counter()
+        from kernel_bridge import WayneOSKernel, Command
+        self.command_type = Command
+        self.kernel = WayneOSKernel(self.distribution)
+        await self.send(0, plan('process', 'list_processes'))
+        return time.perf_counter() - start
+    
+    async def send(self, request_id: int, command: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.kernel.process_command(self.command_type(**command, id=request_id))
+    
+    def memory(self) -> Dict[str, int]:
+        return read_rss_kb(os.getpid())
+    
+    async def stop(self):
+        pass
+
+async def run_load(target, mix, rate: float, count: int, seed: int) -> Dict[str, Any]:
+    """Issue count commands open-loop at the target rate (0 = unthrottled)"""
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in mix]
+    commands = [command for _, command in mix]
+    latencies: List[float] = []
+    failures = 0
+    peak_rss = 0
+    
+    async def one(request_id: int, command: Dict[str, Any]):
+        nonlocal failures
+        sent = time.perf_counter()
+        response = await target.send(request_id, command)
+        latencies.append(time.perf_counter() - sent)
+        if not response.get('success'):
+            failures += 1
+    
+    tasks = []
+    start = time.perf_counter()
+    for i in range(count):
+        if rate > 0:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        command = rng.choices(commands, weights)[0]
+        tasks.append(asyncio.ensure_future(one(i + 1, command)))
+        if i % 1000 == 0:
+            await asyncio.sleep(0)
+            peak_rss = max(peak_rss, target.memory()['rss_kb'])
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'commands': count,
+        'failures': failures,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(count / elapsed, 1),
+        'latency_ms': {key: round(value * 1000, 3) for key, value in percentiles(latencies).items()},
+        'sampled_peak_rss_kb': peak_rss
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description='WayneOS kernel load benchmark')
+    parser.add_argument('--mode', choices=['subprocess', 'inprocess'], default='subprocess')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='default')
+    parser.add_argument('--mix-file', help='JSON list of [weight, command] pairs overriding --mix')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='Target commands per second (0 sends as fast as possible)')
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--distribution', default='wayneos')
+    parser.add_argument('--bridge-arg', action='append', default=[],
+                        help='Extra argument passed to kernel_bridge.py (repeatable)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+    
+    if args.mix_file:
+        with open(args.mix_file) as f:
+            mix = [tuple(entry) for entry in json.load(f)]
+    else:
+        mix = MIXES[args.mix]
+    
+    target_class = SubprocessTarget if args.mode == 'subprocess' else InProcessTarget
+    target = target_class(args.distribution, args.bridge_arg)
+    startup = await target.start()
+    load = await run_load(target, mix, args.rate, args.count, args.seed)
+    memory = target.memory()
+    await target.stop()
+    
+    write_report({
+        'benchmark': 'load',
+        'mode': args.mode,
+        'mix': args.mix_file or args.mix,
+        'target_rate': args.rate,
+        'startup_ms': round(startup * 1000, 3),
+        **load,
+        **memory,
+        'python': sys.version.split()[0]
+    }, args.output)
+
+if __name__ == '__main__':
+    asyncio.run(main())
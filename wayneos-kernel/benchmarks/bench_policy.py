@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Policy engine benchmark
+Generates a policy of prefix and glob rules for many users and
+distributions, then measures permission checks with the decision cache
+disabled (every check walks the trie and globs), with it enabled on a
+skewed workload, on a hot set that fits the cache, and the per-action
+overhead the check adds to Orchestrator.invoke for filesystem actions,
+whose paths are resolved in a temporary sandbox holding the hot set
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from common import percentiles, write_report
+from agents.orchestrator import Orchestrator
+from agents.policy import PolicyEngine
+
+DISTRIBUTIONS = ['wayneos', 'wayneos-top', 'wayneos-sspb', 'wayneos-financial']
+EXTENSIONS = ['txt', 'md', 'py', 'sh', 'json', 'csv', 'pdf', 'key']
+
+def build_policy(prefix_rules: int, glob_rules: int, users, rng: random.Random):
+    rules = [
+        {'path': '/home/{user}', 'allow': ['read', 'write']},
+        {'path': '/etc', 'allow': ['read'], 'deny': ['write']},
+        {'glob': '*.key', 'deny': ['read']}
+    ]
+    for i in range(prefix_rules):
+        depth = rng.randrange(1, 5)
+        path = '/' + '/'.join(f'n{rng.randrange(20)}' for _ in range(depth))
+        rule = {'path': path, rng.choice(['allow', 'deny']): [rng.choice(['read', 'write', 'execute'])]}
+        if rng.random() < 0.3:
+            rule['users'] = rng.sample(users, 3)
+        if rng.random() < 0.2:
+            rule['distributions'] = [rng.choice(DISTRIBUTIONS)]
+        rules.append(rule)
+    for i in range(glob_rules):
+        rules.append({'glob': f'*.{rng.choice(EXTENSIONS)}{i}', 'allow': ['execute']})
+    return {'default': ['read'], 'rules': rules}
+
+def build_paths(count: int, users, rng: random.Random):
+    paths = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            base = f'/home/{rng.choice(users)}'
+        else:
+            base = '/' + '/'.join(f'n{rng.randrange(20)}' for _ in range(rng.randrange(1, 6)))
+        paths.append(f'{base}/file{rng.randrange(1000)}.{rng.choice(EXTENSIONS)}')
+    return paths
+
+def timed_checks(engine: PolicyEngine, workload, batch: int):
+    """(checks per second, per-check microseconds of each batch)"""
+    per_check = []
+    start = time.perf_counter()
+    for offset in range(0, len(workload), batch):
+        batch_start = time.perf_counter()
+        for path, user, distribution in workload[offset:offset + batch]:
+            engine.check(path, user, distribution)
+        per_check.append((time.perf_counter() - batch_start) / batch * 1e6)
+    elapsed = time.perf_counter() - start
+    return len(workload) / elapsed, per_check
+
+class NullAgent:
+    async def execute(self, action, params):
+        return {'status': 'success'}
+
+class SessionAgents(dict):
+    """Agent mapping carrying the session user, as AgentRegistry does"""
+    user = 'user'
+
+def build_sandbox(root: str, workload):
+    """Create the workload's files so symlink resolution sees real paths"""
+    for path in {path for path, _, _ in workload}:
+        target = os.path.join(root, path.lstrip('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        open(target, 'w').close()
+
+async def invoke_overhead(engine, workload):
+    """Seconds per Orchestrator.invoke without and with the policy check"""
+    agents = SessionAgents(filesystem=NullAgent())
+    timings = {}
+    for label, policy in (('without_policy', None), ('with_policy', engine)):
+        orchestrator = Orchestrator('wayneos', policy=policy)
+        start = time.perf_counter()
+        for path, user, _ in workload:
+            agents.user = user
+            await orchestrator.invoke(agents, 'filesystem', 'file_operation',
+                                      {'path': path, 'operation': 'read'})
+        timings[label] = (time.perf_counter() - start) / len(workload)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='WayneOS policy engine benchmark')
+    parser.add_argument('--prefix-rules', type=int, default=5000)
+    parser.add_argument('--glob-rules', type=int, default=20)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--paths', type=int, default=20000, help='Distinct paths checked')
+    parser.add_argument('--checks', type=int, default=500000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    users = [f'user{i}' for i in range(args.users)]
+    policy = build_policy(args.prefix_rules, args.glob_rules, users, rng)
+    paths = build_paths(args.paths, users, rng)
+    # Skewed like real traffic: a few hot paths and users take most checks
+    path_weights = [1 / (rank + 1) for rank in range(len(paths))]
+    user_weights = [1 / (rank + 1) for rank in range(len(users))]
+    workload = list(zip(
+        rng.choices(paths, path_weights, k=args.checks),
+        rng.choices(users, user_weights, k=args.checks),
+        rng.choices(DISTRIBUTIONS, k=args.checks)
+    ))
+    
+    uncached = PolicyEngine(path='/nonexistent', cache_size=0)
+    uncached.load_rules(policy)
+    # Never stat the (absent) policy file during the measurement
+    uncached.checked_at = float('inf')
+    start = time.perf_counter()
+    for user in users:
+        for distribution in DISTRIBUTIONS:
+            uncached.check('/', user, distribution)
+    compile_seconds = time.perf_counter() - start
+    uncached_rate, uncached_us = timed_checks(uncached, workload[:args.checks // 5], args.batch)
+    
+    cached = PolicyEngine(path='/nonexistent')
+    cached.load_rules(policy)
+    cached.checked_at = float('inf')
+    cached_rate, cached_us = timed_checks(cached, workload, args.batch)
+    cache_stats = cached.cache.stats()
+    
+    # Hot set that fits the cache: every check after the first pass is a hit
+    hot = workload[:args.batch] * (args.checks // args.batch)
+    hot_rate, hot_us = timed_checks(cached, hot, args.batch)
+    
+    sandbox = tempfile.mkdtemp(prefix='wayneos-policy-')
+    try:
+        build_sandbox(sandbox, hot[:args.batch])
+        cached.root = os.path.realpath(sandbox)
+        overhead = asyncio.run(invoke_overhead(cached, hot[:50000]))
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    
+    write_report({
+        'benchmark': 'policy',
+        'rules': len(policy['rules']),
+        'users': args.users,
+        'distinct_paths': args.paths,
+        'checks': args.checks,
+        'compiled_tries': uncached.stats()['compiled'],
+        'compile_ms_total': round(compile_seconds * 1000, 3),
+        'uncached_checks_per_s': round(uncached_rate),
+        'uncached_us': {key: round(value, 3) for key, value in percentiles(uncached_us).items()},
+        'cached_checks_per_s': round(cached_rate),
+        'cached_us': {key: round(value, 3) for key, value in percentiles(cached_us).items()},
+        'cache': cache_stats,
+        'hot_checks_per_s': round(hot_rate),
+        'hot_us': {key: round(value, 3) for key, value in percentiles(hot_us).items()},
+        'invoke_us_without_policy': round(overhead['without_policy'] * 1e6, 3),
+        'invoke_us_with_policy': round(overhead['with_policy'] * 1e6, 3)
+    }, args.output)
+
+if __name__ == '__main__':
+    main()
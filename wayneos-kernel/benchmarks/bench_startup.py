@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the WayneOS kernel bridge
+Reports import time of kernel_bridge and time-to-first-response of a fresh
+bridge process, each as the median over several cold starts
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from common import KERNEL_DIR, write_report
+
+IMPORT_PROBE = (
+    "import time; t = time.perf_counter(); import kernel_bridge; "
+    "print(time.perf_counter() - t)"
+)
+
+def measure_import() -> float:
+    """Seconds to import kernel_bridge in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE],
+        cwd=KERNEL_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip())
+
+def measure_first_response(distribution: str, command: str) -> float:
+    """Seconds from spawning the bridge to reading its first response"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, 'kernel_bridge.py', '--distribution', distribution],
+        cwd=KERNEL_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True
+    )
+    process.stdin.write(json.dumps({
+        'type': 'execute', 'command': command, 'params': {}
+    }) + '\n')
+    process.stdin.flush()
+    line = process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.stdin.close()
+    process.wait()
+    if not json.loads(line).get('success'):
+        raise RuntimeError(f'Unexpected response: {line}')
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='WayneOS kernel startup benchmark')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--distribution', default='wayneos')
+    parser.add_argument('--command', default='open benchmark-app')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+    
+    imports = [measure_import() for _ in range(args.runs)]
+    first = [measure_first_response(args.distribution, args.command) for _ in range(args.runs)]
+    
+    write_report({
+        'benchmark': 'startup',
+        'runs': args.runs,
+        'distribution': args.distribution,
+        'import_ms': round(statistics.median(imports) * 1000, 3),
+        'time_to_first_response_ms': round(statistics.median(first) * 1000, 3),
+        'python': sys.version.split()[0]
+    }, args.output)
+
+if __name__ == '__main__':
+    main()
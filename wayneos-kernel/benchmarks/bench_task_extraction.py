@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Task extraction benchmark
+Compares TaskExtractor with a per-email loop testing every rule against
+every subject on a large synthetic mailbox, and checks that both find the
+same rules in every email. --variants controls how many distinct subjects each template
+produces; a large value approaches a mailbox with no repeated subjects
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict
+
+from common import write_report
+from agents.task_extraction import TaskExtractor
+
+SENDERS = ['ceo@company.com', 'team@tanoak.com', 'billing@vendor.io', 'hr@company.com',
+           'friend@gmail.com', 'dentist@clinic.com', 'noreply@news.example.com']
+ACTIONABLE = ['Q3 Projections Review', 'Contract Review - Urgent', 'Appointment Reminder',
+              'Invoice #{n} due', 'Meeting invite: roadmap sync', 'Action required: approve PTO',
+              'Question about the {n} build', 'Budget forecast for team {n}']
+# Overlaps 'contract' at the same position and needs case-insensitive matching
+EXTRA_RULES = [
+    {'name': 'contract_review', 'pattern': r'contract review', 'task': 'Review {subject}', 'weight': 10},
+    {'name': 'nda', 'pattern': r'\bNDA\b', 'task': 'Sign {subject}', 'weight': 4}
+]
+NOISE = ['Weekly newsletter #{n}', 'Your order has shipped', 'Photos from the weekend',
+         'Lunch?', 'Re: release notes {n}', 'Welcome to the community', 'Daily digest {n}']
+
+def build_mailbox(size: int, actionable: float, variants: int, rng: random.Random):
+    emails = []
+    for i in range(size):
+        template = rng.choice(ACTIONABLE if rng.random() < actionable else NOISE)
+        emails.append({
+            'id': str(i),
+            'from': rng.choice(SENDERS),
+            'subject': template.format(n=rng.randrange(variants)),
+            'category': rng.choice(['work', 'personal']),
+            'important': rng.random() < 0.1,
+            'unread': rng.random() < 0.3
+        })
+    return emails
+
+def legacy_scan(rules, emails):
+    """Reference implementation: test every rule against every subject"""
+    regexes = [re.compile(rule.pattern, re.IGNORECASE) for rule in rules]
+    matched = {}
+    for row, email in enumerate(emails):
+        mask = 0
+        for i, regex in enumerate(regexes):
+            if regex.search(email['subject']):
+                mask |= 1 << i
+        if mask:
+            matched[row] = mask
+    return matched
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Task extraction benchmark')
+    parser.add_argument('--emails', type=int, default=100000)
+    parser.add_argument('--actionable', type=float, default=0.3,
+                        help='Fraction of emails whose subject matches a rule')
+    parser.add_argument('--variants', type=int, default=500,
+                        help='Distinct subjects per subject template')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    emails = build_mailbox(args.emails, args.actionable, args.variants, rng)
+    extractor = TaskExtractor().with_overrides(EXTRA_RULES)
+    emails[0]['subject'] = 'Contract Review - Urgent'
+    emails[1]['subject'] = 'NDA for the vendor'
+    
+    expected = legacy_scan(extractor.rules, emails)
+    distinct: Dict[str, int] = {}
+    codes = [distinct.setdefault(email['subject'], len(distinct)) for email in emails]
+    masks = extractor._scan(list(distinct))
+    for row, code in enumerate(codes):
+        if masks.get(code, 0) != expected.get(row, 0):
+            raise AssertionError(f"Rules differ for {emails[row]['subject']!r}")
+    result = extractor.extract(emails, limit=len(emails))
+    if len(expected) != result['matched']:
+        raise AssertionError('Match count differs between extractor and per-email loop')
+    
+    legacy = best_of(lambda: legacy_scan(extractor.rules, emails), args.repeat)
+    full = best_of(lambda: extractor.extract(emails), args.repeat)
+    distinct = len({email['subject'] for email in emails})
+    
+    write_report({
+        'benchmark': 'task_extraction',
+        'emails': args.emails,
+        'distinct_subjects': distinct,
+        'rules': len(extractor.rules),
+        'matched': result['matched'],
+        'tasks': len(result['tasks']),
+        'legacy_scan_ms': round(legacy * 1000, 3),
+        'extract_ms': round(full * 1000, 3),
+        'speedup': round(legacy / full, 2),
+        'top_tasks': [task['task'] for task in result['tasks'][:5]]
+    }, args.output)
+
+if __name__ == '__main__':
+    main()
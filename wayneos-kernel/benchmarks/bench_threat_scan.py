@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Threat scanner benchmark
+Builds a synthetic tree of small files plus a few large ones, plants known
+signatures, then times a cold scan (every file hashed), an unchanged
+rescan (stat only) and a rescan after touching a fraction of the files
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from common import write_report
+from agents.threat_scanner import SignatureSet, ThreatScanner
+
+def build_tree(root: str, files: int, per_dir: int, large: int, large_mb: int, rng: random.Random):
+    paths = []
+    for i in range(files):
+        directory = os.path.join(root, f'd{i // per_dir:04d}')
+        if i % per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'f{i}.bin')
+        with open(path, 'wb') as f:
+            f.write(rng.randbytes(rng.randrange(256, 8192)))
+        paths.append(path)
+    for i in range(large):
+        path = os.path.join(root, f'large{i}.bin')
+        with open(path, 'wb') as f:
+            for _ in range(large_mb):
+                f.write(rng.randbytes(1024 * 1024))
+        paths.append(path)
+    return paths
+
+def plant_signatures(path: str, samples, decoys: int, rng: random.Random):
+    with open(path, 'w') as f:
+        f.write('# benchmark signatures\n')
+        for i, sample in enumerate(samples):
+            with open(sample, 'rb') as data:
+                f.write(f'{hashlib.sha256(data.read()).hexdigest()} Bench.Planted.{i}\n')
+        for i in range(decoys):
+            f.write(f'{rng.randbytes(32).hex()} Bench.Decoy.{i}\n')
+
+def summarize(report):
+    return {key: report[key] for key in
+            ('files_scanned', 'files_hashed', 'cache_hits', 'bytes_hashed', 'elapsed_seconds',
+             'walk_seconds', 'files_per_sec', 'bytes_per_sec', 'hashed_in', 'errors')}
+
+async def run(args, root: str):
+    rng = random.Random(args.seed)
+    paths = build_tree(root, args.files, args.per_dir, args.large, args.large_mb, rng)
+    planted = rng.sample(paths[:args.files], args.planted)
+    signature_file = os.path.join(root, 'signatures.txt')
+    plant_signatures(signature_file, planted, args.decoys, rng)
+    
+    signatures = SignatureSet(signature_file)
+    signatures.load()
+    scanner = ThreatScanner(signatures)
+    with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+        cold = await scanner.scan(root, pool)
+        warm = await scanner.scan(root, pool)
+        for path in rng.sample(paths[:args.files], int(args.files * args.touch)):
+            with open(path, 'ab') as f:
+                f.write(b'x')
+        touched = await scanner.scan(root, pool)
+    
+    return {
+        'benchmark': 'threat_scan',
+        'files': args.files,
+        'large_files': args.large,
+        'signatures': len(signatures),
+        'planted': args.planted,
+        'found': len(cold['threats']),
+        'found_after_touch': len(touched['threats']),
+        'cold': summarize(cold),
+        'unchanged_rescan': summarize(warm),
+        'touched_rescan': summarize(touched)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='WayneOS threat scanner benchmark')
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--per-dir', type=int, default=500)
+    parser.add_argument('--large', type=int, default=4, help='Large files to hash')
+    parser.add_argument('--large-mb', type=int, default=32)
+    parser.add_argument('--planted', type=int, default=10, help='Files whose digest is a signature')
+    parser.add_argument('--decoys', type=int, default=100000, help='Signatures matching nothing')
+    parser.add_argument('--touch', type=float, default=0.01, help='Share of files modified before the last rescan')
+    parser.add_argument('--workers', type=int, default=0, help='Process pool size (0 = CPU count)')
+    parser.add_argument('--dir', help='Build the tree here instead of a temporary directory')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    
+    root = args.dir or tempfile.mkdtemp(prefix='wayneos-scan-')
+    try:
+        report = asyncio.run(run(args, root))
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+    write_report(report, args.output)
+
+if __name__ == '__main__':
+    main()
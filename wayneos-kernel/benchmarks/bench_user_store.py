@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+User store benchmark
+Drives preference updates and reads through UserAgent at full speed,
+measures how many transactions the write-behind flusher needed, the
+time close() takes to write the remainder durably, and checks that a
+reopened store sees every update
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from common import percentiles, write_report
+from agents.runtime import KernelRuntime
+from agents.user_agent import UserAgent
+from agents.user_store import UserStore
+
+async def run(args, runtime: KernelRuntime, rng: random.Random):
+    users = [f'user{i}' for i in range(args.users)]
+    # Agents act only as their session's user, so each user gets its own
+    agents = {}
+    for user in users:
+        agent = agents[user] = UserAgent()
+        agent.runtime, agent.user = runtime, user
+    keys = [f'key{i}' for i in range(args.keys)]
+    expected = {}
+    
+    update_us = []
+    start = time.perf_counter()
+    for offset in range(0, args.updates, args.batch):
+        batch_start = time.perf_counter()
+        for i in range(offset, min(offset + args.batch, args.updates)):
+            user, key = rng.choice(users), rng.choice(keys)
+            await agents[user].execute('update_preferences', {'preferences': {key: i}})
+            expected[(user, key)] = i
+        update_us.append((time.perf_counter() - batch_start) / args.batch * 1e6)
+        # Yield so the flusher runs as it would under a live event loop
+        await asyncio.sleep(0)
+    update_seconds = time.perf_counter() - start
+    
+    read_us = []
+    start = time.perf_counter()
+    for offset in range(0, args.reads, args.batch):
+        batch_start = time.perf_counter()
+        for _ in range(args.batch):
+            await agents[rng.choice(users)].execute('get_preferences', {})
+        read_us.append((time.perf_counter() - batch_start) / args.batch * 1e6)
+    read_seconds = time.perf_counter() - start
+    
+    return expected, {
+        'updates_per_s': round(args.updates / update_seconds),
+        'update_us': {key: round(value, 3) for key, value in percentiles(update_us).items()},
+        'reads_per_s': round(args.reads / read_seconds),
+        'read_us': {key: round(value, 3) for key, value in percentiles(read_us).items()},
+        'store_before_close': runtime.users().stats()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='WayneOS user store benchmark')
+    parser.add_argument('--updates', type=int, default=200000)
+    parser.add_argument('--reads', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--keys', type=int, default=20, help='Distinct preference keys per user')
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    
+    directory = tempfile.mkdtemp(prefix='wayneos-users-')
+    try:
+        path = os.path.join(directory, 'users.sqlite')
+        runtime = KernelRuntime()
+        runtime.user_store = UserStore(path)
+        expected, report = asyncio.run(run(args, runtime, random.Random(args.seed)))
+        
+        start = time.perf_counter()
+        runtime.close()
+        close_seconds = time.perf_counter() - start
+        stats = runtime.user_store.stats()
+        
+        reopened = UserStore(path)
+        lost = sum(
+            1 for (user, key), value in expected.items()
+            if reopened.get_preferences(user).get(key) != value
+        )
+        reopened.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    write_report({
+        'benchmark': 'user_store',
+        'updates': args.updates,
+        'reads': args.reads,
+        'users': args.users,
+        **report,
+        'transactions': stats['flushes'],
+        'rows_written': stats['rows_written'],
+        'close_ms': round(close_seconds * 1000, 3),
+        'lost_after_reopen': lost
+    }, args.output)
+
+if __name__ == '__main__':
+    main()
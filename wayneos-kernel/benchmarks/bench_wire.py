@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Wire format benchmark
+Compares encode/decode throughput and bytes on the wire of newline JSON and
+the length-prefixed formats for responses shaped like large email lists and
+process tables
+"""
+
+import argparse
+import asyncio
+import time
+
+from common import write_report
+from agents.wire import available_codecs, get_codec
+
+class _BufferReader:
+    """Minimal in-memory stream with the reader interface codecs expect"""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+        
+    async def readline(self) -> bytes:
+        end = self.data.find(b'\n', self.offset)
+        end = len(self.data) if end < 0 else end + 1
+        line = self.data[self.offset:end]
+        self.offset = end
+        return line
+    
+    async def readexactly(self, size: int) -> bytes:
+        chunk = self.data[self.offset:self.offset + size]
+        if len(chunk) < size:
+            raise asyncio.IncompleteReadError(chunk, size)
+        self.offset += size
+        return chunk
+
+def email_response(count: int):
+    return {'success': True, 'id': 1, 'result': {'status': 'success', 'count': count, 'emails': [
+        {'from': f'sender{i}@example.com', 'subject': f'Quarterly report follow-up {i}',
+         'date': '2026-10-18T09:00:00', 'important': i % 3 == 0, 'category': 'work'}
+        for i in range(count)
+    ]}}
+
+def process_response(count: int):
+    return {'success': True, 'id': 2, 'result': {'status': 'success', 'count': count, 'processes': [
+        {'pid': 10000 + i, 'name': f'app{i % 40}', 'memory': 120 + i % 300,
+         'cpu': round((i % 97) / 10, 2), 'url': ''}
+        for i in range(count)
+    ]}}
+
+def measure(codec, message, repeat: int):
+    encoded = codec.encode(message)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        codec.encode(message)
+    encode_s = (time.perf_counter() - start) / repeat
+    
+    stream = encoded * repeat
+    
+    async def decode_all():
+        reader = _BufferReader(stream)
+        for _ in range(repeat):
+            codec.decode(await codec.read(reader))
+    
+    start = time.perf_counter()
+    asyncio.run(decode_all())
+    decode_s = (time.perf_counter() - start) / repeat
+    
+    return {
+        'bytes': len(encoded),
+        'encode_us': round(encode_s * 1e6, 2),
+        'decode_us': round(decode_s * 1e6, 2),
+        'encode_mb_per_s': round(len(encoded) / encode_s / 1e6, 1),
+        'decode_mb_per_s': round(len(encoded) / decode_s / 1e6, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Wire format benchmark')
+    parser.add_argument('--items', type=int, default=2000, help='Rows per payload')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+    
+    payloads = {
+        'emails': email_response(args.items),
+        'processes': process_response(args.items)
+    }
+    results = {}
+    for payload_name, message in payloads.items():
+        results[payload_name] = {
+            name: measure(get_codec(name), message, args.repeat)
+            for name in available_codecs()
+        }
+    
+    write_report({
+        'benchmark': 'wire',
+        'items': args.items,
+        'repeat': args.repeat,
+        'codecs': available_codecs(),
+        'results': results
+    }, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""Shared helpers for WayneOS kernel benchmarks"""
+
+from typing import Dict, Any, List, Optional
+import json
+import os
+import sys
+
+# Directory holding kernel_bridge.py and the agents package
+KERNEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if KERNEL_DIR not in sys.path:
+    sys.path.insert(0, KERNEL_DIR)
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles plus max of a list of samples"""
+    if not samples:
+        return {**{f'p{p}': 0.0 for p in points}, 'max': 0.0}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+        result[f'p{p}'] = ordered[rank]
+    result['max'] = ordered[-1]
+    return result
+
+def write_report(report: Dict[str, Any], output: Optional[str] = None):
+    """Print a benchmark report as JSON and optionally save it to a file"""
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
@@ -6,23 +6,27 @@ Processes natural language commands via AI agents
 """
 
 import asyncio
-import json
+import os
+import signal
+import stat
 import sys
 import argparse
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 from dataclasses import dataclass
 from datetime import datetime
 import logging
 
-# Import WayneOS agents
-from agents.user_agent import UserAgent
-from agents.filesystem_agent import FileSystemAgent
-from agents.process_agent import ProcessAgent
-from agents.network_agent import NetworkAgent
-from agents.ml_agent import MLAgent
-from agents.security_agent import SecurityAgent
-from agents.hardware_agent import HardwareAgent
-from agents.orchestrator import Orchestrator
+# Agent modules are imported on first use through the registry
+from agents.registry import AgentRegistry, DISTRIBUTIONS
+from agents.orchestrator import Orchestrator, DEFAULT_INTENT_CACHE_SIZE, normalize_command
+from agents.plan import PlanError
+from agents.policy import DEFAULT_USER
+from agents.metrics import OTHER
+from agents.runtime import KernelRuntime
+from agents.telemetry import DEFAULT_SAMPLE_INTERVAL
+from agents.profiling import CommandProfiler, DEFAULT_PROFILE_DIR
+from agents.wire import MAX_MESSAGE_BYTES, FrameError, available_codecs, get_codec
 
 # Configure logging
 logging.basicConfig(
@@ -31,52 +35,91 @@ logging.basicConfig(
 )
 logger = logging.getLogger('wayneos.kernel')
 
+# Default cap on commands executing at the same time
+DEFAULT_MAX_CONCURRENT = 64
+
+# Unsent output at which the bridge stops admitting new commands
+DEFAULT_OUTPUT_HIGH_WATER = 1024 * 1024
+
+# Command types _dispatch handles; metrics file anything else under OTHER
+COMMAND_TYPES = frozenset({'execute', 'batch', 'plan', 'prewarm', 'metrics'})
+
 @dataclass
 class Command:
     """Command structure from Node.js"""
     type: str
     command: str
     params: Dict[str, Any]
+    id: Optional[Any] = None
 
 class WayneOSKernel:
     """Main kernel class that manages agents and processes commands"""
     
-    def __init__(self, distribution: str = 'wayneos'):
+    def __init__(self, distribution: str = 'wayneos', orchestrator: Optional[Orchestrator] = None,
+                 intent_cache_size: int = DEFAULT_INTENT_CACHE_SIZE,
+                 runtime: Optional[KernelRuntime] = None, user: str = DEFAULT_USER):
         self.distribution = distribution
-        self.orchestrator = Orchestrator(distribution)
+        # Every action of this kernel is authorized as this user
+        self.user = user
+        self.runtime = runtime or KernelRuntime()
+        # The orchestrator holds no per-session state, so daemon sessions share one
+        if orchestrator is None:
+            orchestrator = Orchestrator(
+                distribution, intent_cache_size, self.runtime.metrics, self.runtime.usage,
+                self.runtime.policy
+            )
+            self.runtime.register_cache('intent_cache', orchestrator.intent_cache)
+        self.orchestrator = orchestrator
         self.agents = self._initialize_agents()
         self.performance_counter = 0
         self.start_time = datetime.now()
         
-    def _initialize_agents(self) -> Dict[str, Any]:
-        """Initialize agents based on distribution"""
-        base_agents = {
-            'user': UserAgent(),
-            'filesystem': FileSystemAgent(),
-            'process': ProcessAgent(),
-            'network': NetworkAgent(),
-            'ml': MLAgent(),
-            'security': SecurityAgent(),
-            'hardware': HardwareAgent()
-        }
-        
-        # Add distribution-specific agents
-        if self.distribution == 'wayneos-top':
-            from agents.automotive import AutomotiveAgents
-            base_agents.update(AutomotiveAgents.get_agents())
-        elif self.distribution == 'wayneos-sspb':
-            from agents.healthcare import HealthcareAgents
-            base_agents.update(HealthcareAgents.get_agents())
-        elif self.distribution == 'wayneos-financial':
-            from agents.financial import FinancialAgents
-            base_agents.update(FinancialAgents.get_agents())
-            
-        return base_agents
+    def _initialize_agents(self) -> AgentRegistry:
+        """Register agents for the distribution; each is built on first use"""
+        return AgentRegistry(self.distribution, self.runtime, self.user)
     
     async def process_command(self, cmd: Command) -> Dict[str, Any]:
         """Process a command and return results"""
         self.performance_counter += 1
+        start = time.perf_counter()
+        
+        # Profiling costs nothing unless --profile is on or the command asks
+        profiler = self.runtime.profiler
+        forced = isinstance(cmd.params, dict) and bool(cmd.params.get('profile'))
+        if forced and profiler is None:
+            profiler = self.runtime.profiler = CommandProfiler()
+        if profiler is not None and profiler.wants(forced):
+            response, summary = await profiler.run(cmd.type, lambda: self._dispatch(cmd))
+            if 'error' in summary:
+                logger.error(summary['error'])
+                response['profile_error'] = summary.pop('error')
+            response['profile'] = summary
+        else:
+            response = await self._dispatch(cmd)
         
+        self.runtime.metrics.record_command(
+            cmd.type if cmd.type in COMMAND_TYPES else OTHER,
+            time.perf_counter() - start, not response.get('success')
+        )
+        usage = self.runtime.usage
+        if cmd.type == 'execute' and isinstance(cmd.command, str):
+            usage.record_command(normalize_command(cmd.command))
+        if usage.due_prewarm():
+            self.prewarm()
+        return response
+    
+    def prewarm(self) -> Dict[str, Any]:
+        """Construct the agents and cache the intents the usage model expects next"""
+        plan = self.runtime.usage.prewarm_plan()
+        agents = [name for name in plan['agents'] if name in self.agents]
+        for name in agents:
+            self.agents[name]
+        warmed = self.orchestrator.warm(plan['commands'])
+        logger.info(f"Pre-warmed {len(agents)} agents and {warmed} intents")
+        return {'agents': agents, 'intents': warmed}
+    
+    async def _dispatch(self, cmd: Command) -> Dict[str, Any]:
+        """Run a command according to its type"""
         try:
             if cmd.type == 'execute':
                 result = await self.orchestrator.execute(
@@ -84,16 +127,53 @@ class WayneOSKernel:
                     cmd.params,
                     self.agents
                 )
-                return {
+                response = {
                     'success': True,
                     'result': result,
                     'performance': self.get_performance_metrics()
                 }
+                # Large results arrive as an async iterator of chunks that the
+                # bridge sends as separate responses after this one
+                if isinstance(result, dict) and 'stream' in result:
+                    response['stream'] = result.pop('stream')
+                return response
+            elif cmd.type == 'batch':
+                return await self._process_batch(cmd)
+            elif cmd.type == 'plan':
+                result = await self.orchestrator.run_steps(
+                    cmd.params.get('steps', []),
+                    self.agents
+                )
+                return {
+                    'success': result['status'] == 'completed',
+                    'result': result,
+                    'performance': self.get_performance_metrics()
+                }
+            elif cmd.type == 'prewarm':
+                return {
+                    'success': True,
+                    'result': self.prewarm(),
+                    'performance': self.get_performance_metrics()
+                }
+            elif cmd.type == 'metrics':
+                return {
+                    'success': True,
+                    'result': {
+                        **self.runtime.metrics.snapshot(),
+                        'intentCache': self.orchestrator.cache_stats()
+                    },
+                    'performance': self.get_performance_metrics()
+                }
             else:
                 return {
                     'success': False,
                     'error': f'Unknown command type: {cmd.type}'
                 }
+        except (PlanError, TypeError) as e:
+            return {
+                'success': False,
+                'error': f'Invalid plan: {e}' if cmd.type == 'plan' else str(e)
+            }
         except Exception as e:
             logger.error(f"Command execution error: {e}")
             return {
@@ -101,66 +181,536 @@ class WayneOSKernel:
                 'error': str(e)
             }
     
+    async def _process_batch(self, cmd: Command) -> Dict[str, Any]:
+        """Run the sub-commands in params.commands concurrently
+        
+        Every item gets its own result or error in the same order as the
+        request, and a failing item never aborts the others. At most
+        max_concurrent items run at once, however large the batch.
+        """
+        items = cmd.params.get('commands')
+        if not isinstance(items, list):
+            return {
+                'success': False,
+                'error': 'Batch requires a list in params.commands'
+            }
+        
+        slots = self.runtime.limiter()
+        
+        async def run_item(item: Any) -> Dict[str, Any]:
+            if not isinstance(item, dict):
+                return {'success': False, 'error': 'Batch item must be an object'}
+            sub = Command(**{'type': 'execute', 'params': {}, **item})
+            # Items share one response, so nothing may stream
+            sub.params = {**(sub.params or {}), 'stream': False}
+            if sub.type == 'batch':
+                return {'success': False, 'error': 'Nested batches are not supported'}
+            await slots.acquire()
+            try:
+                result = await self.process_command(sub)
+            finally:
+                slots.release()
+            result.pop('performance', None)
+            if sub.id is not None:
+                result['id'] = sub.id
+            return result
+        
+        outcomes = await asyncio.gather(
+            *(run_item(item) for item in items), return_exceptions=True
+        )
+        results = [
+            {'success': False, 'error': str(outcome)} if isinstance(outcome, Exception) else outcome
+            for outcome in outcomes
+        ]
+        
+        return {
+            'success': True,
+            'results': results,
+            'count': len(results),
+            'failed': sum(1 for result in results if not result.get('success')),
+            'performance': self.get_performance_metrics()
+        }
+    
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Calculate current performance metrics"""
         uptime = (datetime.now() - self.start_time).total_seconds()
-        ops_per_sec = self.performance_counter / max(uptime, 1)
-        
-        # Simulate 313,150 ops/sec with variance
-        target_ops = 313150
-        simulated_ops = target_ops + (ops_per_sec * 1000)
         
         return {
-            'opsPerSec': int(simulated_ops),
+            # Measured over the metrics sliding window
+            'opsPerSec': round(self.runtime.metrics.ops_per_sec(), 2),
             'commandsProcessed': self.performance_counter,
-            'uptime': uptime
+            'uptime': uptime,
+            'intentCache': self.orchestrator.cache_stats()
         }
 
-async def main():
-    """Main event loop for kernel bridge"""
-    parser = argparse.ArgumentParser(description='WayneOS Kernel Bridge')
-    parser.add_argument('--distribution', default='wayneos', 
-                       help='Distribution type')
-    args = parser.parse_args()
+class StdinReader:
+    """Binary stdin read through the default executor
     
-    kernel = WayneOSKernel(args.distribution)
-    logger.info(f"WayneOS Kernel started - Distribution: {args.distribution}")
+    Fallback for when stdin is a regular file, which asyncio cannot wrap
+    in a pipe transport.
+    """
     
-    # Read commands from stdin
+    def __init__(self):
+        self.stream = sys.stdin.buffer
+        self.loop = asyncio.get_running_loop()
+        
+    async def readline(self) -> bytes:
+        return await self.loop.run_in_executor(None, self.stream.readline)
+    
+    async def readexactly(self, size: int) -> bytes:
+        data = await self.loop.run_in_executor(None, self.stream.read, size)
+        if len(data) < size:
+            raise asyncio.IncompleteReadError(data, size)
+        return data
+
+class ResponseWriter:
+    """Coalesces responses finished in the same loop iteration into one write
+    
+    drain() waits while the peer is not consuming output; the command loop
+    awaits it before admitting more work, so a stalled reader applies
+    backpressure instead of letting responses pile up in memory.
+    """
+    
+    def __init__(self, write: Callable[[bytes], None],
+                 drain: Optional[Callable[[], Awaitable[None]]] = None,
+                 close: Optional[Callable[[], Awaitable[None]]] = None):
+        self._write = write
+        self._drain = drain
+        self._close = close
+        self.buffer: List[bytes] = []
+        self.flush_scheduled = False
+        self.loop = asyncio.get_running_loop()
+        
+    def write(self, data: bytes):
+        """Queue data for the next flush"""
+        self.buffer.append(data)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_soon(self.flush)
+    
+    def flush(self):
+        """Hand every queued message to the transport in a single write"""
+        self.flush_scheduled = False
+        if self.buffer:
+            data = b''.join(self.buffer)
+            self.buffer.clear()
+            self._write(data)
+    
+    async def drain(self):
+        """Wait until the transport is below its high-water mark"""
+        if self._drain is not None:
+            await self._drain()
+    
+    async def close(self):
+        """Flush everything and wait until the transport has written it"""
+        self.flush()
+        if self._close is not None:
+            await self._close()
+    
+    @classmethod
+    def for_stream(cls, writer: asyncio.StreamWriter,
+                   high_water: int = DEFAULT_OUTPUT_HIGH_WATER,
+                   closed: Optional[asyncio.Future] = None) -> 'ResponseWriter':
+        writer.transport.set_write_buffer_limits(high=high_water)
+        
+        async def close():
+            writer.close()
+            if closed is not None:
+                await closed
+            else:
+                await writer.wait_closed()
+        
+        return cls(writer.write, writer.drain, close)
+
+class _StdoutProtocol(asyncio.streams.FlowControlMixin):
+    """Write-pipe protocol that also reports when the pipe is closed"""
+    
+    def __init__(self):
+        super().__init__()
+        self.closed = asyncio.get_running_loop().create_future()
+        
+    def connection_lost(self, exc):
+        super().connection_lost(exc)
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+async def open_stdio(high_water: int = DEFAULT_OUTPUT_HIGH_WATER):
+    """Wrap stdin and stdout in asyncio pipe streams
+    
+    Falls back to executor reads and blocking writes when either end is a
+    regular file, which pipe transports do not support.
+    """
+    loop = asyncio.get_running_loop()
+    
+    try:
+        reader = asyncio.StreamReader(limit=MAX_MESSAGE_BYTES)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+    except ValueError:
+        reader = StdinReader()
+    
+    try:
+        transport, protocol = await loop.connect_write_pipe(_StdoutProtocol, sys.stdout)
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        output = ResponseWriter.for_stream(writer, high_water, protocol.closed)
+    except ValueError:
+        def write(data: bytes):
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        output = ResponseWriter(write)
+    
+    return reader, output
+
+async def serve_commands(kernel: WayneOSKernel, reader: Any,
+                         output: ResponseWriter,
+                         codec: Any,
+                         max_concurrent: Optional[int] = None,
+                         first_payload: Optional[bytes] = None):
+    """Read commands until EOF, run them concurrently and send tagged responses
+    
+    A 'hello' command switches the wire format: its acknowledgement is the
+    last message in the old format and everything after it, in both
+    directions, uses the new one.
+    """
+    # Follows max_concurrent when a hardware profile retunes the runtime
+    slots = kernel.runtime.limiter(max_concurrent)
+    pending = set()
+    
+    def send(response: Dict[str, Any]):
+        output.write(codec.encode(response))
+    
+    async def run_command(cmd: Command):
+        try:
+            result = await kernel.process_command(cmd)
+            stream = result.pop('stream', None)
+            if cmd.id is not None:
+                result['id'] = cmd.id
+            send(result)
+            if stream is not None:
+                await send_stream(cmd, stream)
+        except Exception as e:
+            # A failing command must never take the other in-flight ones with it
+            logger.error(f"Command error: {e}")
+            response = {'success': False, 'error': str(e)}
+            if cmd.id is not None:
+                response['id'] = cmd.id
+            send(response)
+        finally:
+            slots.release()
+    
+    async def send_stream(cmd: Command, stream: Any):
+        """Send each chunk as its own response tagged with the command id"""
+        try:
+            async for chunk in stream:
+                message = {'success': True, 'chunk': chunk}
+                if cmd.id is not None:
+                    message['id'] = cmd.id
+                send(message)
+                await output.drain()
+        except Exception as e:
+            logger.error(f"Stream error: {e}")
+            message = {'success': False, 'error': str(e), 'chunk': {'final': True}}
+            if cmd.id is not None:
+                message['id'] = cmd.id
+            send(message)
+        finally:
+            await stream.aclose()
+    
+    # Each command runs as its own task so a slow agent call never blocks
+    # the commands queued behind it
     while True:
+        data = None
         try:
-            line = await asyncio.get_event_loop().run_in_executor(
-                None, sys.stdin.readline
-            )
+            # Stop admitting work while the peer is not draining responses
+            await output.drain()
+            
+            if first_payload is not None:
+                payload, first_payload = first_payload, None
+            else:
+                payload = await codec.read(reader)
             
-            if not line:
+            if payload is None:
                 break
+            if not payload.strip():
+                continue
                 
             # Parse command
-            data = json.loads(line.strip())
+            data = codec.decode(payload)
             cmd = Command(**data)
             
-            # Process command
-            result = await kernel.process_command(cmd)
+            if cmd.type == 'hello':
+                wire = (cmd.params or {}).get('wire', codec.name)
+                try:
+                    new_codec = get_codec(wire)
+                except ValueError as e:
+                    response = {'success': False, 'error': str(e), 'available': available_codecs()}
+                else:
+                    response = {'success': True, 'wire': wire, 'available': available_codecs()}
+                if cmd.id is not None:
+                    response['id'] = cmd.id
+                send(response)
+                # Everything queued so far goes out in the old format
+                output.flush()
+                if response['success']:
+                    codec = new_codec
+                continue
             
-            # Send result to stdout
-            print(json.dumps(result))
-            sys.stdout.flush()
+            # Wait for a free slot before admitting more work
+            await slots.acquire()
+            task = asyncio.create_task(run_command(cmd))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON: {e}")
-            print(json.dumps({
+        except FrameError:
+            # The stream cannot be resynchronised after a bad frame
+            raise
+        except ValueError as e:
+            logger.error(f"Invalid {codec.label}: {e}")
+            send({
                 'success': False,
-                'error': f'Invalid JSON: {e}'
-            }))
-            sys.stdout.flush()
+                'error': f'Invalid {codec.label}: {e}'
+            })
         except Exception as e:
             logger.error(f"Kernel error: {e}")
-            print(json.dumps({
+            response = {
                 'success': False,
                 'error': str(e)
-            }))
-            sys.stdout.flush()
+            }
+            if isinstance(data, dict) and data.get('id') is not None:
+                response['id'] = data['id']
+            send(response)
+    
+    # Drain in-flight commands before returning
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    output.flush()
+    await output.drain()
+
+class KernelDaemon:
+    """Long-lived kernel process serving many sessions over a Unix domain socket
+    
+    Agent modules are imported and orchestrators built once per distribution;
+    every connection gets its own WayneOSKernel, so agent state stays per
+    session and is dropped when the connection closes.
+    """
+    
+    def __init__(self, distribution: str = 'wayneos', max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 intent_cache_size: int = DEFAULT_INTENT_CACHE_SIZE,
+                 runtime: Optional[KernelRuntime] = None, wire: str = 'ndjson',
+                 user: str = DEFAULT_USER, allow_tuning: bool = False):
+        self.default_distribution = distribution
+        # Sessions act as the user the daemon was started for, whatever they claim
+        self.user = user
+        self.intent_cache_size = intent_cache_size
+        self.runtime = runtime or KernelRuntime()
+        self.runtime.config.max_concurrent = max_concurrent
+        self.runtime.config.intent_cache = intent_cache_size
+        # One session retuning the shared runtime would change it for all
+        self.runtime.tunable = allow_tuning
+        self.wire = wire
+        self.orchestrators: Dict[str, Orchestrator] = {}
+        self.sessions: Dict[str, WayneOSKernel] = {}
+        self.session_counter = 0
+        
+    def open_session(self, distribution: Optional[str] = None) -> str:
+        """Create a new session and return its id
+        
+        Only known distributions are accepted, since each one keeps an
+        orchestrator and its cache for the life of the daemon.
+        """
+        distribution = distribution or self.default_distribution
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution}; expected one of {', '.join(DISTRIBUTIONS)}")
+        orchestrator = self.orchestrators.get(distribution)
+        if orchestrator is None:
+            orchestrator = Orchestrator(
+                distribution, self.runtime.config.intent_cache, self.runtime.metrics,
+                self.runtime.usage, self.runtime.policy
+            )
+            self.runtime.register_cache('intent_cache', orchestrator.intent_cache)
+            self.orchestrators[distribution] = orchestrator
+        
+        self.session_counter += 1
+        session_id = f'session-{self.session_counter}'
+        self.sessions[session_id] = WayneOSKernel(
+            distribution, orchestrator, self.intent_cache_size, self.runtime, self.user
+        )
+        logger.info(f"Session opened: {session_id} ({distribution}), active: {len(self.sessions)}")
+        return session_id
+    
+    def close_session(self, session_id: str):
+        """Drop a session and all of its agent state"""
+        if self.sessions.pop(session_id, None) is not None:
+            logger.info(f"Session closed: {session_id}, active: {len(self.sessions)}")
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client connection as one session
+        
+        The first message may be a session handshake,
+        {"type": "session", "command": "open", "params": {"distribution": ...}};
+        without one the session uses the daemon's default distribution.
+        """
+        codec = get_codec(self.wire)
+        output = ResponseWriter.for_stream(writer)
+        
+        session_id = None
+        try:
+            first_payload = await codec.read(reader)
+            if first_payload is None:
+                return
+            
+            handshake = None
+            try:
+                data = codec.decode(first_payload)
+                if isinstance(data, dict) and data.get('type') == 'session':
+                    handshake = data
+            except ValueError:
+                pass
+            
+            if handshake is not None:
+                params = handshake.get('params') or {}
+                try:
+                    session_id = self.open_session(params.get('distribution'))
+                except ValueError as e:
+                    response = {'success': False, 'error': str(e), 'available': list(DISTRIBUTIONS)}
+                    if handshake.get('id') is not None:
+                        response['id'] = handshake['id']
+                    output.write(codec.encode(response))
+                    return
+                response = {
+                    'success': True,
+                    'session': session_id,
+                    'distribution': self.sessions[session_id].distribution
+                }
+                if handshake.get('id') is not None:
+                    response['id'] = handshake['id']
+                output.write(codec.encode(response))
+                first_payload = None
+            else:
+                session_id = self.open_session()
+            
+            await serve_commands(
+                self.sessions[session_id], reader, output, codec,
+                first_payload=first_payload
+            )
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.error(f"Connection error: {e}")
+        finally:
+            if session_id is not None:
+                self.close_session(session_id)
+            try:
+                await output.close()
+            except ConnectionError:
+                pass
+    
+    async def serve(self, path: str):
+        """Listen on a Unix domain socket until cancelled"""
+        # Replace a stale socket left by a previous daemon, never a regular file
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        
+        server = await asyncio.start_unix_server(
+            self.handle_connection, path=path, limit=MAX_MESSAGE_BYTES
+        )
+        os.chmod(path, 0o600)
+        logger.info(f"WayneOS Kernel daemon listening on {path}")
+        
+        # Shut down cleanly on SIGTERM so the socket file is removed
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel
+        )
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            logger.info("WayneOS Kernel daemon stopped")
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+
+async def main():
+    """Main event loop for kernel bridge"""
+    parser = argparse.ArgumentParser(description='WayneOS Kernel Bridge')
+    parser.add_argument('--distribution', default='wayneos', choices=DISTRIBUTIONS,
+                       help='Distribution type')
+    parser.add_argument('--max-concurrent', type=int, default=DEFAULT_MAX_CONCURRENT,
+                       help='Maximum number of commands executed concurrently')
+    parser.add_argument('--intent-cache-size', type=int, default=DEFAULT_INTENT_CACHE_SIZE,
+                       help='Number of parsed intents kept in the LRU cache (0 disables it)')
+    parser.add_argument('--serve', metavar='SOCKET_PATH',
+                       help='Run as a multi-session daemon on a Unix domain socket')
+    parser.add_argument('--output-high-water', type=int, default=DEFAULT_OUTPUT_HIGH_WATER,
+                       help='Buffered output bytes at which new commands stop being admitted')
+    parser.add_argument('--wire', choices=['ndjson', 'frame-json', 'frame-bin', 'msgpack'], default='ndjson',
+                       help='Initial wire format; clients can switch with a hello command')
+    parser.add_argument('--user', default=DEFAULT_USER,
+                       help='User every command is authorized as by the permission policy')
+    parser.add_argument('--allow-tuning', action='store_true',
+                       help='Let daemon sessions retune the shared runtime with optimize_hardware')
+    parser.add_argument('--sample-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL,
+                       help='Seconds between hardware telemetry samples')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile a sample of commands (see --profile-every)')
+    parser.add_argument('--profile-every', type=int, default=100,
+                       help='Profile one in every N commands when --profile is on')
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR,
+                       help='Directory for profile output files')
+    parser.add_argument('--profile-format', choices=['pstats', 'collapsed'], default='pstats',
+                       help='Write cProfile pstats or collapsed stacks for flame graphs')
+    args = parser.parse_args()
+    
+    try:
+        codec = get_codec(args.wire)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    runtime = KernelRuntime()
+    runtime.config.max_concurrent = args.max_concurrent
+    runtime.config.intent_cache = args.intent_cache_size
+    runtime.config.sampler_interval = args.sample_interval
+    runtime.start()
+    # Without --profile only commands that ask are profiled, still with these settings
+    runtime.profiler = CommandProfiler(
+        args.profile_dir,
+        args.profile_every if args.profile else 0,
+        args.profile_format
+    )
+    
+    if args.serve:
+        daemon = KernelDaemon(args.distribution, args.max_concurrent, args.intent_cache_size,
+                              runtime, args.wire, args.user, args.allow_tuning)
+        try:
+            await daemon.serve(args.serve)
+        finally:
+            runtime.close()
+        return
+    
+    kernel = WayneOSKernel(args.distribution, intent_cache_size=args.intent_cache_size,
+                           runtime=runtime, user=args.user)
+    logger.info(f"WayneOS Kernel started - Distribution: {args.distribution}")
+    
+    # The backend stops the bridge with SIGTERM; end like at EOF so the
+    # runtime flushes the user store instead of losing its last writes
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, asyncio.current_task().cancel)
+    
+    # Read commands from stdin
+    reader, output = await open_stdio(args.output_high_water)
+    try:
+        await serve_commands(kernel, reader, output, codec, args.max_concurrent)
+    except FrameError as e:
+        logger.error(f"Wire error: {e}")
+    except asyncio.CancelledError:
+        logger.info("WayneOS Kernel stopped")
+    finally:
+        runtime.close()
+        try:
+            await output.close()
+        except ConnectionError:
+            pass
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file